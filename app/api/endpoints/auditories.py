@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.dependencies import get_auditory_service
+from app.core.serialization import json_response
 from app.services.auditory_service import AuditoryService
-from app.schemas.auditory import FreeAuditoryItem
+from app.schemas.auditory import FreeAuditoryItem, FreeWindowItem
 
 router = APIRouter(prefix="/auditories")
 
@@ -14,8 +15,28 @@ async def get_free_auditories(
     time: str = Query(..., pattern=r"^\d{2}:\d{2}$"),
     building_number: int | None = Query(None, ge=1),
     service: AuditoryService = Depends(get_auditory_service),
-) -> list[FreeAuditoryItem]:
+) -> Response:
     try:
-        return await service.get_free_auditories(day_of_week, week_number, time, building_number)
+        return json_response(await service.get_free_auditories(day_of_week, week_number, time, building_number))
+    except SQLAlchemyError as exc:
+        raise HTTPException(status_code=503, detail="Database unavailable") from exc
+
+
+@router.get("/free-windows", response_model=list[FreeWindowItem])
+async def get_free_windows(
+    day_of_week: str,
+    week_number: int = Query(..., ge=1, le=4),
+    start: str = Query(..., pattern=r"^\d{2}:\d{2}$"),
+    end: str | None = Query(None, pattern=r"^\d{2}:\d{2}$"),
+    min_minutes: int | None = Query(None, ge=1, le=24 * 60),
+    building_number: int | None = Query(None, ge=1),
+    min_capacity: int | None = Query(None, ge=1),
+    limit: int = Query(50, ge=1, le=500),
+    service: AuditoryService = Depends(get_auditory_service),
+) -> Response:
+    try:
+        return json_response(await service.find_free_windows(
+            day_of_week, week_number, start, end, min_minutes, building_number, min_capacity, limit
+        ))
     except SQLAlchemyError as exc:
         raise HTTPException(status_code=503, detail="Database unavailable") from exc
\ No newline at end of file
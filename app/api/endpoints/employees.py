@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from app.core.dependencies import get_employee_service
+from app.core.serialization import dump_rows_json, json_response
 from app.services.employee_service import EmployeeService
 from app.schemas.structure import Employee
 
@@ -12,5 +13,5 @@ async def employees_search(
     q: str = Query(..., min_length=1),
     limit: int = Query(20, ge=1, le=100),
     service: EmployeeService = Depends(get_employee_service),
-) -> list[Employee]:
-    return await service.search(q, limit=limit)
\ No newline at end of file
+) -> Response:
+    return json_response(dump_rows_json(await service.search(q, limit=limit), Employee))
\ No newline at end of file
@@ -0,0 +1,32 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.dependencies import get_db_engine
+from app.core.serialization import NDJSON_MEDIA_TYPE, ndjson_response
+from app.db.session import LazyConnection
+from app.services.event_service import EventService
+
+router = APIRouter(prefix="/events")
+
+
+@router.get(
+    "/export.ndjson",
+    response_class=Response,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}, "description": "Занятия, по одному на строку"}},
+)
+async def export_events_ndjson(
+    entity: str | None = Query(None, description="Группа или url_id преподавателя; без него - все занятия"),
+    entity_type: Literal["group", "employee"] | None = Query(None),
+    engine: AsyncEngine = Depends(get_db_engine),
+) -> Response:
+    """
+    Выгрузка schedule_events потоком NDJSON через серверный курсор:
+    память не зависит от объёма таблицы, первые строки уходят клиенту сразу.
+    """
+    db = LazyConnection(engine)
+    # Соединение берётся до начала ответа: недоступная БД - это 503, а не оборванный поток
+    conn = await db.connection()
+    service = EventService(conn)
+    return ndjson_response(service.export_events(entity, entity_type), on_close=db.close)
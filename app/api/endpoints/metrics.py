@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import Response
+
+from app.core.metrics import CONTENT_TYPE, REGISTRY, runtime_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request) -> Response:
+    return Response(content=REGISTRY.render(runtime_metrics(request.app.state)), media_type=CONTENT_TYPE)
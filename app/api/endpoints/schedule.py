@@ -1,10 +1,11 @@
 import json
 from typing import Any, Literal
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.exc import SQLAlchemyError
 
-from app.core.dependencies import get_schedule_service
+from app.core.dependencies import get_conditional_get, get_schedule_service
+from app.core.http_cache import ConditionalGet
+from app.services.schedule_projection import ScheduleProjection
 from app.services.schedule_service import ScheduleService
 
 router = APIRouter(prefix="/schedule")
@@ -14,11 +15,19 @@ EntityType = Literal["group", "employee"]
 async def get_schedule(
     entity_type: EntityType,
     entity_identifier: str,
+    week_number: int | None = Query(None, ge=1, le=4, description="Неделя цикла (1-4)"),
+    day_of_week: int | None = Query(None, ge=1, le=7, description="День недели (1=Понедельник)"),
+    subgroup: int | None = Query(None, ge=1, description="Подгруппа; занятия всей группы остаются"),
+    fields: str | None = Query(None, description="Поля занятий через запятую, например subject,startLessonTime"),
+    http: ConditionalGet = Depends(get_conditional_get),
     service: ScheduleService = Depends(get_schedule_service),
 ):
     try:
-        data = await service.get_schedule(entity_type, entity_identifier)
-        return JSONResponse(content=data)
+        projection = ScheduleProjection.build(
+            week_number, day_of_week, subgroup, fields.split(",") if fields is not None else None
+        )
+        raw = await service.get_schedule_raw(entity_type, entity_identifier, projection)
+        return await http.response(raw, stale=service.served_stale)
     except ValueError as exc:
         # Пытаемся понять, ошибка это 404, 409 или 503 по тексту ошибки (не идеально, но для совместимости)
         # В идеале нужно использовать кастомные Exception классы в сервисах.
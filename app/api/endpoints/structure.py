@@ -1,45 +1,101 @@
-from fastapi import APIRouter, Depends, Query
-from app.core.dependencies import get_structure_service
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.dependencies import get_conditional_get, get_db_engine, get_structure_service
+from app.core.http_cache import ConditionalGet
+from app.core.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, Page, requested_page_size
+from app.core.serialization import NDJSON_MEDIA_TYPE, dump_json, ndjson_response
+from app.db.session import LazyConnection
 from app.services.structure_service import StructureService
 from app.schemas.structure import Faculty, Department, Specialty, Group, Employee
 
 
 router = APIRouter(prefix="/structure")
 
+CURSOR_DESCRIPTION = f"Курсор следующей страницы из заголовка {NEXT_CURSOR_HEADER} предыдущего ответа"
+PAGE_SIZE_DESCRIPTION = "Размер страницы; без cursor и page_size возвращается весь список"
+
+
+async def page_response(http: ConditionalGet, page: Page, stale: bool = False) -> Response:
+    headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else None
+    return await http.response(page.items_json(), headers=headers, stale=stale)
+
 
 @router.get("/faculties", response_model=list[Faculty])
 async def get_faculties(
+    http: ConditionalGet = Depends(get_conditional_get),
     service: StructureService = Depends(get_structure_service),
-) -> list[Faculty]:
-    return await service.get_faculties()
+) -> Response:
+    raw = await service.get_directory_json("faculties")
+    if raw is not None:
+        return await http.response(raw, stale=service.served_stale)
+    return await http.response(dump_json(await service.get_faculties()), stale=service.served_stale)
 
 
 @router.get("/departments", response_model=list[Department])
 async def get_departments(
+    http: ConditionalGet = Depends(get_conditional_get),
     service: StructureService = Depends(get_structure_service),
-) -> list[Department]:
-    return await service.get_departments()
+) -> Response:
+    raw = await service.get_directory_json("departments")
+    if raw is not None:
+        return await http.response(raw, stale=service.served_stale)
+    return await http.response(dump_json(await service.get_departments()), stale=service.served_stale)
 
 
 @router.get("/specialities", response_model=list[Specialty])
 async def get_specialities(
     faculty_id: int | None = Query(None),
+    http: ConditionalGet = Depends(get_conditional_get),
     service: StructureService = Depends(get_structure_service),
-) -> list[Specialty]:
-    return await service.get_specialities(faculty_id=faculty_id)
+) -> Response:
+    if faculty_id is None:
+        raw = await service.get_directory_json("specialities")
+        if raw is not None:
+            return await http.response(raw, stale=service.served_stale)
+    specialities = await service.get_specialities(faculty_id=faculty_id)
+    return await http.response(dump_json(specialities), stale=service.served_stale)
 
 
 @router.get("/groups", response_model=list[Group])
 async def get_groups(
     specialty_id: int | None = Query(None),
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
+    page_size: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description=PAGE_SIZE_DESCRIPTION),
+    http: ConditionalGet = Depends(get_conditional_get),
     service: StructureService = Depends(get_structure_service),
-) -> list[Group]:
-    return await service.get_groups(specialty_id=specialty_id)
+) -> Response:
+    page_size = requested_page_size(cursor, page_size)
+    page = await service.get_groups(specialty_id, cursor, page_size)
+    return await page_response(http, page, stale=service.served_stale)
 
 
 @router.get("/employees", response_model=list[Employee])
 async def get_employees_structure(
     department_id: int | None = Query(None),
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
+    page_size: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description=PAGE_SIZE_DESCRIPTION),
+    http: ConditionalGet = Depends(get_conditional_get),
     service: StructureService = Depends(get_structure_service),
-) -> list[Employee]:
-    return await service.get_employees_by_department(department_id=department_id)
\ No newline at end of file
+) -> Response:
+    page_size = requested_page_size(cursor, page_size)
+    return await page_response(http, await service.get_employees_by_department(department_id, cursor, page_size))
+
+
+@router.get(
+    "/employees.ndjson",
+    response_class=Response,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}, "description": "Сотрудники, по одному на строку"}},
+)
+async def export_employees_ndjson(
+    department_id: int | None = Query(None),
+    engine: AsyncEngine = Depends(get_db_engine),
+) -> Response:
+    """
+    Полная выгрузка сотрудников потоком NDJSON без пагинации.
+    """
+    db = LazyConnection(engine)
+    # Соединение берётся до начала ответа: недоступная БД - это 503, а не оборванный поток
+    conn = await db.connection()
+    service = StructureService(conn)
+    return ndjson_response(service.stream_employees(department_id), on_close=db.close)
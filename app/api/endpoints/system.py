@@ -1,5 +1,10 @@
+from typing import Any
+
 from fastapi import APIRouter, Depends, HTTPException
-from app.core.dependencies import get_system_service
+from app.core.dependencies import get_db_engine, get_slow_query_log, get_system_service, get_local_cache, require_admin
+from app.db.pool import pool_stats
+from app.db.slow_queries import SlowQueryLog
+from app.services.cache_service import LocalCache
 from app.services.system_service import SystemService
 from app.schemas.system import CurrentWeekResponse
 
@@ -13,4 +18,35 @@ async def get_current_week(
         week = await service.get_current_week()
         return CurrentWeekResponse(week_number=week)
     except Exception as exc:
-        raise HTTPException(status_code=503, detail="Service unavailable") from exc
\ No newline at end of file
+        raise HTTPException(status_code=503, detail="Service unavailable") from exc
+
+
+@router.get("/cache-stats")
+async def get_cache_stats(
+    local_cache: LocalCache = Depends(get_local_cache),
+) -> dict[str, Any]:
+    stats: dict[str, Any] = {"local_cache": local_cache.stats()}
+    try:
+        from app.mcp_server.server import registry
+    except ModuleNotFoundError:
+        # MCP не установлен - статистики инструментов нет
+        return stats
+    stats["mcp_tools"] = registry.cache_stats()
+    return stats
+
+
+@router.get("/pool-stats")
+async def get_pool_stats(engine = Depends(get_db_engine)) -> dict[str, Any]:
+    return pool_stats(engine) or {}
+
+
+@router.get("/slow-queries", dependencies=[Depends(require_admin)])
+async def get_slow_queries(
+    slow_query_log: SlowQueryLog | None = Depends(get_slow_query_log),
+) -> dict[str, Any]:
+    """
+    Последние медленные запросы (новые первыми) с источником и, для выборки, планом EXPLAIN ANALYZE.
+    """
+    if slow_query_log is None:
+        return {"enabled": False}
+    return {"enabled": True, **slow_query_log.snapshot()}
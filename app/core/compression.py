@@ -0,0 +1,81 @@
+"""
+Сжатие кэшируемых ответов с выбором кодировки по Accept-Encoding.
+
+gzip есть всегда; brotli и zstd - если установлены пакеты brotli и zstandard.
+Сжатые варианты хранятся в Redis и L1-кэше по ETag тела (см. ConditionalGet),
+поэтому каждый вариант сжимается один раз на поколение данных и URL.
+"""
+import gzip
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - необязательная зависимость
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - необязательная зависимость
+    zstandard = None
+
+
+# Варианты сжимаются один раз, поэтому уровни выше, чем у прокси
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+ZSTD_LEVEL = 12
+
+
+def _compress_gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _compress_br(body: bytes) -> bytes:
+    return brotli.compress(body, quality=BROTLI_QUALITY)
+
+
+def _compress_zstd(body: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+
+
+# Доступные кодировки в порядке предпочтения сервера
+COMPRESSORS = {
+    name: compress
+    for name, compress, available in (
+        ("zstd", _compress_zstd, zstandard is not None),
+        ("br", _compress_br, brotli is not None),
+        ("gzip", _compress_gzip, True),
+    )
+    if available
+}
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """
+    Кодировка с наибольшим q из поддерживаемых; при равных q - по порядку COMPRESSORS.
+    None - отдавать без сжатия.
+    """
+    if not accept_encoding:
+        return None
+
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    best, best_q = None, 0.0
+    for name in COMPRESSORS:
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    return COMPRESSORS[encoding](body)
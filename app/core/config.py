@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import PostgresDsn, SecretStr, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -12,10 +14,74 @@ class Settings(BaseSettings):
 
     database_url: PostgresDsn
     
+    # Применять app/db/migrations при старте (иначе: python -m app.db.migrate)
+    db_apply_migrations: bool = False
+    # Полная валидация Pydantic строк БД при построении ответов (для отладки)
+    db_validate_rows: bool = False
+
+    # Пул соединений (статистика: /system/pool-stats)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    # Пересоздавать соединения старше N секунд (-1 - не пересоздавать)
+    db_pool_recycle: int = -1
+    # Кэш подготовленных запросов asyncpg на соединение (0 - для pgbouncer в режиме transaction)
+    db_statement_cache_size: int = 100
+    # Проверка соединения при выдаче: always - каждый раз, idle - после простоя
+    # дольше db_pool_pre_ping_idle секунд, never - без проверки
+    db_pool_pre_ping: Literal["always", "idle", "never"] = "always"
+    db_pool_pre_ping_idle: float = 30.0
+
+    # Журнал медленных запросов (/system/slow-queries)
+    slow_query_log_enabled: bool = True
+    slow_query_threshold_ms: float = 500.0
+    # Доля медленных SELECT, для которых в фоне снимается EXPLAIN (ANALYZE, BUFFERS)
+    slow_query_explain_sample_rate: float = 0.0
+    slow_query_buffer_size: int = 100
+    # Bearer-токен служебных эндпоинтов с текстом запросов; пусто - эндпоинты закрыты
+    admin_token: SecretStr | None = None
+
     redis_host: str
     redis_port: int = 6379
-    redis_schedule_cache_ttl: int = 600
+    # Ключи расписаний версионируются поколением данных ETL,
+    # поэтому TTL ограничивает только объём памяти, а не свежесть
+    redis_schedule_cache_ttl: int = 6 * 3600
     redis_curr_week_cache_ttl: int = 5000
+    # Копия расписания, которая отдаётся при недоступной БД
+    redis_schedule_stale_ttl: int = 7 * 24 * 3600
+    # Уровень zlib для значений schedule:* (0 - хранить обычный JSON)
+    redis_schedule_compression_level: int = 6
+
+    # Межворкерная блокировка заполнения кэша расписаний
+    schedule_fill_lock_enabled: bool = False
+    schedule_fill_lock_timeout: float = 5.0
+
+    # Страховочный опрос поколения данных, если сообщение pub/sub потерялось
+    generation_poll_interval: float = 30.0
+
+    # Снимки справочных данных в памяти процесса
+    snapshot_max_age: float = 3600.0
+    occupancy_engine_enabled: bool = True
+    occupancy_slot_minutes: int = 5
+    employee_index_enabled: bool = True
+    structure_snapshot_enabled: bool = True
+
+    # Cache-Control: max-age для расписаний и справочников (ETag проверяется всегда)
+    http_cache_max_age: int = 60
+    # Сжатие этих ответов по Accept-Encoding (brotli/zstd - если установлены пакеты)
+    http_compression_enabled: bool = True
+    http_compression_min_size: int = 1024
+
+    # L1-кэш внутри процесса (перед Redis)
+    local_cache_max_bytes: int = 64 * 1024 * 1024
+    local_cache_ttl: int = 60
+
+    # Streamable HTTP транспорт MCP (/mcp/http) рядом с SSE
+    mcp_streamable_http_enabled: bool = True
+
+    # Пакетный вызов инструментов MCP (инструмент batch)
+    mcp_batch_max_calls: int = 10
+    mcp_batch_concurrency: int = 4
 
     mcp_auth_token: SecretStr | None = None
     
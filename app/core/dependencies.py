@@ -1,7 +1,10 @@
+import hmac
+
 from fastapi import HTTPException, Request, Depends
 from sqlalchemy.exc import OperationalError
-from sqlalchemy.ext.asyncio import AsyncConnection
 
+from app.core.http_cache import ConditionalGet
+from app.db.session import LazyConnection
 from app.services.auditory_service import AuditoryService
 from app.services.structure_service import StructureService
 from app.services.employee_service import EmployeeService
@@ -23,30 +26,108 @@ async def get_db_conn(request: Request):
     except (OperationalError, OSError) as exc:
         raise HTTPException(status_code=503, detail="Database unavailable") from exc
 
+async def get_lazy_db_conn(request: Request):
+    async with LazyConnection(request.app.state.db_engine) as conn:
+        yield conn
+
 def get_redis(request: Request):
     return request.app.state.redis
 
+def get_redis_binary(request: Request):
+    return request.app.state.redis_binary
+
+def get_local_cache(request: Request):
+    return request.app.state.local_cache
+
+def get_single_flight(request: Request):
+    return request.app.state.single_flight
+
+def get_generation(request: Request):
+    return request.app.state.generation
+
+def get_occupancy_engine(request: Request):
+    return request.app.state.occupancy_engine
+
+def get_employee_index(request: Request):
+    return request.app.state.employee_index
+
+def get_structure_snapshot(request: Request):
+    return request.app.state.structure_snapshot
+
+def get_slow_query_log(request: Request):
+    return request.app.state.slow_query_log
+
+def require_admin(request: Request, settings = Depends(get_settings)) -> None:
+    """
+    Служебные эндпоинты с текстом SQL и параметрами: только с Bearer ADMIN_TOKEN.
+    Без заданного токена эндпоинты закрыты.
+    """
+    token = settings.admin_token.get_secret_value() if settings.admin_token else ""
+    if not token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled: ADMIN_TOKEN is not set")
+    provided = request.headers.get("authorization", "")
+    if not hmac.compare_digest(provided.encode(), f"Bearer {token}".encode()):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+def get_conditional_get(
+    request: Request,
+    settings = Depends(get_settings),
+    generation = Depends(get_generation),
+    local_cache = Depends(get_local_cache),
+    redis = Depends(get_redis_binary),
+) -> ConditionalGet:
+    """
+    Отвечает 304 до создания сервисов, если у клиента актуальная версия ресурса.
+    """
+    conditional = ConditionalGet(
+        request,
+        generation,
+        settings.http_cache_max_age,
+        local_cache,
+        settings.http_compression_min_size if settings.http_compression_enabled else None,
+        redis,
+        # Сжатый вариант живёт столько же, сколько исходные байты расписания в Redis
+        settings.redis_schedule_cache_ttl,
+    )
+    conditional.check()
+    return conditional
+
 # --- Service Dependencies ---
 
-def get_auditory_service(conn: AsyncConnection = Depends(get_db_conn)) -> AuditoryService:
-    return AuditoryService(conn)
+def get_auditory_service(
+    conn: LazyConnection = Depends(get_lazy_db_conn),
+    engine = Depends(get_occupancy_engine),
+) -> AuditoryService:
+    return AuditoryService(conn, engine)
 
-def get_structure_service(conn: AsyncConnection = Depends(get_db_conn)) -> StructureService:
-    return StructureService(conn)
+def get_structure_service(
+    conn: LazyConnection = Depends(get_lazy_db_conn),
+    snapshot = Depends(get_structure_snapshot),
+) -> StructureService:
+    return StructureService(conn, snapshot)
 
-def get_employee_service(conn: AsyncConnection = Depends(get_db_conn)) -> EmployeeService:
-    return EmployeeService(conn)
+def get_employee_service(
+    conn: LazyConnection = Depends(get_lazy_db_conn),
+    index = Depends(get_employee_index),
+) -> EmployeeService:
+    return EmployeeService(conn, index)
 
 def get_system_service(
-    conn: AsyncConnection = Depends(get_db_conn),
+    conn: LazyConnection = Depends(get_lazy_db_conn),
     redis = Depends(get_redis),
-    settings = Depends(get_settings)
+    settings = Depends(get_settings),
+    local_cache = Depends(get_local_cache),
+    generation = Depends(get_generation),
 ) -> SystemService:
-    return SystemService(conn, redis, settings)
+    return SystemService(conn, redis, settings, local_cache, generation)
 
 def get_schedule_service(
-    conn: AsyncConnection = Depends(get_db_conn),
-    redis = Depends(get_redis),
-    settings = Depends(get_settings)
+    conn: LazyConnection = Depends(get_lazy_db_conn),
+    redis = Depends(get_redis_binary),
+    settings = Depends(get_settings),
+    local_cache = Depends(get_local_cache),
+    single_flight = Depends(get_single_flight),
+    generation = Depends(get_generation),
+    employee_index = Depends(get_employee_index),
 ) -> ScheduleService:
-    return ScheduleService(conn, redis, settings)
\ No newline at end of file
+    return ScheduleService(conn, redis, settings, local_cache, single_flight, generation, employee_index)
\ No newline at end of file
@@ -0,0 +1,206 @@
+"""
+Условные GET-запросы: ETag, If-None-Match -> 304 и Cache-Control.
+
+Ответ справочников и расписаний определяется поколением данных ETL и URL запроса,
+поэтому ETag вычисляется из них до обращения к кэшу и БД: неизменившийся ресурс
+отдаётся как 304 без чтения и сериализации тела. Если поколение неизвестно,
+ETag - хэш готового тела (экономится только передача).
+
+Это верно, пока тело строится из данных текущего поколения: ключи кэша Redis
+содержат поколение, L1-кэш сбрасывается при его смене. Тело из данных прошлого
+поколения (снимок до окончания фоновой перезагрузки, копия расписания при
+недоступной БД) передаётся в response() со stale=True и получает ETag по
+содержимому. Изменение тела без смены поколения (например, нового формата
+ответа) требует смены поколения, иначе клиенты до неё получают 304 на старую версию.
+
+Тело сжимается по Accept-Encoding в отдельном потоке. Сжатый вариант хранится
+по ETag в Redis (общий для воркеров, с тем же TTL, что и ключи расписаний)
+и в L1-кэше: ETag включает поколение данных, поэтому вариант сжимается
+один раз на поколение и URL, а не на каждый воркер.
+"""
+import asyncio
+import hashlib
+
+from fastapi import HTTPException, Request
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from starlette.responses import Response
+
+from app.core.compression import compress, negotiate_encoding
+from app.core.metrics import CACHE_REQUESTS
+from app.core.redis_keys import RedisKeys
+from app.services.cache_service import LocalCache
+from app.services.generation_service import DataGeneration
+
+_ENCODING_SUFFIXES = tuple(f'-{name}"' for name in ("gzip", "br", "zstd"))
+
+
+def make_etag(*parts: object) -> str:
+    """
+    ETag ресурса по поколению данных и URL, без тела (см. описание модуля).
+    """
+    digest = hashlib.blake2b("\x1f".join(map(str, parts)).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def content_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    У сжатого варианта свой ETag: строгий ETag относится к конкретным байтам.
+    """
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _base_etag(tag: str) -> str:
+    tag = tag.strip().removeprefix("W/")
+    for suffix in _ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)] + '"'
+    return tag
+
+
+def matching_etag(if_none_match: str | None, etag: str) -> str | None:
+    """
+    ETag из If-None-Match, совпавший с etag (или etag для "*"); None - совпадений нет.
+    Для If-None-Match используется слабое сравнение (RFC 9110, 13.1.2);
+    ETag любого сжатого варианта того же тела тоже подходит.
+    """
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    for tag in if_none_match.split(","):
+        if _base_etag(tag) == etag:
+            return tag.strip().removeprefix("W/")
+    return None
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    return matching_etag(if_none_match, etag) is not None
+
+
+class ConditionalGet:
+    """
+    Кэшируемый GET одного запроса. Создаётся зависимостью get_conditional_get,
+    которая сразу отвечает 304, если клиент прислал актуальный ETag.
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        generation: DataGeneration | None,
+        max_age: int,
+        local_cache: LocalCache | None = None,
+        compression_min_size: int | None = None,
+        redis: Redis | None = None,
+        compressed_ttl: int | None = None,
+    ):
+        """
+        :param compression_min_size: тела меньше этого размера не сжимаются; None - сжатие выключено
+        :param redis: бинарный клиент для сжатых вариантов, общих для воркеров
+        :param compressed_ttl: время жизни сжатого варианта в Redis и L1
+        """
+        self.if_none_match = request.headers.get("if-none-match")
+        self.cache_control = f"public, max-age={max_age}"
+        self.local_cache = local_cache
+        self.compression_min_size = compression_min_size
+        self.redis = redis
+        self.compressed_ttl = compressed_ttl
+        self.encoding = (
+            negotiate_encoding(request.headers.get("accept-encoding")) if compression_min_size is not None else None
+        )
+        value = generation.value if generation is not None else None
+        query = "&".join(sorted(str(request.query_params).split("&"))) if request.query_params else ""
+        self.etag = make_etag(value, request.url.path, query) if value else None
+
+    def check(self) -> None:
+        """
+        Размер тела здесь ещё неизвестен, поэтому 304 повторяет совпавший ETag клиента:
+        суффикс кодировки в нём есть, только если сжат был и ответ 200.
+        """
+        if self.etag is None:
+            return
+        tag = matching_etag(self.if_none_match, self.etag)
+        if tag is not None:
+            raise HTTPException(status_code=304, headers=self._headers(tag, self.cache_control, None))
+
+    async def response(
+        self,
+        body: bytes,
+        headers: dict[str, str] | None = None,
+        media_type: str = "application/json",
+        stale: bool = False,
+    ) -> Response:
+        """
+        :param stale: тело - устаревшая копия (БД недоступна); она не должна
+            получить ETag текущего поколения и не кэшируется прокси
+        """
+        if stale:
+            etag, cache_control = content_etag(body), "no-cache"
+        else:
+            etag, cache_control = self.etag or content_etag(body), self.cache_control
+
+        encoding = self.encoding
+        if encoding is not None and len(body) < self.compression_min_size:  # type: ignore[operator]
+            encoding = None
+
+        all_headers = self._headers(etag, cache_control, encoding)
+        if etag_matches(self.if_none_match, etag):
+            return Response(status_code=304, headers=all_headers)
+
+        if encoding is not None:
+            body = await self._compressed(body, etag, encoding)
+            all_headers["Content-Encoding"] = encoding
+        if headers:
+            all_headers.update(headers)
+        return Response(content=body, headers=all_headers, media_type=media_type)
+
+    async def _compressed(self, body: bytes, etag: str, encoding: str) -> bytes:
+        key = RedisKeys.compressed_response(etag, encoding)
+        if self.local_cache is not None:
+            cached = self.local_cache.get(key)
+            if cached is not None:
+                CACHE_REQUESTS.inc("compressed_response", "local", "hit")
+                return cached
+            CACHE_REQUESTS.inc("compressed_response", "local", "miss")
+
+        if self.redis is not None:
+            try:
+                cached = await self.redis.get(key)
+                CACHE_REQUESTS.inc("compressed_response", "redis", "hit" if cached else "miss")
+            except RedisError:
+                cached = None
+                CACHE_REQUESTS.inc("compressed_response", "redis", "error")
+            if cached:
+                self._store_local(key, cached)
+                return cached
+
+        # Сжатие документа в несколько мегабайт не должно блокировать event loop
+        compressed = await asyncio.to_thread(compress, body, encoding)
+
+        if self.redis is not None:
+            try:
+                if self.compressed_ttl:
+                    await self.redis.setex(key, self.compressed_ttl, compressed)
+                else:
+                    await self.redis.set(key, compressed)
+            except RedisError:
+                pass
+        self._store_local(key, compressed)
+        return compressed
+
+    def _store_local(self, key: str, value: bytes) -> None:
+        if self.local_cache is not None:
+            self.local_cache.set(key, value, len(value), self.compressed_ttl)
+
+    def _headers(self, etag: str, cache_control: str, encoding: str | None) -> dict[str, str]:
+        headers = {
+            "ETag": encoded_etag(etag, encoding) if encoding is not None else etag,
+            "Cache-Control": cache_control,
+        }
+        if self.compression_min_size is not None:
+            headers["Vary"] = "Accept-Encoding"
+        return headers
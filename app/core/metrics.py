@@ -0,0 +1,253 @@
+"""
+Метрики процесса в текстовом формате Prometheus (GET /metrics).
+
+Запись должна быть дешёвой, чтобы метрики можно было не выключать:
+счётчики и гистограммы - обычные словари без блокировок (все записи идут
+из потока event loop), у гистограмм фиксированные границы корзин,
+наблюдение - один bisect и два сложения.
+Значения хранятся в процессе: каждый воркер uvicorn отдаёт свои.
+"""
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Any, Iterable, Sequence
+
+from app.core.request_context import reset_origin, route_label, set_origin
+
+# Время, секунды
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Размер, байты
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[Any]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def render(self) -> list[str]:
+        """
+        Строки метрики в текстовом формате Prometheus, включая HELP и TYPE.
+        """
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels: Any, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in self._values.items()
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, *labels: Any) -> None:
+        self._values[labels] = value
+
+    def dec(self, *labels: Any, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [счётчики корзин (последняя - +Inf, не накопительные), сумма]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels: Any) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        bucket_labels = self.labelnames + ("le",)
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(bucket_labels, labels + (_format_value(bound),))} {cumulative}"
+                )
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self, extra: Iterable[Metric] = ()) -> str:
+        """
+        :param extra: метрики, собранные в момент запроса (состояние пула, L1-кэша)
+        """
+        lines: list[str] = []
+        for metric in (*self._metrics, *extra):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+))
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+))
+HTTP_RESPONSE_SIZE = REGISTRY.register(Histogram(
+    "http_response_size_bytes", "HTTP response body size (after compression)", ("route",), SIZE_BUCKETS
+))
+
+MCP_TOOL_CALLS = REGISTRY.register(Counter(
+    "mcp_tool_calls_total", "MCP tool calls by outcome (ok, error)", ("tool", "outcome")
+))
+MCP_TOOL_DURATION = REGISTRY.register(Histogram(
+    "mcp_tool_duration_seconds", "MCP tool latency including the result cache", ("tool",)
+))
+MCP_TOOL_RESULT_SIZE = REGISTRY.register(Histogram(
+    "mcp_tool_result_size_chars", "MCP tool result text length", ("tool",), SIZE_BUCKETS
+))
+MCP_SSE_SESSIONS = REGISTRY.register(Gauge(
+    "mcp_sse_sessions", "Open MCP SSE sessions"
+))
+MCP_SSE_SESSIONS.set(0)
+
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "cache_requests_total", "Cache lookups by cache, layer (local, redis) and result (hit, miss, error)",
+    ("cache", "layer", "result"),
+))
+
+DB_QUERIES = REGISTRY.register(Counter(
+    "db_queries_total", "SQL statements by outcome (ok, error)", ("outcome",)
+))
+DB_QUERY_DURATION = REGISTRY.register(Histogram(
+    "db_query_duration_seconds", "SQL statement execution time (cursor execute)"
+))
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware: время и размер ответа по шаблону маршрута ("/schedule/{entity_type}/{entity_identifier}"),
+    а не по фактическому пути, чтобы число рядов не росло с числом групп и преподавателей.
+    Заодно помечает запрос как источник SQL-запросов (app.core.request_context).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        token = set_origin(scope)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            reset_origin(token)
+            route = route_label(scope)
+            method = scope["method"]
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, method, route)
+            HTTP_REQUESTS.inc(method, route, status)
+            HTTP_RESPONSE_SIZE.observe(size, route)
+
+
+def runtime_metrics(state: Any) -> list[Metric]:
+    """
+    Метрики состояния из app.state: пул соединений и L1-кэш.
+    """
+    from app.db.pool import pool_stats
+
+    metrics: list[Metric] = []
+
+    engine = getattr(state, "db_engine", None)
+    stats = pool_stats(engine) if engine is not None else None
+    if stats is not None:
+        for key in ("checkouts", "connects", "overflow_connects", "timeouts", "invalidations", "pings"):
+            counter = Counter(f"db_pool_{key}_total", f"Connection pool {key.replace('_', ' ')}")
+            counter.inc(amount=stats[key])
+            metrics.append(counter)
+        for key, value in stats.get("pool", {}).items():
+            gauge = Gauge(f"db_pool_{key}", f"Connection pool {key.replace('_', ' ')}")
+            gauge.set(value)
+            metrics.append(gauge)
+
+    local_cache = getattr(state, "local_cache", None)
+    if local_cache is not None:
+        cache_stats = local_cache.stats()
+        for key in ("hits", "misses", "evictions"):
+            if key in cache_stats:
+                counter = Counter(f"local_cache_{key}_total", f"L1 cache {key}")
+                counter.inc(amount=cache_stats[key])
+                metrics.append(counter)
+        for key in ("entries", "size_bytes", "max_bytes"):
+            if key in cache_stats:
+                gauge = Gauge(f"local_cache_{key}", f"L1 cache {key}")
+                gauge.set(cache_stats[key])
+                metrics.append(gauge)
+
+    return metrics
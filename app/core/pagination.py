@@ -0,0 +1,84 @@
+"""
+Keyset-пагинация списков: непрозрачный курсор хранит ключ сортировки
+последнего элемента страницы, следующая страница - диапазон индекса после него.
+"""
+import base64
+import json
+from dataclasses import dataclass, field
+from typing import Any, Generic, Sequence, TypeVar
+
+from app.core.serialization import dump_json
+
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+
+# Заголовок REST-ответа с курсором следующей страницы
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(kind: str, key: Sequence[Any]) -> str:
+    """
+    :param kind: список, к которому относится курсор (курсор групп не подходит для аудиторий)
+    :param key: ключ сортировки последнего элемента страницы
+    """
+    raw = json.dumps([kind, list(key)], ensure_ascii=False, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(kind: str, cursor: str, types: tuple[type, ...]) -> tuple[Any, ...]:
+    """
+    :param types: ожидаемые типы элементов ключа
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_kind, key = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+    if (
+        cursor_kind != kind
+        or not isinstance(key, list)
+        or len(key) != len(types)
+        or not all(isinstance(value, t) and not isinstance(value, bool) for value, t in zip(key, types))
+    ):
+        raise ValueError("Invalid cursor")
+    return tuple(key)
+
+
+def clamp_page_size(page_size: int | None) -> int:
+    if page_size is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(page_size), MAX_PAGE_SIZE))
+
+
+def requested_page_size(cursor: str | None, page_size: int | None) -> int | None:
+    """
+    Размер страницы REST-списка. Без cursor и page_size клиент получает весь
+    список, как до введения пагинации (None); иначе - страницу clamp_page_size.
+    """
+    if cursor is None and page_size is None:
+        return None
+    return clamp_page_size(page_size)
+
+
+@dataclass
+class Page(Generic[T]):
+    """
+    Страница списка. raw - готовый JSON элементов (например, из снимка справочников);
+    если он задан, items не заполняется.
+    """
+    items: list[T] = field(default_factory=list)
+    next_cursor: str | None = None
+    raw: bytes | None = None
+
+    def items_json(self) -> bytes:
+        return self.raw if self.raw is not None else dump_json(self.items)
+
+    def envelope_json(self) -> bytes:
+        """
+        {"items": [...], "next_cursor": ...} - формат ответа MCP-инструментов.
+        """
+        return b'{"items":' + self.items_json() + b',"next_cursor":' + dump_json(self.next_cursor) + b"}"
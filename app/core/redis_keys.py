@@ -6,6 +6,11 @@ class RedisKeys:
     
     SYSTEM_CURRENT_WEEK = "system:current_week"
 
+    # Поколение данных: ETL записывает новое значение в ключ
+    # и публикует его в канал после каждой загрузки
+    DATA_GENERATION = "system:data_generation"
+    DATA_GENERATION_CHANNEL = "system:data_generation:events"
+
     @staticmethod
     def schedule(entity_type: str, identifier: str) -> str:
         """
@@ -13,4 +18,53 @@ class RedisKeys:
         :param entity_type: 'group' или 'employee'
         :param identifier: номер группы или url_id сотрудника
         """
-        return f"schedule:{entity_type}:{identifier}"
\ No newline at end of file
+        return f"schedule:{entity_type}:{identifier}"
+
+    @staticmethod
+    def schedule_view(schedule_key: str, view: str) -> str:
+        """
+        Ключ проекции расписания (неделя, день, подгруппа, поля) рядом с полным документом.
+        :param schedule_key: ключ из RedisKeys.schedule
+        :param view: ScheduleProjection.key
+        """
+        return f"{schedule_key}:view:{view}"
+
+    @staticmethod
+    def tool_result(tool_name: str, args_digest: str) -> str:
+        """
+        Ключ готового результата MCP-инструмента.
+        :param args_digest: хэш нормализованных аргументов
+        """
+        return f"tool:{tool_name}:{args_digest}"
+
+    @staticmethod
+    def compressed_response(etag: str, encoding: str) -> str:
+        """
+        Сжатый вариант кэшируемого HTTP-ответа.
+        :param etag: ETag тела (включает поколение данных и URL)
+        :param encoding: gzip, br или zstd
+        """
+        tag = etag.strip('"')
+        return f"http:{encoding}:{tag}"
+
+    @staticmethod
+    def with_generation(key: str, generation: str | None) -> str:
+        """
+        Помещает ключ в пространство имён поколения данных.
+        Без известного поколения возвращает ключ без изменений.
+        """
+        return f"g{generation}:{key}" if generation else key
+
+    @staticmethod
+    def stale(key: str) -> str:
+        """
+        Долгоживущая копия значения, которая отдаётся, если БД недоступна.
+        """
+        return f"stale:{key}"
+
+    @staticmethod
+    def lock(key: str) -> str:
+        """
+        Блокировка заполнения ключа (один воркер ходит в БД).
+        """
+        return f"lock:{key}"
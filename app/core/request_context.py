@@ -0,0 +1,41 @@
+"""
+Источник текущей работы (маршрут REST или инструмент MCP) в contextvar:
+его видят обработчики событий SQLAlchemy, например журнал медленных запросов.
+"""
+from contextvars import ContextVar, Token
+from typing import Any
+
+# ASGI scope запроса или строка вида "mcp:<инструмент>"
+_origin: ContextVar[Any] = ContextVar("request_origin", default=None)
+
+
+def route_label(scope: dict) -> str:
+    """
+    Шаблон маршрута ("/schedule/{entity_type}/{entity_identifier}"), а не фактический путь.
+    """
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is not None:
+        return path
+    # Смонтированное приложение MCP: набор путей в нём фиксирован
+    if scope.get("root_path"):
+        return scope["path"]
+    return "unmatched"
+
+
+def set_origin(origin: dict | str) -> Token:
+    """
+    :param origin: ASGI scope (маршрут определяется лениво, после роутинга) или готовая строка
+    """
+    return _origin.set(origin)
+
+
+def reset_origin(token: Token) -> None:
+    _origin.reset(token)
+
+
+def current_origin() -> str | None:
+    origin = _origin.get()
+    if isinstance(origin, dict):
+        return f"{origin.get('method', '')} {route_label(origin)}"
+    return origin
@@ -0,0 +1,119 @@
+"""
+Сериализация ответов REST и MCP сразу в JSON-байты.
+
+Списки моделей сериализуются через закэшированный TypeAdapter(list[Model]) -
+без промежуточных словарей и повторной валидации, как при
+model_dump() + json.dumps или response_model + jsonable_encoder.
+"""
+from functools import lru_cache
+from typing import Any, AsyncIterable, Awaitable, Callable, Iterable, Sequence, Type
+
+import anyio
+import pydantic_core
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from starlette.responses import Response, StreamingResponse
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model])  # type: ignore[valid-type]
+
+
+def dump_json(value: Any) -> bytes:
+    """
+    JSON-байты для модели, списка моделей одного типа или обычных данных
+    (словари и списки, в том числе с моделями внутри).
+    """
+    if isinstance(value, BaseModel):
+        return value.__pydantic_serializer__.to_json(value)
+
+    if isinstance(value, list) and value and isinstance(value[0], BaseModel):
+        model = type(value[0])
+        if all(type(item) is model for item in value):
+            return list_adapter(model).dump_json(value)
+
+    return pydantic_core.to_json(value)
+
+
+def dump_rows_json(rows: Iterable[Any], model: Type[BaseModel]) -> bytes:
+    """
+    Приводит строки (словари, RowMapping, объекты с атрибутами) к схеме model
+    и сериализует список - то же, что response_model=list[model], но без jsonable_encoder.
+    """
+    adapter = list_adapter(model)
+    return adapter.dump_json(adapter.validate_python(list(rows), from_attributes=True))
+
+
+def json_response(content: bytes | Any, status_code: int = 200, headers: dict[str, str] | None = None) -> Response:
+    """
+    Ответ с готовым JSON. Для эндпоинтов с response_model: схема остаётся
+    в OpenAPI, а FastAPI не валидирует и не перекодирует результат повторно.
+    """
+    body = content if isinstance(content, (bytes, bytearray)) else dump_json(content)
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Класс ответа по умолчанию для приложения: JSON через pydantic-core вместо json.dumps.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+def ndjson_lines(items: Iterable[BaseModel]) -> bytes:
+    """
+    Модели в формате NDJSON: по одному JSON-объекту на строку.
+    """
+    return b"".join(item.__pydantic_serializer__.to_json(item) + b"\n" for item in items)
+
+
+class NdjsonStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse, который освобождает ресурсы при любом исходе: после конца потока,
+    при обрыве соединения клиентом (Starlette отменяет поток через task group)
+    и если клиент ушёл до первой пачки и генератор так и не был запущен.
+    """
+
+    def __init__(
+        self,
+        batches: AsyncIterable[Sequence[BaseModel]],
+        on_close: Callable[[], Awaitable[None]] | None = None,
+    ):
+        self._batches = batches
+        self._on_close = on_close
+        super().__init__(self._body(), media_type=NDJSON_MEDIA_TYPE)
+
+    async def _body(self):
+        async for batch in self._batches:
+            if batch:
+                yield ndjson_lines(batch)
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # Без защиты от отмены закрытие соединения прервалось бы вместе с потоком
+            with anyio.CancelScope(shield=True):
+                await self.body_iterator.aclose()
+                aclose = getattr(self._batches, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+                if self._on_close is not None:
+                    await self._on_close()
+
+
+def ndjson_response(
+    batches: AsyncIterable[Sequence[BaseModel]],
+    on_close: Callable[[], Awaitable[None]] | None = None,
+) -> StreamingResponse:
+    """
+    Потоковый NDJSON-ответ: каждая пачка строк отправляется сразу, как только прочитана.
+    :param on_close: освобождение ресурсов (соединения с БД) после окончания или обрыва потока
+    """
+    return NdjsonStreamingResponse(batches, on_close)
@@ -1,19 +1,55 @@
 from __future__ import annotations
-from typing import Any
+import logging
+from typing import Any, TYPE_CHECKING
 
 from sqlalchemy import select, text, func, or_
-from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.exc import SQLAlchemyError
 
+from app.db.session import DbConnection
 from app.db.tables import employees
 
+from app.services.employee_index import RANK_PREFIX
 
-async def search_employees(conn: AsyncConnection, query: str, *, limit: int = 20) -> list[dict[str, Any]]:
+if TYPE_CHECKING:
+    from app.services.employee_index import EmployeeDirectory, EmployeeIndex
+
+
+logger = logging.getLogger(__name__)
+
+
+async def load_employee_directory(
+    conn: DbConnection,
+    index: EmployeeIndex | None,
+) -> EmployeeDirectory | None:
+    """
+    Снимок сотрудников из индекса в памяти; None - искать через БД.
+    """
+    if index is None:
+        return None
+    try:
+        return await index.get(conn)
+    except SQLAlchemyError:
+        logger.warning("Employee index unavailable, falling back to database search", exc_info=True)
+        return None
+
+
+async def search_employees(
+    conn: DbConnection,
+    query: str,
+    *,
+    limit: int = 20,
+    index: EmployeeIndex | None = None,
+) -> list[dict[str, Any]]:
     clean_query = query.strip()
     if not clean_query:
         return []
 
     limit_value = max(1, min(int(limit), 100))
 
+    directory = await load_employee_directory(conn, index)
+    if directory is not None:
+        return directory.search(clean_query, limit=limit_value)
+
     full_name_concat = func.concat_ws(' ', employees.c.last_name, employees.c.first_name, employees.c.middle_name)
 
     fts_condition = func.to_tsvector('simple', full_name_concat).op('@@')(func.plainto_tsquery('simple', clean_query))
@@ -31,10 +67,11 @@ async def search_employees(conn: AsyncConnection, query: str, *, limit: int = 20
 
 
 async def resolve_employee_identifier(
-    conn: AsyncConnection,
+    conn: DbConnection,
     identifier: str,
     *,
     limit: int = 5,
+    index: EmployeeIndex | None = None,
 ) -> tuple[int, str, list[dict[str, Any]]]:
     """
     Пытается найти сотрудника по:
@@ -47,6 +84,23 @@ async def resolve_employee_identifier(
     if normalized.isdigit():
         return int(normalized), normalized, []
 
+    directory = await load_employee_directory(conn, index)
+    if directory is not None:
+        row = directory.get_by_url_id(normalized)
+        if row:
+            return int(row["id"]), normalized, []
+
+        ranked = directory.rank(normalized, limit=limit)
+        # Однозначным считается единственное совпадение лучшего ранга, и только по целым словам
+        # или их началу: по подстроке или с опечаткой легко выбрать не того человека
+        if ranked and ranked[0][0] >= RANK_PREFIX:
+            best = [i for rank, _, i in ranked if rank == ranked[0][0]]
+            if len(best) == 1:
+                match = directory.rows[best[0]]
+                return int(match["id"]), match.get("url_id") or str(match["id"]), []
+            return -1, normalized, [directory.rows[i] for i in best]
+        return -1, normalized, [directory.rows[i] for _, _, i in ranked]
+
     stmt_url = select(employees.c.id).where(employees.c.url_id == normalized).limit(1)
     result_url = await conn.execute(stmt_url)
     row_url = result_url.mappings().first()
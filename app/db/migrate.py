@@ -0,0 +1,115 @@
+"""
+Применение версионированных SQL-миграций из app/db/migrations.
+
+    python -m app.db.migrate
+
+Файлы применяются по возрастанию имени, применённые версии хранятся
+в таблице schema_migrations. Миграции выполняются в режиме AUTOCOMMIT,
+чтобы работал CREATE INDEX CONCURRENTLY. Если такой индекс не достроился,
+Postgres оставляет его INVALID - его нужно удалить вручную перед повтором.
+
+Миграция, первая строка которой "-- optional", необязательна: если она
+не применилась (например, нет прав на CREATE EXTENSION), это пишется в лог,
+остальные миграции применяются, а попытка повторяется при следующем запуске.
+"""
+import asyncio
+import logging
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import Settings
+from app.db.session import create_engine
+
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+# Ключ advisory lock: несколько воркеров при старте не применяют миграции одновременно
+MIGRATIONS_LOCK_KEY = 7_301_002
+
+OPTIONAL_MARKER = "-- optional"
+
+
+def split_statements(sql: str) -> list[str]:
+    """
+    Делит файл миграции на отдельные команды по ';' в конце строки.
+    """
+    statements, current = [], []
+    for line in sql.splitlines():
+        if line.strip().startswith("--"):
+            continue
+        current.append(line)
+        if line.rstrip().endswith(";"):
+            statement = "\n".join(current).strip().rstrip(";")
+            if statement:
+                statements.append(statement)
+            current = []
+
+    tail = "\n".join(current).strip()
+    if tail:
+        statements.append(tail)
+    return statements
+
+
+async def apply_migrations(engine: AsyncEngine) -> list[str]:
+    """
+    Применяет новые миграции, возвращает список применённых версий.
+    """
+    autocommit = engine.execution_options(isolation_level="AUTOCOMMIT")
+    applied: list[str] = []
+
+    async with autocommit.connect() as conn:
+        await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATIONS_LOCK_KEY})
+        try:
+            await conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                "version TEXT PRIMARY KEY, applied_at TIMESTAMP NOT NULL DEFAULT now())"
+            ))
+            result = await conn.execute(text("SELECT version FROM schema_migrations"))
+            done = {row[0] for row in result.all()}
+
+            for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+                version = path.stem
+                if version in done:
+                    continue
+
+                sql = path.read_text(encoding="utf-8")
+                optional = sql.lstrip().startswith(OPTIONAL_MARKER)
+                logger.info("Applying migration %s", version)
+                try:
+                    for statement in split_statements(sql):
+                        await conn.exec_driver_sql(statement)
+                except SQLAlchemyError:
+                    if not optional:
+                        raise
+                    logger.warning("Skipping optional migration %s", version, exc_info=True)
+                    continue
+
+                await conn.execute(
+                    text("INSERT INTO schema_migrations (version) VALUES (:version)"),
+                    {"version": version},
+                )
+                applied.append(version)
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATIONS_LOCK_KEY})
+
+    return applied
+
+
+async def main() -> None:
+    settings = Settings()
+    engine = create_engine(str(settings.database_url), settings)
+    try:
+        applied = await apply_migrations(engine)
+        logger.info("Applied migrations: %s", ", ".join(applied) or "none")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,7 @@
+-- Поиск по аудитории и номеру недели: предикаты `@>` (array containment)
+-- в EventService обслуживаются GIN-индексами, `= ANY(col)` - нет.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_schedule_events_auditories_gin
+    ON schedule_events USING GIN (auditories);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_schedule_events_week_numbers_gin
+    ON schedule_events USING GIN (week_numbers);
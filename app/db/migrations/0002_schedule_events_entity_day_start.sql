@@ -0,0 +1,4 @@
+-- Расписание сущности на день (get_day_events, search_events):
+-- фильтр по entity_name и day_of_week, сортировка по start_time.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_schedule_events_entity_day_start
+    ON schedule_events (entity_name, day_of_week, start_time);
@@ -0,0 +1,9 @@
+-- Актуальная SCD2-версия расписания (valid_to IS NULL) для группы или сотрудника,
+-- порядок совпадает с ORDER BY в ScheduleService._fetch_from_db_scd2.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_schedule_json_storage_group_current
+    ON schedule_json_storage (group_name, api_last_update_ts DESC NULLS LAST)
+    WHERE valid_to IS NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_schedule_json_storage_employee_current
+    ON schedule_json_storage (employee_id, api_last_update_ts DESC NULLS LAST)
+    WHERE valid_to IS NULL;
@@ -0,0 +1,5 @@
+-- Поиск по предметам (EventService.global_subject_search / search_events):
+-- полнотекстовый поиск по search_vector. Триграммные индексы для похожести
+-- по subject/subject_full - в необязательной миграции 0006 (нужно расширение pg_trgm).
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_schedule_events_search_vector_gin
+    ON schedule_events USING GIN (search_vector);
@@ -0,0 +1,12 @@
+-- Keyset-пагинация StructureService: ORDER BY (name COLLATE "C", id),
+-- следующая страница - диапазон индекса после ключа из курсора.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_student_groups_current_name_c_id
+    ON student_groups ((name COLLATE "C"), id)
+    WHERE valid_to IS NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_student_groups_current_specialty_name_c_id
+    ON student_groups (specialty_id, (name COLLATE "C"), id)
+    WHERE valid_to IS NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_auditories_name_c_id
+    ON auditories ((name COLLATE "C"), id);
@@ -0,0 +1,11 @@
+-- optional
+-- Триграммная похожесть и ILIKE по subject/subject_full (EventService._subject_match).
+-- Для CREATE EXTENSION нужны права владельца БД: без них миграция пропускается,
+-- а поиск по предметам работает через search_vector и ILIKE без индекса.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_schedule_events_subject_trgm
+    ON schedule_events USING GIN (subject gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_schedule_events_subject_full_trgm
+    ON schedule_events USING GIN (subject_full gin_trgm_ops);
@@ -0,0 +1,197 @@
+"""
+Пул соединений с инструментированием: время ожидания соединения,
+число выданных соединений, выход за pool_size (overflow), таймауты,
+инвалидации и проверка соединений (pre-ping).
+
+Время ожидания измеряется в InstrumentedPool._do_get (это единственное место,
+где пул ждёт свободное соединение) без времени открытия новых соединений:
+оно учитывается отдельно (connect), чтобы метрика ожидания показывала только
+нехватку соединений в пуле. Остальное - через события пула SQLAlchemy.
+"""
+import logging
+import time
+from bisect import bisect_left
+from typing import Any, Literal
+
+from sqlalchemy import event
+from sqlalchemy.exc import DisconnectionError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+logger = logging.getLogger(__name__)
+
+PrePing = Literal["always", "idle", "never"]
+
+# Границы гистограммы времени ожидания соединения, секунды
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_CHECKIN_AT = "checkin_at"
+_CONNECT_SECONDS = "connect_seconds"
+
+
+class PoolStats:
+    """
+    Счётчики одного пула (один экземпляр на движок, переживает engine.dispose()).
+    """
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.overflow_connects = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.pings = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+
+        self.wait_count = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        # wait_buckets[i] - число ожиданий не дольше WAIT_BUCKETS[i], последний - дольше всех границ
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+
+        # Открытие новых соединений при выдаче (в том числе сверх pool_size)
+        self.connect_count = 0
+        self.connect_sum = 0.0
+        self.connect_max = 0.0
+
+    def record_connect(self, seconds: float) -> None:
+        self.connect_count += 1
+        self.connect_sum += seconds
+        self.connect_max = max(self.connect_max, seconds)
+
+    def record_wait(self, seconds: float) -> None:
+        self.wait_count += 1
+        self.wait_sum += seconds
+        self.wait_max = max(self.wait_max, seconds)
+        self.wait_buckets[bisect_left(WAIT_BUCKETS, seconds)] += 1
+
+    def snapshot(self, pool: Any = None) -> dict[str, Any]:
+        stats: dict[str, Any] = {
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "connects": self.connects,
+            "overflow_connects": self.overflow_connects,
+            "timeouts": self.timeouts,
+            "invalidations": self.invalidations,
+            "pings": self.pings,
+            "checked_out": self.checked_out,
+            "max_checked_out": self.max_checked_out,
+            "wait": {
+                "count": self.wait_count,
+                "avg_ms": round(self.wait_sum / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+                "max_ms": round(self.wait_max * 1000, 3),
+                "buckets": {
+                    **{f"le_{bound}": count for bound, count in zip(WAIT_BUCKETS, self.wait_buckets)},
+                    "le_inf": self.wait_buckets[-1],
+                },
+            },
+            "connect": {
+                "count": self.connect_count,
+                "avg_ms": round(self.connect_sum / self.connect_count * 1000, 3) if self.connect_count else 0.0,
+                "max_ms": round(self.connect_max * 1000, 3),
+            },
+        }
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            stats["pool"] = {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            }
+        return stats
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool, который замеряет ожидание свободного соединения
+    и отдельно - открытие новых соединений.
+    """
+
+    stats: PoolStats | None = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            if self.stats is not None:
+                self.stats.timeouts += 1
+            raise
+        elapsed = time.perf_counter() - start
+        # Соединение открыто в этом вызове: время подключения не относится к ожиданию очереди
+        connect_seconds = record.info.pop(_CONNECT_SECONDS, None)
+        if self.stats is not None:
+            if connect_seconds is not None:
+                self.stats.record_connect(connect_seconds)
+                elapsed = max(elapsed - connect_seconds, 0.0)
+            self.stats.record_wait(elapsed)
+        return record
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        record = super()._create_connection()
+        record.info[_CONNECT_SECONDS] = time.perf_counter() - start
+        return record
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def instrument_pool(engine: AsyncEngine, pre_ping: PrePing = "always", pre_ping_idle: float = 30.0) -> PoolStats:
+    """
+    Подключает счётчики к пулу движка.
+    :param pre_ping: "idle" - проверять соединение при выдаче, только если оно
+        простаивало дольше pre_ping_idle секунд ("always" - средствами SQLAlchemy)
+    """
+    sync_engine = engine.sync_engine
+    stats = PoolStats()
+    if isinstance(sync_engine.pool, InstrumentedPool):
+        sync_engine.pool.stats = stats
+
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        stats.connects += 1
+        pool = sync_engine.pool
+        if isinstance(pool, AsyncAdaptedQueuePool) and pool.overflow() > 0:
+            stats.overflow_connects += 1
+
+    @event.listens_for(sync_engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        if pre_ping == "idle":
+            checkin_at = connection_record.info.get(_CHECKIN_AT)
+            if checkin_at is not None and time.monotonic() - checkin_at > pre_ping_idle:
+                stats.pings += 1
+                try:
+                    alive = sync_engine.dialect.do_ping(dbapi_connection)
+                except Exception:
+                    alive = False
+                if not alive:
+                    # Пул выбросит это соединение и возьмёт другое
+                    raise DisconnectionError("Connection failed idle pre-ping")
+
+        stats.checkouts += 1
+        stats.checked_out += 1
+        stats.max_checked_out = max(stats.max_checked_out, stats.checked_out)
+
+    @event.listens_for(sync_engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        stats.checkins += 1
+        stats.checked_out = max(stats.checked_out - 1, 0)
+        connection_record.info[_CHECKIN_AT] = time.monotonic()
+
+    @event.listens_for(sync_engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        stats.invalidations += 1
+
+    return stats
+
+
+def pool_stats(engine: AsyncEngine) -> dict[str, Any] | None:
+    pool = engine.sync_engine.pool
+    stats = getattr(pool, "stats", None)
+    return stats.snapshot(pool) if stats is not None else None
@@ -0,0 +1,46 @@
+"""
+Учёт SQL-запросов через события движка: число и время выполнения
+(before/after_cursor_execute), ошибки (handle_error) и журнал медленных запросов.
+"""
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.metrics import DB_QUERIES, DB_QUERY_DURATION
+from app.core.request_context import current_origin
+from app.db.slow_queries import SlowQueryLog
+
+# Ключ в Connection.info: стек времён начала (курсоры могут выполняться вложенно)
+_QUERY_START = "query_start"
+
+
+def instrument_queries(engine: AsyncEngine, slow_query_log: SlowQueryLog | None = None) -> None:
+    sync_engine = engine.sync_engine
+    if slow_query_log is not None:
+        slow_query_log.bind(engine)
+    slow_threshold = slow_query_log.threshold if slow_query_log is not None else None
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_QUERY_START, []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get(_QUERY_START)
+        if starts:
+            duration = time.perf_counter() - starts.pop()
+            DB_QUERY_DURATION.observe(duration)
+            # Собственные EXPLAIN журнала не считаются медленными запросами
+            if slow_threshold is not None and duration >= slow_threshold and not statement.startswith("EXPLAIN"):
+                slow_query_log.record(statement, parameters, duration, current_origin())  # type: ignore[union-attr]
+        DB_QUERIES.inc("ok")
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and exception_context.cursor is not None:
+            starts = conn.info.get(_QUERY_START)
+            if starts:
+                starts.pop()
+        DB_QUERIES.inc("error")
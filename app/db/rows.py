@@ -0,0 +1,133 @@
+"""
+Построение моделей ответов из строк нашей собственной схемы без валидации.
+
+Типы колонок уже совпадают с полями моделей, поэтому полная валидация
+Pydantic для каждой строки - лишняя работа. model_construct тоже не подходит:
+в pydantic 2.x он на каждый вызов разбирает default_factory и оказывается
+медленнее валидации. RowMapper один раз вычисляет поля и значения
+по умолчанию модели и создаёт экземпляры напрямую, как model_construct.
+
+Для отладки валидация включается настройкой DB_VALIDATE_ROWS.
+"""
+from typing import Any, Callable, Generic, Iterable, Mapping, Type, TypeVar
+
+from pydantic import BaseModel
+
+
+M = TypeVar("M", bound=BaseModel)
+
+_validate_rows = False
+
+# Источник значения поля в плане построения
+_FROM_ROW, _FROM_VALUES, _FROM_DEFAULT, _FROM_FACTORY = range(4)
+
+_Plan = tuple[tuple[str, int, Any], ...]
+
+
+def set_row_validation(enabled: bool) -> None:
+    global _validate_rows
+    _validate_rows = enabled
+
+
+class RowMapper(Generic[M]):
+    """
+    Строка (RowMapping, dict) -> модель. Лишние колонки отбрасываются,
+    отсутствующие поля со значением по умолчанию заполняются им.
+    Если для обязательного поля нет ни колонки, ни вычисленного значения -
+    запрос не соответствует модели (KeyError).
+    """
+
+    __slots__ = ("model", "_fields", "_defaults", "_factories")
+
+    def __init__(self, model: Type[M]):
+        self.model = model
+        self._fields = tuple(model.model_fields)
+        self._defaults: dict[str, Any] = {}
+        self._factories: dict[str, Callable[[], Any]] = {}
+        for name, field in model.model_fields.items():
+            if field.default_factory is not None:
+                self._factories[name] = field.default_factory  # type: ignore[assignment]
+            elif not field.is_required():
+                self._defaults[name] = field.default
+
+    def __call__(self, row: Mapping[str, Any], **values: Any) -> M:
+        """
+        :param values: вычисленные поля, которых нет в строке
+        """
+        return self._build(row, self._plan(row.keys(), values.keys()), values)
+
+    def many(
+        self,
+        rows: Iterable[Mapping[str, Any]],
+        compute: Callable[[Mapping[str, Any]], dict[str, Any]] | None = None,
+    ) -> list[M]:
+        """
+        Строки одного запроса: набор колонок определяется один раз по первой строке.
+        :param compute: вычисляет для строки поля, которых в ней нет
+        """
+        result: list[M] = []
+        plan = None
+        for row in rows:
+            values = compute(row) if compute is not None else {}
+            if plan is None:
+                plan = self._plan(row.keys(), values.keys())
+            result.append(self._build(row, plan, values))
+        return result
+
+    def from_attributes(self, obj: Any, **values: Any) -> M:
+        """
+        Объект с атрибутами (запись снимка, другая модель) -> модель.
+        """
+        data = {name: getattr(obj, name) for name in self._fields if name not in values and hasattr(obj, name)}
+        return self._build(data, self._plan(data.keys(), values.keys()), values)
+
+    def _plan(self, row_keys: Iterable[str], value_keys: Iterable[str] = ()) -> _Plan:
+        """
+        Для каждого поля модели в порядке объявления - откуда брать значение:
+        values, строка, значение по умолчанию или фабрика.
+        """
+        row_keys = set(row_keys)
+        values = set(value_keys)
+        plan: list[tuple[str, int, Any]] = []
+        missing: list[str] = []
+        for name in self._fields:
+            if name in values:
+                plan.append((name, _FROM_VALUES, None))
+            elif name in row_keys:
+                plan.append((name, _FROM_ROW, None))
+            elif name in self._defaults:
+                plan.append((name, _FROM_DEFAULT, self._defaults[name]))
+            elif name in self._factories:
+                plan.append((name, _FROM_FACTORY, self._factories[name]))
+            else:
+                missing.append(name)
+
+        if missing and not _validate_rows:
+            raise KeyError(f"{self.model.__name__}: no column for required field(s) {', '.join(missing)}")
+        return tuple(plan)
+
+    def _build(self, row: Mapping[str, Any], plan: _Plan, values: dict[str, Any]) -> M:
+        if _validate_rows:
+            data = {name: row[name] for name, source, _ in plan if source == _FROM_ROW}
+            data.update(values)
+            return self.model.model_validate(data)
+
+        # Порядок ключей __dict__ - порядок полей модели: от него зависит
+        # порядок ключей в model_dump и model_dump_json
+        data = {}
+        for name, source, extra in plan:
+            if source == _FROM_ROW:
+                data[name] = row[name]
+            elif source == _FROM_VALUES:
+                data[name] = values[name]
+            elif source == _FROM_DEFAULT:
+                data[name] = extra
+            else:
+                data[name] = extra()
+
+        obj = self.model.__new__(self.model)
+        object.__setattr__(obj, "__dict__", data)
+        object.__setattr__(obj, "__pydantic_fields_set__", set(data))
+        object.__setattr__(obj, "__pydantic_extra__", None)
+        object.__setattr__(obj, "__pydantic_private__", None)
+        return obj
@@ -1,5 +1,106 @@
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from typing import Any, Awaitable, Protocol
 
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncResult, create_async_engine
 
-def create_engine(database_url: str) -> AsyncEngine:
-    return create_async_engine(database_url, pool_pre_ping=True)
+from app.core.config import Settings
+from app.db.pool import InstrumentedPool, instrument_pool
+from app.db.query_events import instrument_queries
+from app.db.slow_queries import SlowQueryLog
+
+
+def create_engine(
+    database_url: str,
+    settings: Settings | None = None,
+    slow_query_log: SlowQueryLog | None = None,
+) -> AsyncEngine:
+    """
+    Без settings - пул SQLAlchemy по умолчанию с pre-ping при каждой выдаче соединения.
+    Статистика пула: app.db.pool.pool_stats(engine), запросы - метрики db_query_*.
+    """
+    if settings is None:
+        engine = create_async_engine(database_url, pool_pre_ping=True, poolclass=InstrumentedPool)
+        instrument_pool(engine)
+        instrument_queries(engine)
+        return engine
+
+    engine = create_async_engine(
+        database_url,
+        poolclass=InstrumentedPool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping == "always",
+        connect_args={"statement_cache_size": settings.db_statement_cache_size},
+    )
+    instrument_pool(engine, settings.db_pool_pre_ping, settings.db_pool_pre_ping_idle)
+    instrument_queries(engine, slow_query_log)
+    return engine
+
+
+class DbConnection(Protocol):
+    """
+    Соединение, с которым работают сервисы: AsyncConnection или LazyConnection.
+    """
+
+    @property
+    def engine(self) -> AsyncEngine: ...
+
+    async def execute(
+        self, statement: Any, parameters: Any = None, *, execution_options: Any = None
+    ) -> CursorResult[Any]: ...
+
+    # AsyncConnection.stream - не корутина, а ожидаемый контекстный менеджер
+    def stream(
+        self, statement: Any, parameters: Any = None, *, execution_options: Any = None
+    ) -> Awaitable[AsyncResult[Any]]: ...
+
+
+class LazyConnection:
+    """
+    Соединение, которое берётся из пула только при первом запросе к БД.
+    Нужно сервисам с кэшем: попадание в кэш не должно занимать соединение
+    и делать pre-ping.
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self._engine = engine
+        self._conn: AsyncConnection | None = None
+
+    @property
+    def engine(self) -> AsyncEngine:
+        return self._engine
+
+    async def connection(self) -> AsyncConnection:
+        if self._conn is None:
+            try:
+                self._conn = await self._engine.connect()
+            except OSError as exc:
+                # Как и get_db_conn: недоступная БД - это 503, а не 500
+                raise OperationalError(None, None, exc) from exc
+        return self._conn
+
+    async def execute(
+        self, statement: Any, parameters: Any = None, *, execution_options: Any = None
+    ) -> CursorResult[Any]:
+        conn = await self.connection()
+        return await conn.execute(statement, parameters, execution_options=execution_options)
+
+    async def stream(
+        self, statement: Any, parameters: Any = None, *, execution_options: Any = None
+    ) -> AsyncResult[Any]:
+        conn = await self.connection()
+        return await conn.stream(statement, parameters, execution_options=execution_options)
+
+    async def __aenter__(self) -> "LazyConnection":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            await conn.close()
@@ -0,0 +1,116 @@
+"""
+Журнал медленных SQL-запросов.
+
+Запросы дольше порога пишутся в лог вместе с источником (маршрут REST или
+инструмент MCP) и в кольцевой буфер (GET /system/slow-queries). Для доли
+медленных SELECT в фоне снимается EXPLAIN (ANALYZE, BUFFERS): запрос
+выполняется повторно на отдельном соединении в read-only транзакции
+(кроме SELECT с побочными эффектами, см. _NOT_EXPLAINABLE),
+одновременно не больше одного такого замера.
+"""
+import asyncio
+import logging
+import random
+import re
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+logger = logging.getLogger(__name__)
+
+# Ограничения на размер записи в буфере
+MAX_STATEMENT_CHARS = 4000
+MAX_PARAMETERS_CHARS = 1000
+
+# Таймаут повторного выполнения запроса под EXPLAIN ANALYZE
+EXPLAIN_TIMEOUT_MS = 10_000
+
+# SELECT с побочными эффектами, которые не откатываются вместе с read-only транзакцией
+# (advisory-блокировки, уведомления, последовательности, настройки сессии), и блокировки строк
+_NOT_EXPLAINABLE = re.compile(
+    r"\b(pg_(try_)?advisory\w*|pg_notify|nextval|setval|set_config|pg_sleep\w*|"
+    r"pg_cancel_backend|pg_terminate_backend|dblink\w*|lo_\w+)\s*\(|\bfor\s+(update|share|no\s+key|key)\b",
+    re.IGNORECASE,
+)
+
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms: float, explain_sample_rate: float = 0.0, buffer_size: int = 100):
+        self.threshold = threshold_ms / 1000
+        self.explain_sample_rate = explain_sample_rate
+        self.entries: deque[dict[str, Any]] = deque(maxlen=buffer_size)
+        self.total = 0
+        self._engine: AsyncEngine | None = None
+        self._explaining = False
+        self._tasks: set[asyncio.Task] = set()
+
+    def bind(self, engine: AsyncEngine) -> None:
+        """
+        Движок, на котором снимаются планы.
+        """
+        self._engine = engine
+
+    def record(self, statement: str, parameters: Any, duration: float, origin: str | None) -> None:
+        """
+        Вызывается из after_cursor_execute (синхронно, в потоке event loop).
+        """
+        self.total += 1
+        logger.warning("Slow query %.1f ms [%s]: %s", duration * 1000, origin or "-", " ".join(statement.split()))
+
+        entry: dict[str, Any] = {
+            "at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "duration_ms": round(duration * 1000, 3),
+            "origin": origin,
+            "statement": statement[:MAX_STATEMENT_CHARS],
+            "parameters": repr(parameters)[:MAX_PARAMETERS_CHARS],
+            "plan": None,
+        }
+        self.entries.append(entry)
+
+        if self._should_explain(statement):
+            self._explaining = True
+            try:
+                task = asyncio.get_running_loop().create_task(self._explain(entry, statement, parameters))
+            except RuntimeError:
+                self._explaining = False
+                return
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "explain_sample_rate": self.explain_sample_rate,
+            "total": self.total,
+            "entries": list(reversed(self.entries)),
+        }
+
+    def _should_explain(self, statement: str) -> bool:
+        if self._engine is None or self._explaining or self.explain_sample_rate <= 0:
+            return False
+        # EXPLAIN ANALYZE выполняет запрос: изменяющие данные команды не повторяем
+        if not statement.lstrip()[:6].upper() == "SELECT":
+            return False
+        if _NOT_EXPLAINABLE.search(statement):
+            return False
+        return random.random() < self.explain_sample_rate
+
+    async def _explain(self, entry: dict[str, Any], statement: str, parameters: Any) -> None:
+        try:
+            async with self._engine.connect() as conn:  # type: ignore[union-attr]
+                await conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+                await conn.exec_driver_sql(f"SET LOCAL statement_timeout = {EXPLAIN_TIMEOUT_MS}")
+                result = await conn.exec_driver_sql(
+                    "EXPLAIN (ANALYZE, BUFFERS) " + statement,
+                    tuple(parameters) if isinstance(parameters, (list, tuple)) else parameters,
+                )
+                entry["plan"] = "\n".join(row[0] for row in result.all())
+                await conn.rollback()
+        except Exception as exc:
+            entry["plan_error"] = str(exc)
+            logger.debug("EXPLAIN of slow query failed", exc_info=True)
+        finally:
+            self._explaining = False
@@ -1,4 +1,5 @@
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager, suppress
+import asyncio
 import logging
 
 from fastapi import FastAPI
@@ -6,8 +7,17 @@ from fastapi import FastAPI
 from app.api.router import api_router
 from app.core.config import Settings
 from app.core.errors import setup_exception_handlers
+from app.core.metrics import MetricsMiddleware
+from app.core.serialization import FastJSONResponse
+from app.db.migrate import apply_migrations
+from app.db.rows import set_row_validation
 from app.db.session import create_engine
-from app.services.cache_service import create_redis_client
+from app.db.slow_queries import SlowQueryLog
+from app.services.cache_service import LocalCache, SingleFlight, create_redis_client
+from app.services.generation_service import DataGeneration, listen_generation_changes, load_generation
+from app.services.employee_index import EmployeeIndex
+from app.services.occupancy_engine import OccupancyEngine
+from app.services.structure_snapshot import StructureSnapshot
 
 logger = logging.getLogger(__name__)
 
@@ -17,33 +27,94 @@ async def lifespan(app: FastAPI):
     settings = Settings()
 
     app.state.settings = settings
-    app.state.db_engine = create_engine(str(settings.database_url))
+    set_row_validation(settings.db_validate_rows)
+    app.state.slow_query_log = (
+        SlowQueryLog(
+            settings.slow_query_threshold_ms,
+            settings.slow_query_explain_sample_rate,
+            settings.slow_query_buffer_size,
+        )
+        if settings.slow_query_log_enabled
+        else None
+    )
+    app.state.db_engine = create_engine(str(settings.database_url), settings, app.state.slow_query_log)
+
+    if settings.db_apply_migrations:
+        try:
+            applied = await apply_migrations(app.state.db_engine)
+            if applied:
+                logger.info("Applied migrations: %s", ", ".join(applied))
+        except Exception:
+            logger.exception("Failed to apply migrations")
     app.state.redis = create_redis_client(settings.redis_host, settings.redis_port)
+    app.state.redis_binary = create_redis_client(settings.redis_host, settings.redis_port, decode_responses=False)
+    app.state.local_cache = LocalCache(settings.local_cache_max_bytes, settings.local_cache_ttl)
+    app.state.single_flight = SingleFlight()
+
+    generation = DataGeneration(await load_generation(app.state.db_engine, app.state.redis))
+    generation.subscribe(lambda _: app.state.local_cache.clear())
+    app.state.generation = generation
+
+    app.state.occupancy_engine = (
+        OccupancyEngine(generation, settings.snapshot_max_age, settings.occupancy_slot_minutes)
+        if settings.occupancy_engine_enabled else None
+    )
+    app.state.employee_index = (
+        EmployeeIndex(generation, settings.snapshot_max_age)
+        if settings.employee_index_enabled else None
+    )
+    app.state.structure_snapshot = (
+        StructureSnapshot(generation, settings.snapshot_max_age)
+        if settings.structure_snapshot_enabled else None
+    )
+
+    snapshots = [
+        s for s in (app.state.occupancy_engine, app.state.employee_index, app.state.structure_snapshot)
+        if s is not None
+    ]
+    for snapshot in snapshots:
+        snapshot.preload(app.state.db_engine)
+        generation.subscribe(lambda _, s=snapshot: s.preload(app.state.db_engine))
+
+    generation_listener = asyncio.create_task(
+        listen_generation_changes(
+            app.state.db_engine, app.state.redis, generation, settings.generation_poll_interval
+        )
+    )
 
     try:
-        try:
-            from app.mcp_server.mount import mount_mcp
+        async with AsyncExitStack() as mcp_stack:
+            try:
+                from app.mcp_server.mount import mount_mcp
 
-            mount_mcp(app)
-        except ModuleNotFoundError as exc:
-            missing = exc.name or ""
-            if missing == "mcp" or missing.startswith("mcp.") or missing == "sse_starlette":
-                logger.warning("MCP dependencies are missing; /mcp endpoints will be disabled")
-            else:
-                raise
-        yield
+                session_manager = mount_mcp(app)
+                if session_manager is not None:
+                    await mcp_stack.enter_async_context(session_manager.run())
+            except ModuleNotFoundError as exc:
+                missing = exc.name or ""
+                if missing == "mcp" or missing.startswith("mcp.") or missing == "sse_starlette":
+                    logger.warning("MCP dependencies are missing; /mcp endpoints will be disabled")
+                else:
+                    raise
+            yield
     finally:
-        aclose = getattr(app.state.redis, "aclose", None)
-        if callable(aclose):
-            aclose()
-        else:
-            await app.state.redis.close()
-            
+        generation_listener.cancel()
+        with suppress(asyncio.CancelledError):
+            await generation_listener
+
+        for client in (app.state.redis, app.state.redis_binary):
+            aclose = getattr(client, "aclose", None)
+            if callable(aclose):
+                await aclose()
+            else:
+                await client.close()
+
         await app.state.db_engine.dispose()
 
 
-app = FastAPI(title="bsuir-mcp-api", lifespan=lifespan)
+app = FastAPI(title="bsuir-mcp-api", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 setup_exception_handlers(app)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(api_router)
\ No newline at end of file
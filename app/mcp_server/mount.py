@@ -7,6 +7,7 @@ from starlette.requests import Request
 from starlette.responses import PlainTextResponse, Response
 from starlette.routing import Mount, Route
 
+from app.core.metrics import MCP_SSE_SESSIONS
 from app.mcp_server.server import create_mcp_server
 
 
@@ -32,27 +33,65 @@ class McpSecurityMiddleware:
         return await self._app(scope, receive, send)
 
 
-def mount_mcp(app: FastAPI) -> None:
+class StreamableHTTPEndpoint:
+    """
+    ASGI-обработчик /mcp/http: каждый POST - отдельный запрос-ответ без сессии,
+    поэтому его может обслужить любой воркер за балансировщиком.
+    """
+
+    def __init__(self, session_manager):
+        self._session_manager = session_manager
+
+    async def __call__(self, scope, receive, send):
+        await self._session_manager.handle_request(scope, receive, send)
+
+
+def mount_mcp(app: FastAPI):
+    """
+    Подключает MCP к приложению:
+    /mcp/sse и /mcp/messages/ - SSE-транспорт (сервер создаётся на каждое подключение),
+    /mcp/http - streamable HTTP без состояния с JSON-ответами (один сервер на процесс).
+
+    Возвращает менеджер streamable HTTP (или None, если транспорт выключен);
+    его run() должен быть активен, пока приложение обслуживает запросы.
+    """
     from mcp.server.sse import SseServerTransport
+    from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
 
     sse = SseServerTransport("/messages/")
 
     async def handle_sse(request: Request):
         runtime = request.app.state.parent_fastapi.state
         mcp_server = create_mcp_server(runtime)
-        async with sse.connect_sse(request.scope, request.receive, request._send) as streams:  # type: ignore[attr-defined]
-            await mcp_server.run(streams[0], streams[1], mcp_server.create_initialization_options())
+        MCP_SSE_SESSIONS.inc()
+        try:
+            async with sse.connect_sse(request.scope, request.receive, request._send) as streams:  # type: ignore[attr-defined]
+                await mcp_server.run(streams[0], streams[1], mcp_server.create_initialization_options())
+        finally:
+            MCP_SSE_SESSIONS.dec()
         return Response()
 
-    starlette_app = Starlette(
-        routes=[
-            Route("/sse", endpoint=handle_sse, methods=["GET"]),
-            Mount("/messages/", app=sse.handle_post_message),
-        ]
-    )
+    settings = app.state.settings
+
+    routes = [
+        Route("/sse", endpoint=handle_sse, methods=["GET"]),
+        Mount("/messages/", app=sse.handle_post_message),
+    ]
+
+    session_manager = None
+    if settings.mcp_streamable_http_enabled:
+        session_manager = StreamableHTTPSessionManager(
+            app=create_mcp_server(app.state),
+            stateless=True,
+            json_response=True,
+        )
+        routes.append(
+            Route("/http", endpoint=StreamableHTTPEndpoint(session_manager), methods=["GET", "POST", "DELETE"])
+        )
+
+    starlette_app = Starlette(routes=routes)
 
     starlette_app.state.parent_fastapi = app
-    settings = app.state.settings
 
     token_value = settings.mcp_auth_token.get_secret_value() if settings.mcp_auth_token else None
     
@@ -65,4 +104,5 @@ def mount_mcp(app: FastAPI) -> None:
     )
 
     app.mount("/mcp", secured)
+    return session_manager
 
@@ -1,7 +1,11 @@
 from __future__ import annotations
+import asyncio
+import hashlib
 import json
+import logging
+import time
 from dataclasses import dataclass
-from typing import Any, Awaitable, Callable, Type
+from typing import Any, Awaitable, Callable, Literal, Type
 
 from pydantic import BaseModel
 import mcp.types as types
@@ -9,6 +13,25 @@ from sqlalchemy.ext.asyncio import AsyncEngine
 from redis.asyncio import Redis
 
 from app.core.config import Settings
+from app.core.metrics import MCP_TOOL_CALLS, MCP_TOOL_DURATION, MCP_TOOL_RESULT_SIZE
+from app.core.request_context import reset_origin, set_origin
+from app.core.redis_keys import RedisKeys
+from app.core.serialization import dump_json
+from app.services.cache_service import LocalCache, SingleFlight
+from app.services.generation_service import DataGeneration
+from app.services.employee_index import EmployeeIndex
+from app.services.occupancy_engine import OccupancyEngine
+from app.services.structure_snapshot import StructureSnapshot
+
+
+logger = logging.getLogger(__name__)
+
+
+def _text_size(text: str) -> int:
+    """
+    Размер строки для бюджета L1-кэша в байтах: кириллица в UTF-8 занимает 2 байта на символ.
+    """
+    return len(text.encode())
 
 
 @dataclass
@@ -17,14 +40,39 @@ class ToolContext:
     db_engine: AsyncEngine
     redis: Redis
     settings: Settings
+    redis_binary: Redis | None = None
+    local_cache: LocalCache | None = None
+    single_flight: SingleFlight | None = None
+    generation: DataGeneration | None = None
+    occupancy_engine: OccupancyEngine | None = None
+    employee_index: EmployeeIndex | None = None
+    structure_snapshot: StructureSnapshot | None = None
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    Кэширование результата инструмента (уже сериализованного текста).
+    ttl: время жизни в секундах;
+    scope: "local" - L1-кэш процесса, "redis" - L1 и общий для воркеров Redis;
+    key: нормализация аргументов для ключа (по умолчанию все непустые поля модели).
+    Ключ включает поколение данных, поэтому после загрузки ETL кэш не используется.
+    """
+    ttl: float
+    scope: Literal["local", "redis"] = "local"
+    key: Callable[[Any], Any] | None = None
+
 
 class ToolRegistry:
     def __init__(self):
         self._tools_metadata: list[types.Tool] = []
         self._handlers: dict[str, Callable[..., Awaitable[Any]]] = {}
         self._arg_models: dict[str, Type[BaseModel]] = {}
+        self._cache_policies: dict[str, CachePolicy] = {}
+        # name -> {"hits": n, "misses": n}
+        self._cache_counters: dict[str, dict[str, int]] = {}
 
-    def tool(self, name: str, description: str, args_model: Type[BaseModel]):
+    def tool(self, name: str, description: str, args_model: Type[BaseModel], cache: CachePolicy | None = None):
         def decorator(func):
             # 1. Генерируем JSON Schema из Pydantic модели
             schema = args_model.model_json_schema()
@@ -41,6 +89,9 @@ class ToolRegistry:
             )
             self._handlers[name] = func
             self._arg_models[name] = args_model
+            if cache is not None:
+                self._cache_policies[name] = cache
+                self._cache_counters[name] = {"hits": 0, "misses": 0}
             return func
         return decorator
 
@@ -75,17 +126,31 @@ class ToolRegistry:
                 if "title" in prop_def:
                     del prop_def["title"]
 
-        # Если есть определения ($defs), их тоже надо почистить (обычно Pydantic инлайнит, но на всякий случай)
+        # Вложенные модели (например, элементы списка) Pydantic выносит в $defs - подставляем их на место ссылок
         if "$defs" in new_schema:
-            del new_schema["$defs"]
+            new_schema = self._inline_refs(new_schema, new_schema.pop("$defs"))
 
         return new_schema
 
+    def _inline_refs(self, node: Any, defs: dict[str, Any]) -> Any:
+        if isinstance(node, list):
+            return [self._inline_refs(item, defs) for item in node]
+        if not isinstance(node, dict):
+            return node
+
+        ref = node.get("$ref")
+        if isinstance(ref, str) and ref.startswith("#/$defs/"):
+            target = dict(defs.get(ref.rsplit("/", 1)[-1], {}))
+            target.pop("title", None)
+            return self._inline_refs(target, defs)
+
+        return {key: self._inline_refs(value, defs) for key, value in node.items()}
+
     @property
     def tools(self) -> list[types.Tool]:
         return self._tools_metadata
 
-    async def call(self, name: str, arguments: dict[str, Any], context: ToolContext) -> list[types.ContentBlock]:
+    def _prepare(self, name: str, arguments: dict[str, Any]) -> tuple[Callable[..., Awaitable[Any]], BaseModel]:
         handler = self._handlers.get(name)
         model = self._arg_models.get(name)
 
@@ -98,19 +163,151 @@ class ToolRegistry:
         except Exception as e:
             raise ValueError(f"Invalid arguments for tool {name}: {e}")
 
+        return handler, validated_args
+
+    async def call(self, name: str, arguments: dict[str, Any], context: ToolContext) -> list[types.ContentBlock]:
+        handler, validated_args = self._prepare(name, arguments)
+
         try:
-            result = await handler(context, validated_args)
-            return [self._format_result(result)]
+            return [await self._run(name, handler, validated_args, context)]
         except Exception as e:
             return [types.TextContent(type="text", text=json.dumps({"error": str(e)}, ensure_ascii=False))]
 
-    def _format_result(self, value: Any) -> types.TextContent:
-        if isinstance(value, list) and value and hasattr(value[0], "model_dump"):
-            data = [item.model_dump(mode="json") for item in value]
-        elif hasattr(value, "model_dump"):
-            data = value.model_dump(mode="json")
+    async def _run(
+        self,
+        name: str,
+        handler: Callable[..., Awaitable[Any]],
+        validated_args: BaseModel,
+        context: ToolContext,
+    ) -> types.TextContent:
+        start = time.perf_counter()
+        outcome = "error"
+        token = set_origin(f"mcp:{name}")
+        try:
+            content = await self._run_cached(name, handler, validated_args, context)
+            outcome = "ok"
+        finally:
+            reset_origin(token)
+            MCP_TOOL_DURATION.observe(time.perf_counter() - start, name)
+            MCP_TOOL_CALLS.inc(name, outcome)
+        MCP_TOOL_RESULT_SIZE.observe(len(content.text), name)
+        return content
+
+    async def _run_cached(
+        self,
+        name: str,
+        handler: Callable[..., Awaitable[Any]],
+        validated_args: BaseModel,
+        context: ToolContext,
+    ) -> types.TextContent:
+        policy = self._cache_policies.get(name)
+        if policy is None:
+            return self._format_result(await handler(context, validated_args))
+
+        key = self._cache_key(name, policy, validated_args, context)
+        counters = self._cache_counters[name]
+
+        text = await self._cache_get(key, policy, context)
+        if text is not None:
+            counters["hits"] += 1
+            return types.TextContent(type="text", text=text)
+
+        counters["misses"] += 1
+        result = await handler(context, validated_args)
+        content = self._format_result(result)
+
+        # Ответы-ошибки ({"error": ...}) не кэшируются
+        if not (isinstance(result, dict) and "error" in result):
+            await self._cache_set(key, content.text, policy, context)
+        return content
+
+    def _cache_key(self, name: str, policy: CachePolicy, validated_args: BaseModel, context: ToolContext) -> str:
+        if policy.key is not None:
+            normalized = policy.key(validated_args)
         else:
-            data = value
-        return types.TextContent(type="text", text=json.dumps(data, ensure_ascii=False))
+            normalized = validated_args.model_dump(mode="json", exclude_none=True)
+        digest = hashlib.sha1(
+            json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str).encode()
+        ).hexdigest()
+        generation = context.generation.value if context.generation else None
+        return RedisKeys.with_generation(RedisKeys.tool_result(name, digest), generation)
+
+    async def _cache_get(self, key: str, policy: CachePolicy, context: ToolContext) -> str | None:
+        if context.local_cache is not None:
+            text = context.local_cache.get(key)
+            if text is not None:
+                return text
+
+        if policy.scope != "redis" or context.redis is None:
+            return None
+        try:
+            text = await context.redis.get(key)
+        except Exception:
+            logger.debug("Redis unavailable for tool cache key %s", key, exc_info=True)
+            return None
+
+        if text is not None and context.local_cache is not None:
+            context.local_cache.set(key, text, _text_size(text), policy.ttl)
+        return text
+
+    async def _cache_set(self, key: str, text: str, policy: CachePolicy, context: ToolContext) -> None:
+        if context.local_cache is not None:
+            context.local_cache.set(key, text, _text_size(text), policy.ttl)
+
+        if policy.scope != "redis" or context.redis is None:
+            return
+        try:
+            await context.redis.set(key, text, ex=max(1, int(policy.ttl)))
+        except Exception:
+            logger.debug("Failed to store tool cache key %s", key, exc_info=True)
+
+    def cache_stats(self) -> dict[str, dict[str, Any]]:
+        """
+        Попадания в кэш результатов по инструментам с политикой кэширования.
+        """
+        stats = {}
+        for name, counters in self._cache_counters.items():
+            total = counters["hits"] + counters["misses"]
+            stats[name] = {
+                **counters,
+                "hit_rate": round(counters["hits"] / total, 4) if total else 0.0,
+            }
+        return stats
+
+    async def call_batch(
+        self,
+        calls: list[tuple[str, dict[str, Any]]],
+        context: ToolContext,
+        *,
+        max_concurrency: int,
+    ) -> types.TextContent:
+        """
+        Выполняет несколько вызовов инструментов параллельно (не больше max_concurrency одновременно).
+        Результат - JSON-массив в порядке вызовов: {"name", "result"} или {"name", "error"}.
+        Ошибка одного вызова не влияет на остальные.
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run(name: str, arguments: dict[str, Any]) -> str:
+            head = '{"name":' + json.dumps(name, ensure_ascii=False)
+            try:
+                handler, validated_args = self._prepare(name, arguments)
+                async with semaphore:
+                    text = (await self._run(name, handler, validated_args, context)).text
+            except Exception as e:
+                return head + ',"error":' + json.dumps(str(e), ensure_ascii=False) + "}"
+            # Тексты результатов уже являются JSON, вставляем их без повторного разбора
+            return head + ',"result":' + text + "}"
+
+        items = await asyncio.gather(*(run(name, arguments) for name, arguments in calls))
+        return types.TextContent(type="text", text="[" + ",".join(items) + "]")
+
+    def _format_result(self, value: Any) -> types.TextContent:
+        if isinstance(value, types.TextContent):
+            return value
+        # Готовый JSON (например, расписание из кэша) передаётся без повторной сериализации
+        if isinstance(value, (bytes, bytearray)):
+            return types.TextContent(type="text", text=value.decode())
+        return types.TextContent(type="text", text=dump_json(value).decode())
 
 registry = ToolRegistry()
\ No newline at end of file
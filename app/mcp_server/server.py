@@ -10,6 +10,7 @@ import app.mcp_server.tools.schedule_tool
 import app.mcp_server.tools.structure_tool
 import app.mcp_server.tools.system_tool
 import app.mcp_server.tools.events_tool
+import app.mcp_server.tools.batch_tool
 
 
 def create_mcp_server(runtime) -> Server:
@@ -24,7 +25,14 @@ def create_mcp_server(runtime) -> Server:
         context = ToolContext(
             db_engine=runtime.db_engine,
             redis=runtime.redis,
-            settings=runtime.settings
+            settings=runtime.settings,
+            redis_binary=runtime.redis_binary,
+            local_cache=runtime.local_cache,
+            single_flight=runtime.single_flight,
+            generation=runtime.generation,
+            occupancy_engine=runtime.occupancy_engine,
+            employee_index=runtime.employee_index,
+            structure_snapshot=runtime.structure_snapshot,
         )
         
         return await registry.call(name, arguments, context)
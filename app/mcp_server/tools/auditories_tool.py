@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
+from app.db.session import LazyConnection
 from app.mcp_server.sdk import registry, ToolContext
 from app.services.auditory_service import AuditoryService
 
@@ -21,11 +22,59 @@ class AuditoriesFreeArgs(BaseModel):
     args_model=AuditoriesFreeArgs
 )
 async def handle_auditories_free(ctx: ToolContext, args: AuditoriesFreeArgs):
-    async with ctx.db_engine.connect() as conn:
-        service = AuditoryService(conn)
+    async with LazyConnection(ctx.db_engine) as conn:
+        service = AuditoryService(conn, ctx.occupancy_engine)
         return await service.get_free_auditories(
             day_of_week=args.day_of_week,
             week_number=args.week_number,
             time_str=args.time,
             building_number=args.building_number
+        )
+
+
+class AuditoriesFreeWindowsArgs(BaseModel):
+    day_of_week: str = Field(..., description="День недели полное название (например: 'Понедельник', 'Вторник')")
+    week_number: int = Field(..., ge=1, le=4, description="Номер учебной недели (1-4). Получите через system_current_week.")
+    start: str = Field(..., pattern=r"^\d{2}:\d{2}$", description="Начало интервала или время, с которого искать окно (ЧЧ:ММ)")
+    end: str | None = Field(None, pattern=r"^\d{2}:\d{2}$", description=(
+        "Конец интервала (ЧЧ:ММ). Если указан, вернутся аудитории, свободные весь интервал [start, end)."
+    ))
+    min_minutes: int | None = Field(None, ge=1, description=(
+        "Минимальная длина окна в минутах. Если указан (без end), вернётся ближайшее свободное окно каждой аудитории, начиная с start."
+    ))
+    building_number: int | None = Field(None, description="Номер учебного корпуса (опционально)")
+    min_capacity: int | None = Field(None, ge=1, description="Минимальная вместимость аудитории (опционально)")
+    limit: int = Field(50, ge=1, le=500, description="Максимальное количество аудиторий в ответе")
+
+    @model_validator(mode='after')
+    def check_args(self):
+        if not self.end and not self.min_minutes:
+            raise ValueError("Нужно указать 'end' (интервал) или 'min_minutes' (длина окна).")
+        return self
+
+
+@registry.tool(
+    name="auditories_free_windows",
+    description=(
+        "Поиск свободных окон в аудиториях за ОДИН вызов. "
+        "С параметром end: аудитории, свободные на весь интервал (например, на всю пару 10:05-11:30). "
+        "С параметром min_minutes: ближайшее свободное окно нужной длины, начиная со start "
+        "('где найти аудиторию на час после 13:00?'). "
+        "Поддерживает фильтр по корпусу и минимальной вместимости. "
+        "Используйте вместо многократных вызовов auditories_free."
+    ),
+    args_model=AuditoriesFreeWindowsArgs
+)
+async def handle_auditories_free_windows(ctx: ToolContext, args: AuditoriesFreeWindowsArgs):
+    async with LazyConnection(ctx.db_engine) as conn:
+        service = AuditoryService(conn, ctx.occupancy_engine)
+        return await service.find_free_windows(
+            day_of_week=args.day_of_week,
+            week_number=args.week_number,
+            start_str=args.start,
+            end_str=args.end,
+            min_minutes=args.min_minutes,
+            building_number=args.building_number,
+            min_capacity=args.min_capacity,
+            limit=args.limit,
         )
\ No newline at end of file
@@ -0,0 +1,37 @@
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from app.mcp_server.sdk import registry, ToolContext
+
+
+class BatchCall(BaseModel):
+    name: str = Field(..., description="Имя инструмента (например, 'system_current_week')")
+    arguments: dict[str, Any] = Field(default_factory=dict, description="Аргументы инструмента")
+
+
+class BatchArgs(BaseModel):
+    calls: list[BatchCall] = Field(..., min_length=1, description="Список независимых вызовов инструментов")
+
+
+@registry.tool(
+    name="batch",
+    description=(
+        "Выполняет несколько НЕЗАВИСИМЫХ вызовов инструментов за один запрос. "
+        "Используйте, когда аргументы следующего вызова не зависят от результата предыдущего "
+        "(например, текущая неделя, расписание группы и информация о группе одновременно). "
+        "Возвращает массив результатов в том же порядке: {name, result} или {name, error}."
+    ),
+    args_model=BatchArgs
+)
+async def handle_batch(ctx: ToolContext, args: BatchArgs):
+    if len(args.calls) > ctx.settings.mcp_batch_max_calls:
+        return {"error": f"Слишком много вызовов в пакете: максимум {ctx.settings.mcp_batch_max_calls}."}
+
+    calls = []
+    for call in args.calls:
+        if call.name == "batch":
+            return {"error": "Вложенный вызов batch не поддерживается."}
+        calls.append((call.name, call.arguments))
+
+    return await registry.call_batch(calls, ctx, max_concurrency=ctx.settings.mcp_batch_concurrency)
@@ -1,7 +1,14 @@
 from pydantic import BaseModel, Field, model_validator
 
+from app.core.pagination import MAX_PAGE_SIZE, clamp_page_size
+from app.db.session import LazyConnection
 from app.mcp_server.sdk import registry, ToolContext
 from app.services.employee_service import EmployeeService
+from app.services.structure_service import StructureService
+
+
+# Сколько совпадений по ФИО возвращать, если limit не указан
+DEFAULT_SEARCH_LIMIT = 50
 
 
 class EmployeesFindArgs(BaseModel):
@@ -13,8 +20,11 @@ class EmployeesFindArgs(BaseModel):
         "ID кафедры для фильтрации. Если указано, ищет только внутри этой кафедры." \
         "Можно узнать из инструмента directories_get, который вернёт все кафедры"
     ))
-    limit: int | None = Field(None, description=(
-        "Количество сотрудников, которое нужно найти. Оставляй пустым, если не указано иначе."
+    limit: int | None = Field(None, ge=1, le=MAX_PAGE_SIZE, description=(
+        "Количество сотрудников, которое нужно найти (размер страницы). Оставляй пустым, если не указано иначе."
+    ))
+    cursor: str | None = Field(None, description=(
+        "next_cursor из предыдущего ответа - следующая страница списка сотрудников кафедры (без q)."
     ))
 
     @model_validator(mode='after')
@@ -29,15 +39,25 @@ class EmployeesFindArgs(BaseModel):
     description=(
         "Поиск преподавателей и сотрудников. "
         "Позволяет найти человека по ФИО, получить список всех сотрудников определенной кафедры "
-        "или найти конкретного человека внутри кафедры."
+        "или найти конкретного человека внутри кафедры. "
+        "Возвращает {items, next_cursor}; список кафедры выдаётся страницами - "
+        "если next_cursor не null, передайте его в cursor для следующей страницы."
     ),
     args_model=EmployeesFindArgs
 )
 async def handle_employees_find(ctx: ToolContext, args: EmployeesFindArgs):
-    async with ctx.db_engine.connect() as conn:
-        service = EmployeeService(conn)
-        return await service.search(
-            q=args.q, 
-            department_id=args.department_id, 
-            limit=500 if args.limit is None else int(args.limit)
-        )
\ No newline at end of file
+    async with LazyConnection(ctx.db_engine) as conn:
+        if not args.q:
+            # Список кафедры: keyset-страницы по id
+            page = await StructureService(conn).get_employees_by_department(
+                args.department_id, args.cursor, clamp_page_size(args.limit)
+            )
+            return page.envelope_json()
+
+        service = EmployeeService(conn, ctx.employee_index)
+        items = await service.search(
+            q=args.q,
+            department_id=args.department_id,
+            limit=DEFAULT_SEARCH_LIMIT if args.limit is None else args.limit
+        )
+        return {"items": items, "next_cursor": None}
\ No newline at end of file
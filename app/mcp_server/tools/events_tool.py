@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 
-from app.mcp_server.sdk import registry, ToolContext
+from app.mcp_server.sdk import registry, ToolContext, CachePolicy
 from app.services.event_service import EventService
 
 
@@ -20,7 +20,7 @@ class ScheduleSearchEventArgs(BaseModel):
 )
 async def handle_search_event(ctx: ToolContext, args: ScheduleSearchEventArgs):
     async with ctx.db_engine.connect() as conn:
-        service = EventService(conn)
+        service = EventService(conn, ctx.generation)
         return await service.search_events(args.q, args.entity_name, args.week_number)
 
 
@@ -38,11 +38,12 @@ class AuditoryOccupancyArgs(BaseModel):
         "или получить список всех пар в этой аудитории на день."
         "Имя аудитории должно быть в формате {214-4 к.}, где 214 это номер аудитории, 4 к. это 4 корпус"
     ),
-    args_model=AuditoryOccupancyArgs
+    args_model=AuditoryOccupancyArgs,
+    cache=CachePolicy(ttl=600, scope="redis"),
 )
 async def handle_auditory_occupancy(ctx: ToolContext, args: AuditoryOccupancyArgs):
     async with ctx.db_engine.connect() as conn:
-        service = EventService(conn)
+        service = EventService(conn, ctx.generation)
         return await service.get_auditory_events(
             auditory_name=args.auditory_name,
             week_number=args.week_number,
@@ -63,11 +64,12 @@ class ScheduleDayArgs(BaseModel):
         "Используйте это ВМЕСТО `schedule_get` для вопросов вида: 'Какие пары завтра?', 'Что у меня в среду?', 'Расписание на понедельник'. "
         "Возвращает список занятий только на указанный день."
     ),
-    args_model=ScheduleDayArgs
+    args_model=ScheduleDayArgs,
+    cache=CachePolicy(ttl=600, scope="redis"),
 )
 async def handle_schedule_day(ctx: ToolContext, args: ScheduleDayArgs):
     async with ctx.db_engine.connect() as conn:
-        service = EventService(conn)
+        service = EventService(conn, ctx.generation)
         return await service.get_day_events(
             entity_name=args.entity_name,
             week_number=args.week_number,
@@ -76,22 +78,26 @@ async def handle_schedule_day(ctx: ToolContext, args: ScheduleDayArgs):
 
 
 class GlobalSubjectSearchArgs(BaseModel):
-    q: str = Field(..., description="Название предмета")
+    q: str = Field(..., description="Название предмета или его сокращение (например, 'БД', 'матан')")
     limit: int = Field(10, le=50)
+    offset: int = Field(0, ge=0, description="Смещение для следующей страницы результатов")
 
 @registry.tool(
     name="global_subject_search",
     description=(
         "Глобальный поиск по всем расписаниям. "
         "Используйте ТОЛЬКО для вопросов вида: 'Кто ведет Нейронные сети?', 'У каких групп есть Философия?'. "
-        "Позволяет найти преподавателей или группы, связанные с предметом."
+        "Позволяет найти преподавателей или группы, связанные с предметом. "
+        "Возвращает по одной записи на пару (предмет, группа/преподаватель), самые релевантные первыми."
     ),
-    args_model=GlobalSubjectSearchArgs
+    args_model=GlobalSubjectSearchArgs,
+    # Поиск не зависит от регистра и пробелов по краям запроса
+    cache=CachePolicy(ttl=600, scope="redis", key=lambda a: (a.q.strip().lower(), a.limit, a.offset)),
 )
 async def handle_global_search(ctx: ToolContext, args: GlobalSubjectSearchArgs):
     async with ctx.db_engine.connect() as conn:
-        service = EventService(conn)
-        return await service.global_subject_search(args.q, args.limit)
+        service = EventService(conn, ctx.generation)
+        return await service.global_subject_search(args.q, args.limit, args.offset)
 
 
 class GroupTeachersArgs(BaseModel):
@@ -100,11 +106,12 @@ class GroupTeachersArgs(BaseModel):
 @registry.tool(
     name="group_teachers_get",
     description="Получение списка всех преподавателей, которые ведут занятия у указанной группы, на основе расписания.",
-    args_model=GroupTeachersArgs
+    args_model=GroupTeachersArgs,
+    cache=CachePolicy(ttl=600, scope="redis"),
 )
 async def handle_group_teachers(ctx: ToolContext, args: GroupTeachersArgs):
     async with ctx.db_engine.connect() as conn:
-        service = EventService(conn)
+        service = EventService(conn, ctx.generation)
         teachers = await service.get_employees_by_group(args.group_name)
         if not teachers:
             return {"message": "Преподаватели не найдены (возможно, нет расписания)."}
@@ -1,27 +1,40 @@
 from typing import Literal
 from pydantic import BaseModel, Field
 
+from app.db.session import LazyConnection
 from app.mcp_server.sdk import registry, ToolContext
+from app.services.schedule_projection import ScheduleProjection
 from app.services.schedule_service import ScheduleService
 
 
 class ScheduleGetArgs(BaseModel):
     entity_type: Literal["group", "employee"]
     entity_identifier: str = Field(..., description="Номер группы (например '221703') или ФИО/url_id преподавателя")
+    week_number: int | None = Field(None, ge=1, le=4, description="Только занятия этой недели цикла (1-4)")
+    day_of_week: int | None = Field(None, ge=1, le=7, description="Только этот день (1=Понедельник, 7=Воскресенье)")
+    subgroup: int | None = Field(None, ge=1, description="Только занятия подгруппы и всей группы")
+    fields: list[str] | None = Field(
+        None,
+        description="Оставить у занятий только эти поля, например ['subject', 'startLessonTime', 'auditories']",
+    )
 
 
 @registry.tool(
     name="schedule_get",
     description=(
-        "ВНИМАНИЕ: ВОЗВРАЩАЕТ ОГРОМНЫЙ JSON СО ВСЕМ РАСПИСАНИЕМ НА ВЕСЬ СЕМЕСТР. "
-        "Вызывать ТОЛЬКО в крайнем случае, если пользователь явно просит 'Покажи всё расписание целиком' "
-        "и подтвердил это действие. ВСЕГДА спрашивай подтверждение пользователя"
+        "ВНИМАНИЕ: БЕЗ ФИЛЬТРОВ ВОЗВРАЩАЕТ ОГРОМНЫЙ JSON СО ВСЕМ РАСПИСАНИЕМ НА ВЕСЬ СЕМЕСТР. "
+        "Без фильтров вызывать ТОЛЬКО в крайнем случае, если пользователь явно просит "
+        "'Покажи всё расписание целиком' и подтвердил это действие. ВСЕГДА спрашивай подтверждение пользователя. "
+        "Чтобы получить небольшой ответ, передавай week_number, day_of_week, subgroup и fields. "
         "Для конкретных вопросов ('какие пары во вторник?', 'когда математика?') используйте инструменты "
         "`schedule_get_day` или `schedule_search_event`."
     ),
     args_model=ScheduleGetArgs
 )
 async def handle_schedule_get(ctx: ToolContext, args: ScheduleGetArgs):
-    async with ctx.db_engine.connect() as conn:
-        service = ScheduleService(conn, ctx.redis, ctx.settings)
-        return await service.get_schedule(args.entity_type, args.entity_identifier)
\ No newline at end of file
+    async with LazyConnection(ctx.db_engine) as conn:
+        service = ScheduleService(
+            conn, ctx.redis_binary, ctx.settings, ctx.local_cache, ctx.single_flight, ctx.generation, ctx.employee_index
+        )
+        projection = ScheduleProjection.build(args.week_number, args.day_of_week, args.subgroup, args.fields)
+        return await service.get_schedule_raw(args.entity_type, args.entity_identifier, projection)
\ No newline at end of file
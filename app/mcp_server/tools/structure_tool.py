@@ -1,7 +1,9 @@
 from typing import Literal
 from pydantic import BaseModel, Field
 
-from app.mcp_server.sdk import registry, ToolContext
+from app.core.pagination import MAX_PAGE_SIZE, clamp_page_size
+from app.db.session import LazyConnection
+from app.mcp_server.sdk import registry, ToolContext, CachePolicy
 from app.services.structure_service import StructureService
 
 
@@ -9,6 +11,23 @@ class DirectoriesGetArgs(BaseModel):
     directory_name: Literal["faculties", "departments", "specialities", "groups", "auditories"]
     faculty_id: int | None = Field(None, description="ID факультета (обязательно для directory_name='specialities')")
     specialty_id: int | None = Field(None, description="ID специальности (обязательно для directory_name='groups')")
+    cursor: str | None = Field(None, description="next_cursor из предыдущего ответа (только для 'groups' и 'auditories')")
+    page_size: int | None = Field(None, ge=1, le=MAX_PAGE_SIZE, description="Размер страницы для 'groups' и 'auditories'")
+
+
+PAGINATED_DIRECTORIES = ("groups", "auditories")
+
+
+def _directories_cache_key(args: DirectoriesGetArgs):
+    # Фильтр и страница учитываются только для справочников, к которым они относятся
+    paginated = args.directory_name in PAGINATED_DIRECTORIES
+    return (
+        args.directory_name,
+        args.faculty_id if args.directory_name == "specialities" else None,
+        args.specialty_id if args.directory_name == "groups" else None,
+        args.cursor if paginated else None,
+        args.page_size if paginated else None,
+    )
 
 
 @registry.tool(
@@ -23,24 +42,36 @@ class DirectoriesGetArgs(BaseModel):
         "относятся ли аудитории к какому-либо корпусу и т.д.;"
         "Специальности: используйте всегда когда необходим доступ к специальностям конкретной кафедры;"
         "Группы: используйте всегда когда необходим доступ к группам конкретной специальности;"
-        "Не используйте для поиска людей."
+        "Не используйте для поиска людей. "
+        "Группы и аудитории возвращаются страницами: {items, next_cursor}; "
+        "если next_cursor не null, передайте его в cursor, чтобы получить следующую страницу."
     ),
-    args_model=DirectoriesGetArgs
+    args_model=DirectoriesGetArgs,
+    cache=CachePolicy(ttl=600, key=_directories_cache_key),
 )
 async def handle_directories(ctx: ToolContext, args: DirectoriesGetArgs):
-    async with ctx.db_engine.connect() as conn:
-        service = StructureService(conn)
-        
+    async with LazyConnection(ctx.db_engine) as conn:
+        service = StructureService(conn, ctx.structure_snapshot)
+
+        if args.directory_name == "auditories":
+            page = await service.get_auditories(args.cursor, clamp_page_size(args.page_size))
+            return page.envelope_json()
+        elif args.directory_name == "groups":
+            page = await service.get_groups(args.specialty_id, args.cursor, clamp_page_size(args.page_size))
+            return page.envelope_json()
+
+        filtered = args.directory_name == "specialities" and args.faculty_id is not None
+        if not filtered:
+            raw = await service.get_directory_json(args.directory_name)
+            if raw is not None:
+                return raw
+
         if args.directory_name == "faculties":
             return await service.get_faculties()
         elif args.directory_name == "departments":
             return await service.get_departments()
-        elif args.directory_name == "auditories":
-            return await service.get_auditories()
         elif args.directory_name == "specialities":
             return await service.get_specialities(faculty_id=args.faculty_id)
-        elif args.directory_name == "groups":
-            return await service.get_groups(specialty_id=args.specialty_id)
 
 class GroupInfoArgs(BaseModel):
     group_name: str = Field(..., description="Номер группы (например, '221703')")
@@ -52,8 +83,8 @@ class GroupInfoArgs(BaseModel):
     args_model=GroupInfoArgs
 )
 async def handle_group_info(ctx: ToolContext, args: GroupInfoArgs):
-    async with ctx.db_engine.connect() as conn:
-        service = StructureService(conn)
+    async with LazyConnection(ctx.db_engine) as conn:
+        service = StructureService(conn, ctx.structure_snapshot)
         info = await service.get_group_info(args.group_name)
         if not info:
             return {"error": f"Группа {args.group_name} не найдена."}
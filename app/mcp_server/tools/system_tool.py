@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 
+from app.db.session import LazyConnection
 from app.mcp_server.sdk import registry, ToolContext
 from app.services.system_service import SystemService
 
@@ -18,7 +19,7 @@ class SystemCurrentWeekArgs(BaseModel):
     args_model=SystemCurrentWeekArgs
 )
 async def handle_current_week(ctx: ToolContext, args: SystemCurrentWeekArgs):
-    async with ctx.db_engine.connect() as conn:
-        service = SystemService(conn, ctx.redis, ctx.settings)
+    async with LazyConnection(ctx.db_engine) as conn:
+        service = SystemService(conn, ctx.redis, ctx.settings, ctx.local_cache, ctx.generation)
         week = await service.get_current_week()
         return {"week_number": week}
\ No newline at end of file
@@ -1,4 +1,5 @@
-from pydantic import BaseModel, ConfigDict
+from datetime import time
+from pydantic import BaseModel, ConfigDict, Field
 
 class FreeAuditoryItem(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -6,4 +7,9 @@ class FreeAuditoryItem(BaseModel):
     name: str
     capacity: int | None = None
     auditory_type: str | None = None
-    building_number: str | None = None
\ No newline at end of file
+    building_number: str | None = None
+
+
+class FreeWindowItem(FreeAuditoryItem):
+    free_from: time = Field(..., description="Начало свободного окна")
+    free_until: time = Field(..., description="Конец свободного окна (23:59 - до конца дня)")
\ No newline at end of file
@@ -1,14 +1,36 @@
+import logging
 from datetime import datetime
 from sqlalchemy import select, and_
-from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.exc import SQLAlchemyError
 
+from app.db.rows import RowMapper
+from app.db.session import DbConnection
 from app.db.tables import auditories, occupancy_index
-from app.schemas.auditory import FreeAuditoryItem
+from app.schemas.auditory import FreeAuditoryItem, FreeWindowItem
+from app.services.occupancy_engine import (
+    OccupancyEngine, building_key, find_window, from_minutes, merge_intervals, to_minutes
+)
+
+
+logger = logging.getLogger(__name__)
+
+_FREE_AUDITORY = RowMapper(FreeAuditoryItem)
+_FREE_WINDOW = RowMapper(FreeWindowItem)
 
 
 class AuditoryService:
-    def __init__(self, conn: AsyncConnection):
+    def __init__(self, conn: DbConnection, engine: OccupancyEngine | None = None):
         self.conn = conn
+        self.engine = engine
+
+    async def _get_index(self):
+        if self.engine is None:
+            return None
+        try:
+            return await self.engine.get(self.conn)
+        except SQLAlchemyError:
+            logger.warning("Occupancy index unavailable, falling back to database query", exc_info=True)
+            return None
 
     async def get_free_auditories(
         self,
@@ -23,6 +45,11 @@ class AuditoryService:
         except ValueError:
             raise ValueError("Invalid time format. Use HH:MM")
 
+        index = await self._get_index()
+        if index is not None:
+            mask = index.free_mask(day_of_week, week_number, check_time, building_number)
+            return index.rooms_for_mask(mask)
+
         occupancy_subquery = (
             select(1)
             .where(
@@ -38,14 +65,118 @@ class AuditoryService:
         )
 
         query = (
-            select(auditories.c.name, auditories.c.capacity, auditories.c.auditory_type)
+            select(
+                auditories.c.name,
+                auditories.c.capacity,
+                auditories.c.auditory_type,
+                auditories.c.building_number,
+            )
             .where(~occupancy_subquery)
             .order_by(auditories.c.name)
         )
 
         if building_number is not None:
-            query = query.where(auditories.c.building_number == f"{building_number} к.")
+            query = query.where(auditories.c.building_number == building_key(building_number))
 
         result = await self.conn.execute(query)
         rows = result.mappings().all()
-        return [FreeAuditoryItem(**dict(r)) for r in rows]
\ No newline at end of file
+        return _FREE_AUDITORY.many(rows)
+
+
+    async def find_free_windows(
+        self,
+        day_of_week: str,
+        week_number: int,
+        start_str: str,
+        end_str: str | None = None,
+        min_minutes: int | None = None,
+        building_number: int | None = None,
+        min_capacity: int | None = None,
+        limit: int = 50,
+    ) -> list[FreeWindowItem]:
+        """
+        Свободные окна аудиторий за один вызов.
+        С end_str - аудитории, свободные весь промежуток [start, end).
+        С min_minutes - ближайшее окно не короче min_minutes, начиная с start.
+        Результат отсортирован по началу окна и имени.
+        """
+        try:
+            start = to_minutes(datetime.strptime(start_str, "%H:%M").time())
+            end = to_minutes(datetime.strptime(end_str, "%H:%M").time()) if end_str else None
+        except ValueError:
+            raise ValueError("Invalid time format. Use HH:MM")
+
+        if end is not None:
+            if end <= start:
+                raise ValueError("End time must be after start time")
+            length, exact_start = end - start, True
+        elif min_minutes is not None:
+            length, exact_start = min_minutes, False
+        else:
+            raise ValueError("Specify either end time or min_minutes")
+
+        rooms, busy_by_room = await self._load_room_intervals(day_of_week, week_number, building_number)
+
+        windows = []
+        for key, room in rooms:
+            if min_capacity is not None and (room.capacity is None or room.capacity < min_capacity):
+                continue
+            window = find_window(busy_by_room.get(key, []), start, length, exact_start=exact_start)
+            if window is not None:
+                windows.append((window, room))
+
+        windows.sort(key=lambda item: (item[0][0], item[1].name))
+        return [
+            _FREE_WINDOW.from_attributes(
+                room,
+                free_from=from_minutes(window_start),
+                free_until=from_minutes(window_end),
+            )
+            for (window_start, window_end), room in windows[:limit]
+        ]
+
+    async def _load_room_intervals(
+        self,
+        day_of_week: str,
+        week_number: int,
+        building_number: int | None,
+    ) -> tuple[list[tuple[int, FreeAuditoryItem]], dict[int, list[tuple[int, int]]]]:
+        """
+        Возвращает аудитории и их слитые занятые интервалы (в минутах) на день.
+        """
+        index = await self._get_index()
+        if index is not None:
+            mask = index.all_mask
+            if building_number is not None:
+                mask &= index.building_masks.get(building_key(building_number), 0)
+            rooms = [(bit, room) for bit, room in enumerate(index.rooms) if mask >> bit & 1]
+            return rooms, index.intervals.get((day_of_week, week_number), {})
+
+        room_query = select(
+            auditories.c.id,
+            auditories.c.name,
+            auditories.c.capacity,
+            auditories.c.auditory_type,
+            auditories.c.building_number,
+        ).order_by(auditories.c.name)
+        if building_number is not None:
+            room_query = room_query.where(auditories.c.building_number == building_key(building_number))
+
+        room_rows = (await self.conn.execute(room_query)).mappings().all()
+        rooms = list(zip((r["id"] for r in room_rows), _FREE_AUDITORY.many(room_rows)))
+
+        occupancy_query = (
+            select(occupancy_index.c.auditory_id, occupancy_index.c.start_time, occupancy_index.c.end_time)
+            .where(occupancy_index.c.day_of_week == day_of_week)
+            .where(occupancy_index.c.week_number == week_number)
+            .order_by(occupancy_index.c.auditory_id, occupancy_index.c.start_time)
+        )
+        occupancy_rows = (await self.conn.execute(occupancy_query)).mappings().all()
+
+        raw: dict[int, list[tuple[int, int]]] = {}
+        for r in occupancy_rows:
+            start, end = to_minutes(r["start_time"]), to_minutes(r["end_time"])
+            if end > start:
+                raw.setdefault(r["auditory_id"], []).append((start, end))
+
+        return rooms, {room_id: merge_intervals(items) for room_id, items in raw.items()}
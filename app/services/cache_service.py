@@ -1,5 +1,139 @@
+import asyncio
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
 from redis.asyncio import Redis
 
 
-def create_redis_client(host: str, port: int) -> Redis:
-    return Redis(host=host, port=port, decode_responses=True)
+def create_redis_client(host: str, port: int, *, decode_responses: bool = True) -> Redis:
+    return Redis(host=host, port=port, decode_responses=decode_responses)
+
+
+# Формат бинарных значений schedule:*: первый байт - версия формата.
+# Значения ETL (обычный JSON) начинаются с '{' или '[' и читаются как есть.
+FORMAT_ZLIB = 0x01
+
+
+def encode_cache_value(raw: bytes, level: int) -> bytes:
+    """
+    Упаковывает JSON-байты для хранения в Redis.
+    При level=0 значение пишется обычным JSON (совместимо с ETL).
+    """
+    if level <= 0:
+        return raw
+    return bytes((FORMAT_ZLIB,)) + zlib.compress(raw, level)
+
+
+def decode_cache_value(value: bytes) -> bytes:
+    """
+    Возвращает JSON-байты из значения Redis любого поддерживаемого формата.
+    """
+    if value[:1] == bytes((FORMAT_ZLIB,)):
+        return zlib.decompress(memoryview(value)[1:])
+    return value
+
+
+class LocalCache:
+    """
+    Внутрипроцессный L1-кэш перед Redis.
+    LRU с ограничением по суммарному размеру значений в байтах и TTL на запись.
+    Один экземпляр на воркер (app.state.local_cache).
+    """
+
+    def __init__(self, max_bytes: int, default_ttl: float):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+
+        # key -> (value, size, expires_at)
+        self._entries: OrderedDict[str, tuple[Any, int, float]] = OrderedDict()
+        self._size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, size, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, size: int, ttl: float | None = None) -> None:
+        """
+        :param size: размер значения в байтах (обычно длина сериализованного JSON)
+        :param ttl: время жизни в секундах; не больше default_ttl
+        """
+        ttl = self.default_ttl if ttl is None else min(ttl, self.default_ttl)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (value, size, time.monotonic() + ttl)
+        self._size += size
+
+        while self._size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
+
+
+class SingleFlight:
+    """
+    Объединение одновременных промахов кэша: на каждый ключ в процессе
+    выполняется только одна загрузка, остальные ждут её результат.
+    """
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+
+        # Отмена одного ожидающего не должна отменять загрузку для остальных
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
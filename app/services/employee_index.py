@@ -0,0 +1,250 @@
+import asyncio
+import heapq
+import re
+from bisect import bisect_left
+from typing import Any, Iterable
+
+from sqlalchemy import select
+
+from app.db.session import DbConnection
+from app.db.tables import employees, departments_employees
+from app.services.generation_service import DataGeneration
+from app.services.snapshot import GenerationSnapshot
+
+
+TOKEN_RE = re.compile(r"[\w-]+")
+
+# Ранги совпадений (чем больше, тем выше в выдаче)
+RANK_EXACT = 3
+RANK_PREFIX = 2
+RANK_SUBSTRING = 1
+RANK_FUZZY = 0
+
+# Порог похожести по триграммам, как pg_trgm.similarity_threshold
+FUZZY_THRESHOLD = 0.3
+
+
+def normalize(text: str) -> str:
+    return text.casefold().replace("ё", "е")
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(normalize(text))
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def token_trigrams(token: str) -> set[str]:
+    """
+    Триграммы слова с отступами, как в pg_trgm: учитывают начало и конец слова.
+    """
+    return trigrams(f"  {token} ")
+
+
+class EmployeeDirectory:
+    """
+    Снимок таблицы employees с индексами для поиска по ФИО:
+    отсортированный список токенов (точное и префиксное совпадение),
+    триграммы полного имени (подстрока) и триграммы токенов (опечатки).
+    """
+
+    __slots__ = (
+        "rows", "by_id", "by_url_id", "names", "tokens", "sort_keys",
+        "token_list", "name_trigrams", "token_trigram_index", "token_trigram_sizes",
+        "departments",
+    )
+
+    def __init__(self, rows: list[dict[str, Any]], memberships: Iterable[tuple[int, int]]):
+        self.rows = rows
+        self.by_id: dict[int, int] = {}
+        self.by_url_id: dict[str, int] = {}
+        self.names: list[str] = []
+        self.tokens: list[tuple[str, ...]] = []
+        self.sort_keys: list[tuple] = []
+
+        token_list: list[tuple[str, int]] = []
+        self.name_trigrams: dict[str, set[int]] = {}
+        self.token_trigram_index: dict[str, list[tuple[int, int]]] = {}
+        self.token_trigram_sizes: list[list[int]] = []
+
+        for i, row in enumerate(rows):
+            self.by_id[row["id"]] = i
+            if row.get("url_id"):
+                self.by_url_id[row["url_id"]] = i
+
+            full_name = " ".join(filter(None, (row.get("last_name"), row.get("first_name"), row.get("middle_name"))))
+            name = normalize(full_name)
+            tokens = tuple(tokenize(full_name))
+            self.names.append(name)
+            self.tokens.append(tokens)
+            self.sort_keys.append((name, row["id"]))
+
+            for tri in trigrams(name):
+                self.name_trigrams.setdefault(tri, set()).add(i)
+
+            sizes = []
+            for pos, token in enumerate(tokens):
+                token_list.append((token, i))
+                tris = token_trigrams(token)
+                sizes.append(len(tris))
+                for tri in tris:
+                    self.token_trigram_index.setdefault(tri, []).append((i, pos))
+            self.token_trigram_sizes.append(sizes)
+
+        token_list.sort()
+        self.token_list = token_list
+
+        self.departments: dict[int, set[int]] = {}
+        for department_id, employee_id in memberships:
+            i = self.by_id.get(employee_id)
+            if i is not None:
+                self.departments.setdefault(department_id, set()).add(i)
+
+    def get_by_url_id(self, url_id: str) -> dict[str, Any] | None:
+        i = self.by_url_id.get(url_id)
+        return self.rows[i] if i is not None else None
+
+    def search(
+        self,
+        query: str | None,
+        *,
+        limit: int,
+        department_id: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Поиск по ФИО. Порядок детерминирован: ранг совпадения
+        (точное слово > префикс > подстрока > опечатка), похожесть, ФИО, id.
+        Совпадения с опечатками используются, только если других нет.
+        """
+        allowed = self.departments.get(department_id, set()) if department_id else None
+
+        if not query or not query.strip():
+            if allowed is None:
+                return []
+            ordered = sorted(allowed, key=self.sort_keys.__getitem__)
+            return [self.rows[i] for i in ordered[:limit]]
+
+        ranked = self.rank(query, limit=limit, allowed=allowed)
+        return [self.rows[i] for _, _, i in ranked]
+
+    def rank(
+        self,
+        query: str,
+        *,
+        limit: int | None = None,
+        allowed: set[int] | None = None,
+    ) -> list[tuple[int, float, int]]:
+        """
+        Возвращает [(ранг, похожесть, индекс строки)] в порядке выдачи.
+        allowed ограничивает выдачу подмножеством строк (например, кафедрой).
+        """
+        q_tokens = tokenize(query)
+        q_name = " ".join(q_tokens)
+        if not q_tokens:
+            return []
+
+        scores: dict[int, tuple[int, float]] = {}
+
+        for i in self._match_tokens(q_tokens):
+            exact = all(token in self.tokens[i] for token in q_tokens)
+            scores[i] = (RANK_EXACT if exact else RANK_PREFIX, 1.0)
+
+        for i in self._match_substring(q_name):
+            scores.setdefault(i, (RANK_SUBSTRING, 1.0))
+
+        if allowed is not None:
+            scores = {i: score for i, score in scores.items() if i in allowed}
+
+        if not scores:
+            for i, similarity in self._match_fuzzy(q_tokens).items():
+                if allowed is None or i in allowed:
+                    scores[i] = (RANK_FUZZY, similarity)
+
+        def order(i: int) -> tuple:
+            return -scores[i][0], -scores[i][1], self.sort_keys[i]
+
+        if limit is not None and limit < len(scores):
+            ordered = heapq.nsmallest(limit, scores, key=order)
+        else:
+            ordered = sorted(scores, key=order)
+        return [(scores[i][0], scores[i][1], i) for i in ordered]
+
+    def _match_tokens(self, q_tokens: list[str]) -> set[int]:
+        """
+        Строки, в которых каждое слово запроса - начало какого-либо слова ФИО.
+        """
+        result: set[int] | None = None
+        for token in q_tokens:
+            lo = bisect_left(self.token_list, (token,))
+            hi = bisect_left(self.token_list, (token + "\uffff",))
+            matched = {i for _, i in self.token_list[lo:hi]}
+            result = matched if result is None else result & matched
+            if not result:
+                return set()
+        return result or set()
+
+    def _match_substring(self, q_name: str) -> list[int]:
+        tris = trigrams(q_name)
+        if not tris:
+            return [i for i, name in enumerate(self.names) if q_name in name]
+
+        candidates: set[int] | None = None
+        for tri in tris:
+            posting = self.name_trigrams.get(tri)
+            if not posting:
+                return []
+            candidates = set(posting) if candidates is None else candidates & posting
+        return [i for i in candidates or () if q_name in self.names[i]]
+
+    def _match_fuzzy(self, q_tokens: list[str]) -> dict[int, float]:
+        """
+        Похожесть по триграммам: для каждого слова запроса берётся
+        самое похожее слово ФИО, результат усредняется по словам запроса.
+        """
+        totals: dict[int, float] = {}
+        for n, token in enumerate(q_tokens):
+            q_tris = token_trigrams(token)
+            shared: dict[tuple[int, int], int] = {}
+            for tri in q_tris:
+                for key in self.token_trigram_index.get(tri, ()):
+                    shared[key] = shared.get(key, 0) + 1
+
+            best: dict[int, float] = {}
+            for (i, pos), count in shared.items():
+                similarity = count / (len(q_tris) + self.token_trigram_sizes[i][pos] - count)
+                if similarity > best.get(i, 0.0):
+                    best[i] = similarity
+
+            if n == 0:
+                totals = best
+            else:
+                totals = {i: totals[i] + best[i] for i in totals.keys() & best.keys()}
+
+        return {
+            i: total / len(q_tokens)
+            for i, total in totals.items()
+            if total / len(q_tokens) >= FUZZY_THRESHOLD
+        }
+
+
+class EmployeeIndex(GenerationSnapshot[EmployeeDirectory]):
+    """
+    Индекс сотрудников в памяти процесса (app.state.employee_index).
+    Перестраивается при смене поколения данных.
+    """
+
+    name = "employee index"
+
+    def __init__(self, generation: DataGeneration | None, max_age: float):
+        super().__init__(generation, max_age)
+
+    async def _load(self, conn: DbConnection) -> EmployeeDirectory:
+        result = await conn.execute(select(employees).order_by(employees.c.id))
+        rows = [dict(r) for r in result.mappings().all()]
+
+        membership_query = select(departments_employees.c.department_id, departments_employees.c.employee_id)
+        memberships = [tuple(r) for r in (await conn.execute(membership_query)).all()]
+
+        return await asyncio.to_thread(EmployeeDirectory, rows, memberships)
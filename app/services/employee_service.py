@@ -1,14 +1,17 @@
 from typing import Any
 
 from sqlalchemy import select, or_, func, and_
-from sqlalchemy.ext.asyncio import AsyncConnection
 
+from app.db.employee_search import load_employee_directory
+from app.db.session import DbConnection
 from app.db.tables import employees, departments_employees
+from app.services.employee_index import EmployeeIndex
 
 
 class EmployeeService:
-    def __init__(self, conn: AsyncConnection):
+    def __init__(self, conn: DbConnection, index: EmployeeIndex | None = None):
         self.conn = conn
+        self.index = index
 
     async def search(
         self, 
@@ -16,6 +19,10 @@ class EmployeeService:
         department_id: int | None = None, 
         limit: int = 20
     ) -> list[dict[str, Any]]:
+        directory = await load_employee_directory(self.conn, self.index)
+        if directory is not None:
+            return directory.search(q, limit=limit, department_id=department_id)
+
         query = select(employees)
         
         if department_id:
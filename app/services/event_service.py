@@ -1,17 +1,35 @@
 from datetime import time, datetime
-from typing import Literal, Any
+from typing import Literal, Any, AsyncIterator
+from weakref import WeakKeyDictionary
 
-from sqlalchemy import select, and_, or_, func, cast, Time, distinct
+from sqlalchemy import select, and_, or_, func, cast, Time, distinct, literal, text
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.ext.asyncio import AsyncConnection
 
+from app.db.rows import RowMapper
+from app.db.session import DbConnection
 from app.db.tables import schedule_events, employees
 from app.schemas.events import ScheduleEventItem, EmployeeFromEvent
+from app.services.generation_service import DataGeneration
+
+
+# Конфигурация текстового поиска, с которой ETL строит schedule_events.search_vector
+SEARCH_CONFIG = "simple"
+
+# Установлено ли расширение pg_trgm: по движку, (поколение данных, результат).
+# Проверяется заново при смене поколения - необязательная миграция 0006 может быть применена после старта
+_trgm_available: "WeakKeyDictionary[Any, tuple[str | None, bool]]" = WeakKeyDictionary()
+
+_EVENT = RowMapper(ScheduleEventItem)
+_EMPLOYEE_FROM_EVENT = RowMapper(EmployeeFromEvent)
+
+# Строк в одной пачке серверного курсора при выгрузке
+EXPORT_BATCH_SIZE = 1000
 
 
 class EventService:
-    def __init__(self, conn: AsyncConnection):
+    def __init__(self, conn: DbConnection, generation: DataGeneration | None = None):
         self.conn = conn
+        self.generation = generation
 
     def _build_base_query(self):
         """
@@ -31,44 +49,38 @@ class EventService:
             )
         )
 
-    def _process_row(self, row: Any) -> ScheduleEventItem:
+    @staticmethod
+    def _display_names(row: Any) -> dict[str, Any]:
         """
-        Преобразует строку БД в Pydantic-модель с красивыми именами.
+        Человекочитаемые имена для строки БД: ФИО сущности и преподавателей.
         """
-        # Преобразуем RowMapping в dict
-        row_dict = dict(row)
-        
-        if row_dict.get("last_name"):
+        if row.get("last_name"):
             parts = [
-                row_dict["last_name"], 
-                row_dict.get("first_name"), 
-                row_dict.get("middle_name")
+                row["last_name"],
+                row.get("first_name"),
+                row.get("middle_name")
             ]
             display_name = " ".join(filter(None, parts))
         else:
-            display_name = row_dict["entity_name"]
+            display_name = row["entity_name"]
 
         teachers_display = []
-        raw_related = row_dict.get("related_employees")
-        
+        raw_related = row.get("related_employees")
+
         if isinstance(raw_related, list):
             for t in raw_related:
                 if isinstance(t, dict):
                     t_parts = [
-                        t.get("lastName"), 
-                        t.get("firstName"), 
+                        t.get("lastName"),
+                        t.get("firstName"),
                         t.get("middleName")
                     ]
                     if any(t_parts):
                         teachers_display.append(" ".join(filter(None, t_parts)))
                     elif t.get("urlId"):
                         teachers_display.append(t["urlId"])
-        
-        return ScheduleEventItem(
-            **row_dict,
-            entity_display_name=display_name,
-            teachers_display_names=teachers_display
-        )
+
+        return {"entity_display_name": display_name, "teachers_display_names": teachers_display}
 
     async def search_events(
         self, 
@@ -77,23 +89,18 @@ class EventService:
         week_number: int | None = None
     ) -> list[ScheduleEventItem]:
         
+        match, _ = await self._subject_match(q)
         query = self._build_base_query().where(
-            and_(
-                schedule_events.c.entity_name == entity_name,
-                or_(
-                    schedule_events.c.subject.ilike(f"%{q}%"),
-                    schedule_events.c.subject_full.ilike(f"%{q}%")
-                )
-            )
+            and_(schedule_events.c.entity_name == entity_name, match)
         )
 
         if week_number:
-            query = query.where(schedule_events.c.week_numbers.any(week_number))
+            query = query.where(schedule_events.c.week_numbers.contains([week_number]))
 
         query = query.order_by(schedule_events.c.day_of_week, schedule_events.c.start_time)
 
         result = await self.conn.execute(query)
-        return [self._process_row(r) for r in result.mappings().all()]
+        return _EVENT.many(result.mappings().all(), self._display_names)
 
     async def get_auditory_events(
         self,
@@ -104,10 +111,10 @@ class EventService:
     ) -> list[ScheduleEventItem]:
         
         query = select(schedule_events).where(
-            schedule_events.c.auditories.any(auditory_name)
+            schedule_events.c.auditories.contains([auditory_name])
         )
 
-        query = query.where(schedule_events.c.week_numbers.any(week_number))
+        query = query.where(schedule_events.c.week_numbers.contains([week_number]))
         query = query.where(schedule_events.c.day_of_week == day_of_week)
 
         if time_check:
@@ -124,7 +131,7 @@ class EventService:
         query = query.order_by(schedule_events.c.start_time)
 
         result = await self.conn.execute(query)
-        return [ScheduleEventItem.model_validate(r) for r in result.mappings().all()]
+        return _EVENT.many(result.mappings().all())
     
     async def get_day_events(
         self,
@@ -139,32 +146,93 @@ class EventService:
             and_(
                 schedule_events.c.entity_name == entity_name,
                 schedule_events.c.day_of_week == day_of_week,
-                schedule_events.c.week_numbers.any(week_number)
+                schedule_events.c.week_numbers.contains([week_number])
             )
         )
         
         query = query.order_by(schedule_events.c.start_time)
 
         result = await self.conn.execute(query)
-        return [ScheduleEventItem.model_validate(r) for r in result.mappings().all()]
+        return _EVENT.many(result.mappings().all())
 
     async def global_subject_search(
         self,
         q: str,
-        limit: int = 10
+        limit: int = 10,
+        offset: int = 0,
     ) -> list[ScheduleEventItem]:
-        
-        query = self._build_base_query().where(
-             or_(
-                schedule_events.c.subject.ilike(f"%{q}%"),
-                schedule_events.c.subject_full.ilike(f"%{q}%")
+        """
+        Поиск предмета по всем расписаниям: одна строка на пару (предмет, сущность),
+        по убыванию релевантности.
+        """
+        match, rank = await self._subject_match(q)
+
+        ranked = (
+            self._build_base_query()
+            .add_columns(rank.label("rank"))
+            .where(match)
+            .distinct(schedule_events.c.subject, schedule_events.c.entity_name)
+            .order_by(schedule_events.c.subject, schedule_events.c.entity_name, rank.desc())
+            .subquery()
+        )
+
+        query = (
+            select(ranked)
+            .order_by(ranked.c.rank.desc(), ranked.c.subject, ranked.c.entity_name)
+            .limit(limit)
+            .offset(offset)
+        )
+
+        result = await self.conn.execute(query)
+        return _EVENT.many(result.mappings().all(), self._display_names)
+
+    async def _subject_match(self, q: str):
+        """
+        Условие и релевантность поиска по предмету:
+        полнотекстовый поиск по search_vector (GIN) и похожесть по триграммам pg_trgm
+        для сокращений и опечаток ('БД', 'матан'). Без pg_trgm - ILIKE, как раньше.
+        """
+        clean_query = q.strip()
+        ts_query = func.plainto_tsquery(SEARCH_CONFIG, clean_query)
+        fts_match = schedule_events.c.search_vector.op("@@")(ts_query)
+        fts_rank = func.coalesce(func.ts_rank(schedule_events.c.search_vector, ts_query), 0)
+
+        if not await self._has_trgm():
+            match = or_(
+                fts_match,
+                schedule_events.c.subject.ilike(f"%{clean_query}%"),
+                schedule_events.c.subject_full.ilike(f"%{clean_query}%"),
             )
+            return match, fts_rank
+
+        match = or_(
+            fts_match,
+            schedule_events.c.subject.op("%")(clean_query),
+            literal(clean_query).op("<%")(schedule_events.c.subject_full),
+            schedule_events.c.subject.ilike(f"%{clean_query}%"),
+            # Подстрока полного названия находится и ниже порога word_similarity
+            # (ILIKE обслуживается тем же триграммным GIN-индексом из 0006)
+            schedule_events.c.subject_full.ilike(f"%{clean_query}%"),
         )
-        
-        query = query.limit(limit)
-        
+        # greatest() в Postgres пропускает NULL (subject_full может отсутствовать)
+        rank = fts_rank + func.greatest(
+            func.similarity(schedule_events.c.subject, clean_query),
+            func.word_similarity(clean_query, schedule_events.c.subject_full),
+        )
+        return match, rank
+
+    async def _has_trgm(self) -> bool:
+        engine = self.conn.engine.sync_engine
+        generation = self.generation.value if self.generation else None
+        cached = _trgm_available.get(engine)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+
+        query = select(literal(1)).select_from(text("pg_extension")).where(text("extname = 'pg_trgm'"))
         result = await self.conn.execute(query)
-        return [self._process_row(r) for r in result.mappings().all()]
+        available = result.first() is not None
+        _trgm_available[engine] = (generation, available)
+        return available
 
 
     async def get_employees_by_group(self, group_name: str) -> list[EmployeeFromEvent]:
@@ -185,4 +253,24 @@ class EventService:
         )
         
         result = await self.conn.execute(query)
-        return [EmployeeFromEvent(**dict(r)) for r in result.mappings().all()]
\ No newline at end of file
+        return _EMPLOYEE_FROM_EVENT.many(result.mappings().all())
+
+    async def export_events(
+        self,
+        entity_name: str | None = None,
+        entity_type: Literal["group", "employee"] | None = None,
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> AsyncIterator[list[ScheduleEventItem]]:
+        """
+        Выгрузка занятий (всех или одной сущности) пачками через серверный курсор.
+        """
+        query = self._build_base_query()
+        if entity_name is not None:
+            query = query.where(schedule_events.c.entity_name == entity_name)
+        if entity_type is not None:
+            query = query.where(schedule_events.c.entity_type == entity_type)
+        query = query.order_by(schedule_events.c.id).execution_options(yield_per=batch_size)
+
+        result = await self.conn.stream(query)
+        async for rows in result.mappings().partitions():
+            yield _EVENT.many(rows, self._display_names)
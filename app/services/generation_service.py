@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from typing import Callable
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.redis_keys import RedisKeys
+from app.db.tables import system_state
+
+
+logger = logging.getLogger(__name__)
+
+GENERATION_STATE_KEY = "data_generation"
+
+
+class DataGeneration:
+    """
+    Текущее поколение данных ETL (строка system_state.data_generation).
+    ETL увеличивает его после каждой записи новой версии данных,
+    поколение входит в ключи кэша, поэтому старые записи перестают читаться сразу.
+    """
+
+    def __init__(self, value: str | None = None):
+        self.value = value
+        self._listeners: list[Callable[[str | None], None]] = []
+
+    def subscribe(self, callback: Callable[[str | None], None]) -> None:
+        """
+        Колбэк вызывается при каждой смене поколения (например, сброс L1-кэша).
+        """
+        self._listeners.append(callback)
+
+    def update(self, value: str | None) -> bool:
+        if not value or value == self.value:
+            return False
+
+        logger.info("Data generation changed: %s -> %s", self.value, value)
+        self.value = value
+        for callback in self._listeners:
+            try:
+                callback(value)
+            except Exception:
+                logger.exception("Data generation listener failed")
+        return True
+
+
+async def load_generation(engine: AsyncEngine, redis: Redis) -> str | None:
+    """
+    Читает поколение из Redis, при его отсутствии - из system_state.
+    """
+    try:
+        value = await redis.get(RedisKeys.DATA_GENERATION)
+        if value:
+            return value
+    except RedisError:
+        pass
+
+    try:
+        async with engine.connect() as conn:
+            query = select(system_state.c.value).where(system_state.c.key == GENERATION_STATE_KEY)
+            result = await conn.execute(query)
+            return result.scalar()
+    except (SQLAlchemyError, OSError):
+        logger.warning("Unable to load data generation", exc_info=True)
+        return None
+
+
+async def listen_generation_changes(
+    engine: AsyncEngine,
+    redis: Redis,
+    generation: DataGeneration,
+    poll_interval: float,
+) -> None:
+    """
+    Фоновая задача: слушает канал RedisKeys.DATA_GENERATION_CHANNEL,
+    а раз в poll_interval перечитывает поколение на случай пропущенного сообщения.
+    """
+    while True:
+        pubsub = redis.pubsub()
+        try:
+            await pubsub.subscribe(RedisKeys.DATA_GENERATION_CHANNEL)
+            generation.update(await load_generation(engine, redis))
+
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=poll_interval)
+                if message is not None:
+                    generation.update(message["data"])
+                else:
+                    generation.update(await load_generation(engine, redis))
+        except asyncio.CancelledError:
+            raise
+        except RedisError:
+            logger.warning("Data generation listener lost Redis connection", exc_info=True)
+            await asyncio.sleep(poll_interval)
+            generation.update(await load_generation(engine, redis))
+        finally:
+            await pubsub.aclose()
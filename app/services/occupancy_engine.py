@@ -0,0 +1,207 @@
+import asyncio
+from datetime import time
+from typing import Any, Iterable
+
+from sqlalchemy import select
+
+from app.db.rows import RowMapper
+from app.db.session import DbConnection
+from app.db.tables import auditories, occupancy_index
+from app.schemas.auditory import FreeAuditoryItem
+from app.services.generation_service import DataGeneration
+from app.services.snapshot import GenerationSnapshot
+
+
+MINUTES_PER_DAY = 24 * 60
+
+_FREE_AUDITORY = RowMapper(FreeAuditoryItem)
+
+
+def building_key(building_number: int) -> str:
+    """
+    Формат auditories.building_number ("4 к.").
+    """
+    return f"{building_number} к."
+
+
+def to_minutes(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def from_minutes(value: int) -> time:
+    value = min(value, MINUTES_PER_DAY - 1)
+    return time(value // 60, value % 60)
+
+
+def merge_intervals(intervals: Iterable[tuple[int, int]]) -> list[tuple[int, int]]:
+    """
+    Сливает пересекающиеся и смежные интервалы [start, end), отсортированные по start.
+    """
+    merged: list[tuple[int, int]] = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def find_window(
+    busy: list[tuple[int, int]],
+    start: int,
+    length: int,
+    *,
+    exact_start: bool,
+) -> tuple[int, int] | None:
+    """
+    Ищет свободное окно по слитым занятым интервалам.
+    exact_start=True: окно должно покрывать [start, start + length) целиком,
+    возвращаются границы всего свободного промежутка.
+    exact_start=False: первое окно длиной не меньше length, начинающееся не раньше start.
+    """
+    gap_start = 0
+    for busy_start, busy_end in busy:
+        if busy_end <= start:
+            gap_start = busy_end
+            continue
+
+        if exact_start:
+            return (gap_start, busy_start) if busy_start >= start + length else None
+
+        window_start = max(gap_start, start)
+        if busy_start - window_start >= length:
+            return window_start, busy_start
+        gap_start = busy_end
+
+    window_start = gap_start if exact_start else max(gap_start, start)
+    if MINUTES_PER_DAY - max(window_start, start) >= length:
+        return window_start, MINUTES_PER_DAY
+    return None
+
+
+class OccupancyIndex:
+    """
+    Снимок occupancy_index в виде битовых масок.
+    Бит i соответствует i-й аудитории (по возрастанию имени), для каждой пары
+    (day_of_week, week_number) хранится маска занятых аудиторий на каждый слот.
+    """
+
+    __slots__ = ("slot_minutes", "rooms", "all_mask", "building_masks", "busy", "intervals")
+
+    def __init__(
+        self,
+        slot_minutes: int,
+        rooms: list[FreeAuditoryItem],
+        building_masks: dict[str, int],
+        busy: dict[tuple[str, int], list[int]],
+        intervals: dict[tuple[str, int], dict[int, list[tuple[int, int]]]],
+    ):
+        self.slot_minutes = slot_minutes
+        self.rooms = rooms
+        self.all_mask = (1 << len(rooms)) - 1
+        self.building_masks = building_masks
+        self.busy = busy
+        # (day_of_week, week_number) -> бит аудитории -> слитые занятые интервалы в минутах
+        self.intervals = intervals
+
+    def free_mask(self, day_of_week: str, week_number: int, check_time: time, building_number: int | None = None) -> int:
+        mask = self.all_mask
+        if building_number is not None:
+            mask &= self.building_masks.get(building_key(building_number), 0)
+
+        slots = self.busy.get((day_of_week, week_number))
+        if slots is not None:
+            mask &= ~slots[to_minutes(check_time) // self.slot_minutes]
+        return mask
+
+    def rooms_for_mask(self, mask: int) -> list[FreeAuditoryItem]:
+        rooms = self.rooms
+        result = []
+        while mask:
+            lowest = mask & -mask
+            result.append(rooms[lowest.bit_length() - 1])
+            mask ^= lowest
+        return result
+
+
+def build_occupancy_index(
+    slot_minutes: int,
+    room_rows: Iterable[Any],
+    occupancy_rows: Iterable[Any],
+) -> OccupancyIndex:
+    room_rows = list(room_rows)
+    rooms: list[FreeAuditoryItem] = _FREE_AUDITORY.many(room_rows)
+    bit_by_id: dict[int, int] = {}
+    building_masks: dict[str, int] = {}
+
+    for bit, row in enumerate(room_rows):
+        bit_by_id[row["id"]] = bit
+        if row["building_number"]:
+            building_masks[row["building_number"]] = building_masks.get(row["building_number"], 0) | (1 << bit)
+
+    slots_per_day = -(-MINUTES_PER_DAY // slot_minutes)
+    busy: dict[tuple[str, int], list[int]] = {}
+    raw_intervals: dict[tuple[str, int], dict[int, list[tuple[int, int]]]] = {}
+
+    for row in occupancy_rows:
+        bit = bit_by_id.get(row["auditory_id"])
+        if bit is None:
+            continue
+
+        start = to_minutes(row["start_time"])
+        end = to_minutes(row["end_time"])
+        if end <= start:
+            continue
+
+        day_key = (row["day_of_week"], row["week_number"])
+        slots = busy.get(day_key)
+        if slots is None:
+            slots = busy[day_key] = [0] * slots_per_day
+        raw_intervals.setdefault(day_key, {}).setdefault(bit, []).append((start, end))
+
+        # Слот считается занятым, если занятие пересекается с ним хотя бы частично
+        flag = 1 << bit
+        for slot in range(start // slot_minutes, -(-end // slot_minutes)):
+            slots[slot] |= flag
+
+    intervals = {
+        day_key: {bit: merge_intervals(sorted(items)) for bit, items in per_room.items()}
+        for day_key, per_room in raw_intervals.items()
+    }
+    return OccupancyIndex(slot_minutes, rooms, building_masks, busy, intervals)
+
+
+class OccupancyEngine(GenerationSnapshot[OccupancyIndex]):
+    """
+    Движок свободных аудиторий в памяти процесса (app.state.occupancy_engine).
+    Перестраивается при смене поколения данных.
+    """
+
+    name = "occupancy index"
+
+    def __init__(self, generation: DataGeneration | None, max_age: float, slot_minutes: int):
+        super().__init__(generation, max_age)
+        self.slot_minutes = slot_minutes
+
+    async def _load(self, conn: DbConnection) -> OccupancyIndex:
+        room_query = select(
+            auditories.c.id,
+            auditories.c.name,
+            auditories.c.capacity,
+            auditories.c.auditory_type,
+            auditories.c.building_number,
+        ).order_by(auditories.c.name)
+        room_rows = (await conn.execute(room_query)).mappings().all()
+
+        occupancy_query = select(
+            occupancy_index.c.auditory_id,
+            occupancy_index.c.day_of_week,
+            occupancy_index.c.week_number,
+            occupancy_index.c.start_time,
+            occupancy_index.c.end_time,
+        )
+        occupancy_rows = (await conn.execute(occupancy_query)).mappings().all()
+
+        # Построение масок - чистый CPU, не держим на нём event loop
+        return await asyncio.to_thread(build_occupancy_index, self.slot_minutes, room_rows, occupancy_rows)
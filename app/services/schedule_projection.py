@@ -0,0 +1,139 @@
+"""
+Проекция документа расписания (schedule_json_storage.data): занятия одной недели,
+одного дня, одной подгруппы и только нужные поля занятий.
+
+Документ ETL: {"schedules": {"Понедельник": [занятие, ...], ...}, "exams": [...], ...}.
+Занятие: weekNumber - номера недель (1-4), numSubgroup - 0 для всей группы.
+"""
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+import pydantic_core
+
+
+DAY_NAMES = ("Понедельник", "Вторник", "Среда", "Четверг", "Пятница", "Суббота", "Воскресенье")
+
+# Недели цикла расписания БГУИР
+WEEK_NUMBERS = (1, 2, 3, 4)
+
+# Поля занятия, которые можно запросить
+LESSON_FIELDS = frozenset({
+    "auditories", "endLessonTime", "lessonTypeAbbrev", "note", "numSubgroup", "startLessonTime",
+    "studentGroups", "subject", "subjectFullName", "weekNumber", "employees", "dateLesson",
+    "startLessonDate", "endLessonDate", "announcement", "split",
+})
+
+# Списки занятий по дням недели в документе
+_DAY_SECTIONS = ("schedules", "previousSchedules")
+
+
+@dataclass(frozen=True)
+class ScheduleProjection:
+    week_number: int | None = None
+    day_of_week: int | None = None
+    subgroup: int | None = None
+    fields: tuple[str, ...] | None = None
+
+    @classmethod
+    def build(
+        cls,
+        week_number: int | None = None,
+        day_of_week: int | None = None,
+        subgroup: int | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> "ScheduleProjection":
+        """
+        Проверяет параметры и приводит список полей к каноническому виду
+        (один и тот же набор полей - один ключ кэша).
+        """
+        if week_number is not None and week_number not in WEEK_NUMBERS:
+            raise ValueError(f"week_number must be one of {', '.join(map(str, WEEK_NUMBERS))}")
+        if day_of_week is not None and not 1 <= day_of_week <= len(DAY_NAMES):
+            raise ValueError("day_of_week must be between 1 and 7")
+        if subgroup is not None and subgroup < 1:
+            raise ValueError("subgroup must be positive")
+
+        normalized = None
+        if fields is not None:
+            names = {name.strip() for name in fields if name and name.strip()}
+            unknown = names - LESSON_FIELDS
+            if unknown:
+                raise ValueError(f"Unknown lesson fields: {', '.join(sorted(unknown))}")
+            normalized = tuple(sorted(names)) or None
+
+        return cls(week_number, day_of_week, subgroup, normalized)
+
+    @property
+    def is_empty(self) -> bool:
+        return self.week_number is None and self.day_of_week is None and self.subgroup is None and self.fields is None
+
+    @property
+    def key(self) -> str:
+        """
+        Часть ключа кэша, см. RedisKeys.schedule_view.
+        """
+        fields = ",".join(self.fields) if self.fields else "*"
+        return (
+            f"w{self.week_number or '*'}:d{self.day_of_week or '*'}:s{self.subgroup or '*'}:f{fields}"
+        )
+
+    def with_week(self, week_number: int | None) -> "ScheduleProjection":
+        return ScheduleProjection(week_number, self.day_of_week, self.subgroup, self.fields)
+
+
+def _lesson_matches(lesson: dict, projection: ScheduleProjection) -> bool:
+    if projection.week_number is not None:
+        weeks = lesson.get("weekNumber")
+        # Занятия на конкретную дату (без номеров недель) не отбрасываются
+        if weeks and projection.week_number not in weeks:
+            return False
+    if projection.subgroup is not None:
+        if lesson.get("numSubgroup") not in (0, None, projection.subgroup):
+            return False
+    return True
+
+
+def _project_lessons(lessons: Iterable[dict] | None, projection: ScheduleProjection) -> list[dict]:
+    result = []
+    for lesson in lessons or ():
+        if not _lesson_matches(lesson, projection):
+            continue
+        if projection.fields is not None:
+            lesson = {name: lesson[name] for name in projection.fields if name in lesson}
+        result.append(lesson)
+    return result
+
+
+def project_document(document: dict[str, Any], projection: ScheduleProjection) -> dict[str, Any]:
+    """
+    Экзамены привязаны к датам, а не к неделям цикла, поэтому при фильтре
+    по неделе или дню они не возвращаются; подгруппа и поля к ним применяются.
+    """
+    result = dict(document)
+    day_name = DAY_NAMES[projection.day_of_week - 1] if projection.day_of_week is not None else None
+
+    for section in _DAY_SECTIONS:
+        days = document.get(section)
+        if not isinstance(days, dict):
+            continue
+        result[section] = {
+            day: _project_lessons(lessons, projection)
+            for day, lessons in days.items()
+            if day_name is None or day == day_name
+        }
+
+    if isinstance(document.get("exams"), list):
+        if projection.week_number is not None or projection.day_of_week is not None:
+            result["exams"] = []
+        else:
+            result["exams"] = _project_lessons(document["exams"], projection)
+
+    return result
+
+
+def project_schedule(raw: bytes, projections: Iterable[ScheduleProjection]) -> list[bytes]:
+    """
+    Несколько проекций одного документа с однократным разбором JSON.
+    """
+    document = pydantic_core.from_json(raw)
+    return [pydantic_core.to_json(project_document(document, p)) for p in projections]
@@ -1,60 +1,291 @@
+import asyncio
 import json
+import logging
+import time
+import uuid
+import zlib
 from typing import Any, Literal
 from redis.asyncio import Redis
 from redis.exceptions import RedisError
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy import Text, cast, select
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.config import Settings
+from app.core.metrics import CACHE_REQUESTS
 from app.core.redis_keys import RedisKeys
+from app.db.session import DbConnection, LazyConnection
 from app.db.tables import student_groups, employees, schedule_storage
-from app.db.employee_search import resolve_employee_identifier
+from app.db.employee_search import load_employee_directory, resolve_employee_identifier
+from app.services.cache_service import LocalCache, SingleFlight, decode_cache_value, encode_cache_value
+from app.services.employee_index import EmployeeIndex
+from app.services.generation_service import DataGeneration
+from app.services.schedule_projection import WEEK_NUMBERS, ScheduleProjection, project_schedule
 
 
+logger = logging.getLogger(__name__)
+
 EntityType = Literal["group", "employee"]
 
+# Снятие блокировки заполнения, только если она всё ещё наша
+# (между GET и DEL блокировка могла истечь и достаться другому воркеру)
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
 
 class ScheduleService:
+    """
+    redis - бинарный клиент (decode_responses=False):
+    значения schedule:* хранятся в формате encode_cache_value.
+    """
+
     def __init__(
         self, 
-        conn: AsyncConnection, 
+        conn: DbConnection, 
         redis: Redis, 
-        settings: Settings
+        settings: Settings,
+        local_cache: LocalCache | None = None,
+        single_flight: SingleFlight | None = None,
+        generation: DataGeneration | None = None,
+        employee_index: EmployeeIndex | None = None,
     ):
         self.conn = conn
         self.redis = redis
         self.settings = settings
+        self.local_cache = local_cache
+        self.single_flight = single_flight
+        self.generation = generation
+        self.employee_index = employee_index
+        # Последний ответ - устаревшая копия из-за ошибки БД
+        self.served_stale = False
 
-    async def get_schedule(self, entity_type: EntityType, entity_identifier: str) -> Any:
+    async def get_schedule(
+        self,
+        entity_type: EntityType,
+        entity_identifier: str,
+        projection: ScheduleProjection | None = None,
+    ) -> Any:
+        return json.loads(await self.get_schedule_raw(entity_type, entity_identifier, projection))
 
-        redis_key, db_lookup_val = await self._resolve_identifier(entity_type, entity_identifier)
+    async def get_schedule_raw(
+        self,
+        entity_type: EntityType,
+        entity_identifier: str,
+        projection: ScheduleProjection | None = None,
+    ) -> bytes:
+        """
+        Возвращает расписание как готовые JSON-байты (UTF-8) без разбора:
+        их можно сразу отдавать в HTTP-ответ или в TextContent.
+        :param projection: неделя, день, подгруппа и поля занятий; без неё - документ целиком
+        """
+        base_key, db_lookup_val = await self._resolve_identifier(entity_type, entity_identifier)
+        redis_key = RedisKeys.with_generation(base_key, self.generation.value if self.generation else None)
 
-        try:
-            cached = await self.redis.get(redis_key)
-            if cached:
-                return json.loads(cached)
-        except (RedisError, json.JSONDecodeError):
-            pass 
+        if projection is not None and not projection.is_empty:
+            return await self._get_view(redis_key, base_key, entity_type, db_lookup_val, projection)
+
+        raw, _ = await self._get_document(redis_key, base_key, entity_type, db_lookup_val)
+        return raw
+
+    async def _get_document(
+        self, redis_key: str, base_key: str, entity_type: str, db_lookup_val: str | int | None
+    ) -> tuple[bytes, bool]:
+        """
+        (документ расписания, True если это устаревшая копия из-за ошибки БД)
+        """
+        cached = await self._get_cached(redis_key)
+        if cached is not None:
+            return cached, False
 
         if db_lookup_val is not None:
-            schedule_data = await self._fetch_from_db_scd2(entity_type, db_lookup_val)
-            if schedule_data:
-                try:
-                    await self.redis.setex(
-                        redis_key, 
-                        self.settings.redis_schedule_cache_ttl, 
-                        json.dumps(schedule_data, ensure_ascii=False)
-                    )
-                except RedisError:
-                    pass
-                
-                return schedule_data
+            try:
+                raw = await self._load(redis_key, base_key, entity_type, db_lookup_val)
+            except SQLAlchemyError:
+                stale = await self._get_stale(base_key)
+                if stale is None:
+                    raise
+                logger.warning("Database error, serving stale schedule for %s", redis_key, exc_info=True)
+                self.served_stale = True
+                return stale, True
+
+            if raw:
+                return raw, False
 
         raise ValueError("Schedule not found")
 
+    async def _get_view(
+        self,
+        redis_key: str,
+        base_key: str,
+        entity_type: str,
+        db_lookup_val: str | int | None,
+        projection: ScheduleProjection,
+    ) -> bytes:
+        """
+        Проекция хранится готовыми байтами рядом с документом (RedisKeys.schedule_view).
+        При промахе по запросу с неделей сразу считаются срезы всех недель цикла:
+        документ разбирается один раз, следующие недели отдаются из кэша.
+        """
+        view_key = RedisKeys.schedule_view(redis_key, projection.key)
+        cached = await self._get_cached(view_key, "schedule_view")
+        if cached is not None:
+            return cached
+
+        raw, stale = await self._get_document(redis_key, base_key, entity_type, db_lookup_val)
+
+        if projection.week_number is not None:
+            projections = [projection.with_week(week) for week in WEEK_NUMBERS]
+        else:
+            projections = [projection]
+        views = await asyncio.to_thread(project_schedule, raw, projections)
+
+        # Проекции устаревшей копии не кэшируются под ключом текущего поколения
+        if not stale:
+            await self._store_views(redis_key, projections, views)
+        return views[projections.index(projection)]
+
+    async def _get_cached(self, redis_key: str, cache: str = "schedule") -> bytes | None:
+        """
+        :param cache: метка кэша в метрике cache_requests_total
+        """
+        if self.local_cache is not None:
+            local = self.local_cache.get(redis_key)
+            if local is not None:
+                CACHE_REQUESTS.inc(cache, "local", "hit")
+                return local
+            CACHE_REQUESTS.inc(cache, "local", "miss")
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            cached, redis_ttl = await pipe.get(redis_key).ttl(redis_key).execute()
+            if cached:
+                raw = decode_cache_value(cached)
+                CACHE_REQUESTS.inc(cache, "redis", "hit")
+                # Запись в L1 не должна пережить запись в Redis
+                self._store_local(redis_key, raw, redis_ttl if redis_ttl > 0 else None)
+                return raw
+            CACHE_REQUESTS.inc(cache, "redis", "miss")
+        except (RedisError, zlib.error):
+            CACHE_REQUESTS.inc(cache, "redis", "error")
+        return None
+
+    async def _store_views(self, redis_key: str, projections: list[ScheduleProjection], views: list[bytes]) -> None:
+        ttl = self.settings.redis_schedule_cache_ttl
+        level = self.settings.redis_schedule_compression_level
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for projection, view in zip(projections, views):
+                pipe.setex(RedisKeys.schedule_view(redis_key, projection.key), ttl, encode_cache_value(view, level))
+            await pipe.execute()
+        except RedisError:
+            pass
+
+        for projection, view in zip(projections, views):
+            self._store_local(RedisKeys.schedule_view(redis_key, projection.key), view, ttl)
+
+    async def _load(self, redis_key: str, base_key: str, entity_type: str, lookup_val: str | int) -> bytes | None:
+        """
+        Загрузка при промахе кэша. Одновременные промахи по одному ключу
+        в пределах процесса ждут один и тот же запрос к БД.
+        """
+        if self.single_flight is None:
+            return await self._fill(redis_key, base_key, entity_type, lookup_val, self.conn)
+        return await self.single_flight.do(
+            redis_key, lambda: self._fill_shared(redis_key, base_key, entity_type, lookup_val)
+        )
+
+    async def _fill_shared(self, redis_key: str, base_key: str, entity_type: str, lookup_val: str | int) -> bytes | None:
+        """
+        Общая загрузка переживает отмену запроса, который её начал, поэтому идёт
+        на своём соединении: соединение запроса закрывается вместе с ним.
+        """
+        async with LazyConnection(self.conn.engine) as conn:
+            return await self._fill(redis_key, base_key, entity_type, lookup_val, conn)
+
+    async def _fill(
+        self, redis_key: str, base_key: str, entity_type: str, lookup_val: str | int, conn: DbConnection
+    ) -> bytes | None:
+        lock_key = RedisKeys.lock(redis_key)
+        lock_token = None
+
+        if self.settings.schedule_fill_lock_enabled:
+            lock_token = uuid.uuid4().hex
+            try:
+                acquired = await self.redis.set(
+                    lock_key, lock_token, nx=True, px=int(self.settings.schedule_fill_lock_timeout * 1000)
+                )
+            except RedisError:
+                acquired = True
+
+            if not acquired:
+                # Другой воркер уже читает БД: ждём, пока он заполнит ключ
+                lock_token = None
+                filled = await self._wait_for_fill(redis_key)
+                if filled is not None:
+                    return filled
+
+        try:
+            serialized = await self._fetch_from_db_scd2(conn, entity_type, lookup_val)
+            if not serialized:
+                return None
+
+            raw = serialized.encode()
+            stored = encode_cache_value(raw, self.settings.redis_schedule_compression_level)
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.setex(redis_key, self.settings.redis_schedule_cache_ttl, stored)
+                pipe.setex(RedisKeys.stale(base_key), self.settings.redis_schedule_stale_ttl, stored)
+                await pipe.execute()
+            except RedisError:
+                pass
+
+            self._store_local(redis_key, raw, self.settings.redis_schedule_cache_ttl)
+            return raw
+        finally:
+            if lock_token is not None:
+                await self._release_lock(lock_key, lock_token)
+
+    async def _wait_for_fill(self, redis_key: str) -> bytes | None:
+        deadline = time.monotonic() + self.settings.schedule_fill_lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            try:
+                cached = await self.redis.get(redis_key)
+                if cached:
+                    raw = decode_cache_value(cached)
+                    self._store_local(redis_key, raw, None)
+                    return raw
+            except (RedisError, zlib.error):
+                return None
+        return None
+
+    async def _release_lock(self, lock_key: str, token: str) -> None:
+        try:
+            await self.redis.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+        except RedisError:
+            pass
+
+    async def _get_stale(self, base_key: str) -> bytes | None:
+        """
+        Копия хранится вне пространства имён поколения: при ошибке БД
+        лучше отдать прошлую версию, чем ничего.
+        """
+        try:
+            stale = await self.redis.get(RedisKeys.stale(base_key))
+            return decode_cache_value(stale) if stale else None
+        except (RedisError, zlib.error):
+            return None
+
+    def _store_local(self, key: str, raw: bytes, ttl: int | None) -> None:
+        if self.local_cache is not None:
+            self.local_cache.set(key, raw, len(raw), ttl)
+
     async def _resolve_identifier(self, entity_type: str, identifier: str) -> tuple[str, str | int | None]:
         """
-        Возвращает (Redis Key, Database Lookup Value)
+        Возвращает (Redis Key без поколения, Database Lookup Value)
         Database Lookup Value: 
            - для групп: строка имени ("221703")
            - для сотрудников: int ID (5050)
@@ -65,26 +296,34 @@ class ScheduleService:
             return key, identifier
 
         if entity_type == "employee":
-            _, resolved_url_id, matches = await resolve_employee_identifier(self.conn, identifier)
+            resolved_id, resolved_url_id, matches = await resolve_employee_identifier(
+                self.conn, identifier, index=self.employee_index
+            )
             
-            if not resolved_url_id:
+            # resolved_id < 0: сотрудник не определён однозначно, resolved_url_id - исходная строка
+            if resolved_id < 0 or not resolved_url_id:
                 if matches:
                      raise ValueError(json.dumps({"message": "Ambiguous identifier", "matches": matches}))
                 return RedisKeys.schedule(entity_type, identifier), None
 
-            query = select(employees.c.id).where(employees.c.url_id == resolved_url_id)
-            res = await self.conn.execute(query)
-            row = res.mappings().first()
-            
+            directory = await load_employee_directory(self.conn, self.employee_index)
+            if directory is not None:
+                row = directory.get_by_url_id(resolved_url_id)
+            else:
+                query = select(employees.c.id).where(employees.c.url_id == resolved_url_id)
+                res = await self.conn.execute(query)
+                row = res.mappings().first()
+
             return RedisKeys.schedule(entity_type, resolved_url_id), row["id"] if row else None
 
         raise ValueError("Unknown entity type")
 
-    async def _fetch_from_db_scd2(self, entity_type: str, lookup_val: str | int) -> Any | None:
+    async def _fetch_from_db_scd2(self, conn: DbConnection, entity_type: str, lookup_val: str | int) -> str | None:
         """
         Ищет актуальное расписание (valid_to IS NULL).
+        Документ читается как текст, без разбора JSON на стороне приложения.
         """
-        query = select(schedule_storage.c.data).where(
+        query = select(cast(schedule_storage.c.data, Text).label("data")).where(
             schedule_storage.c.valid_to.is_(None)
         )
 
@@ -95,6 +334,6 @@ class ScheduleService:
 
         query = query.order_by(schedule_storage.c.api_last_update_ts.desc().nulls_last()).limit(1)
 
-        result = await self.conn.execute(query)
+        result = await conn.execute(query)
         row = result.mappings().first()
         return row["data"] if row else None
\ No newline at end of file
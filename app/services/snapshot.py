@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Generic, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.session import DbConnection
+from app.services.generation_service import DataGeneration
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Пауза перед повторной перезагрузкой после ошибки: удваивается до максимума
+RELOAD_RETRY_MIN = 1.0
+RELOAD_RETRY_MAX = 60.0
+
+
+class GenerationSnapshot(ABC, Generic[T]):
+    """
+    Данные из БД в памяти процесса, которые перезагружаются при смене
+    поколения данных ETL (или по истечении max_age, если поколение неизвестно).
+    Новый снимок подменяет старый целиком, читатели всегда видят согласованные данные.
+    """
+
+    name = "snapshot"
+
+    def __init__(self, generation: DataGeneration | None, max_age: float):
+        self.generation = generation
+        self.max_age = max_age
+
+        self._data: T | None = None
+        self._loaded_generation: str | None = None
+        self._loaded_at = 0.0
+        # После неудачной перезагрузки прошлый снимок отдаётся до _retry_at
+        self._retry_at = 0.0
+        self._failures = 0
+        self._lock = asyncio.Lock()
+        self._preload_task: asyncio.Task | None = None
+
+    @property
+    def data(self) -> T | None:
+        return self._data
+
+    def is_fresh(self) -> bool:
+        if self._data is None:
+            return False
+        current = self.generation.value if self.generation else None
+        if current != self._loaded_generation:
+            return False
+        return time.monotonic() - self._loaded_at < self.max_age
+
+    def is_current(self) -> bool:
+        """
+        Снимок построен по текущему поколению данных. Между сменой поколения
+        и окончанием фоновой перезагрузки get() отдаёт снимок прошлого поколения.
+        """
+        current = self.generation.value if self.generation else None
+        return self._data is not None and current == self._loaded_generation
+
+    def _backing_off(self) -> bool:
+        return self._data is not None and time.monotonic() < self._retry_at
+
+    async def get(self, conn: DbConnection) -> T:
+        """
+        Устаревший снимок отдаётся сразу, а перезагружается в фоне (stale-while-revalidate):
+        смена поколения не задерживает запросы на время перестроения.
+        Ждать приходится только первой загрузки.
+        """
+        if self.is_fresh():
+            return self._data  # type: ignore[return-value]
+        if self._data is not None:
+            if not self._backing_off():
+                self.preload(conn.engine)
+            return self._data
+        return await self._reload(conn)
+
+    async def _reload(self, conn: DbConnection) -> T:
+        async with self._lock:
+            if self.is_fresh() or self._backing_off():
+                return self._data  # type: ignore[return-value]
+
+            generation = self.generation.value if self.generation else None
+            started = time.perf_counter()
+            try:
+                data = await self._load(conn)
+            except Exception:
+                if self._data is None:
+                    raise
+                # Лучше продолжать отвечать по прошлому снимку, чем отказывать,
+                # и не повторять полную загрузку на каждом запросе к перегруженной БД
+                delay = min(RELOAD_RETRY_MIN * 2 ** self._failures, RELOAD_RETRY_MAX)
+                self._failures += 1
+                self._retry_at = time.monotonic() + delay
+                logger.warning(
+                    "Failed to reload %s, keeping previous one for %.0f s", self.name, delay, exc_info=True
+                )
+                return self._data
+
+            self._data = data
+            self._loaded_generation = generation
+            self._loaded_at = time.monotonic()
+            self._retry_at = 0.0
+            self._failures = 0
+            logger.info(
+                "Loaded %s for generation %s in %.1f ms",
+                self.name, generation, (time.perf_counter() - started) * 1000,
+            )
+            return data
+
+    def preload(self, engine: AsyncEngine) -> None:
+        """
+        Загружает снимок в фоне на своём соединении: при старте - чтобы первый
+        запрос не ждал загрузки, при смене поколения - пока запросы получают прошлый снимок.
+        """
+        if self._preload_task is None or self._preload_task.done():
+            self._preload_task = asyncio.create_task(self._preload(engine))
+
+    async def _preload(self, engine: AsyncEngine) -> None:
+        try:
+            async with engine.connect() as conn:
+                await self._reload(conn)
+        except Exception:
+            logger.warning("Failed to preload %s", self.name, exc_info=True)
+
+    @abstractmethod
+    async def _load(self, conn: DbConnection) -> T:
+        """
+        Полная загрузка снимка из БД.
+        """
@@ -1,26 +1,131 @@
-from typing import Any
+import logging
+from bisect import bisect_right
+from typing import Any, AsyncIterator, Sequence
 
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy import select, tuple_
+from sqlalchemy.exc import SQLAlchemyError
 
+from app.core.pagination import Page, decode_cursor, encode_cursor
+from app.db.rows import RowMapper
+from app.db.session import DbConnection
 from app.db.tables import (faculties, departments, specialities, 
                            student_groups, employees, departments_employees,
                            auditories)
 from app.schemas.structure import (Faculty, Department, Auditory,
                                    Specialty, Group, Employee,
                                    GroupInfo)
+from app.services.structure_snapshot import ReferenceData, StructureSnapshot, name_key
+
+
+logger = logging.getLogger(__name__)
+
+_FACULTY = RowMapper(Faculty)
+_DEPARTMENT = RowMapper(Department)
+_SPECIALTY = RowMapper(Specialty)
+_GROUP = RowMapper(Group)
+_EMPLOYEE = RowMapper(Employee)
+_AUDITORY = RowMapper(Auditory)
+_GROUP_INFO = RowMapper(GroupInfo)
+
+# Строк в одной пачке серверного курсора при выгрузке
+EXPORT_BATCH_SIZE = 1000
 
 
 class StructureService:
-    def __init__(self, conn: AsyncConnection):
+    def __init__(self, conn: DbConnection, snapshot: StructureSnapshot | None = None):
         self.conn = conn
+        self.snapshot = snapshot
+        # Последний ответ построен по снимку прошлого поколения данных
+        self.served_stale = False
 
-    async def get_auditories(self) -> list[Auditory]:
-        query = select(auditories).order_by(auditories.c.name)
-        result = await self.conn.execute(query)
-        return [Auditory.model_validate(r) for r in result.mappings().all()]
+    async def _get_reference(self) -> ReferenceData | None:
+        if self.snapshot is None:
+            return None
+        try:
+            reference = await self.snapshot.get(self.conn)
+        except SQLAlchemyError:
+            logger.warning("Reference data snapshot unavailable, falling back to database query", exc_info=True)
+            return None
+        self.served_stale = not self.snapshot.is_current()
+        return reference
+
+    async def get_directory_json(self, directory_name: str) -> bytes | None:
+        """
+        Готовый JSON нефильтрованного справочника из снимка;
+        None - снимок недоступен, список нужно получить обычными методами.
+        """
+        reference = await self._get_reference()
+        return reference.json[directory_name] if reference is not None else None
+
+    def _reference_page(
+        self,
+        reference: ReferenceData,
+        name: str,
+        records: Sequence[Any],
+        cursor: str | None,
+        page_size: int | None,
+    ) -> Page[Any]:
+        """
+        Страница записей снимка, отсортированных по (name, id).
+        """
+        start = 0
+        if cursor is not None:
+            start = bisect_right(records, decode_cursor(name, cursor, (str, int)), key=name_key)
+
+        end = len(records) if page_size is None else start + page_size
+        chunk = records[start:end]
+        next_cursor = encode_cursor(name, name_key(chunk[-1])) if end < len(records) else None
+
+        # Весь справочник на одной странице - отдаём заранее сериализованный JSON
+        if start == 0 and next_cursor is None and records is getattr(reference, name):
+            return Page(raw=reference.json[name])
+        return Page(reference.models(name, chunk), next_cursor)
+
+    async def _name_keyset_page(
+        self,
+        name: str,
+        query: Any,
+        table: Any,
+        mapper: RowMapper,
+        cursor: str | None,
+        page_size: int | None,
+    ) -> Page[Any]:
+        """
+        Страница из БД с сортировкой по (name, id). Имена сравниваются в COLLATE "C",
+        как строки Python в снимке, поэтому курсор одинаково работает в обоих режимах.
+        """
+        name_c = table.c.name.collate("C")
+        if cursor is not None:
+            after_name, after_id = decode_cursor(name, cursor, (str, int))
+            query = query.where(tuple_(name_c, table.c.id) > tuple_(after_name, after_id))
+
+        query = query.order_by(name_c, table.c.id)
+        if page_size is not None:
+            query = query.limit(page_size + 1)
+        rows = (await self.conn.execute(query)).mappings().all()
+
+        items = mapper.many(rows[:page_size])
+        has_more = page_size is not None and len(rows) > page_size
+        next_cursor = encode_cursor(name, (items[-1].name, items[-1].id)) if has_more else None
+        return Page(items, next_cursor)
+
+    async def get_auditories(self, cursor: str | None = None, page_size: int | None = None) -> Page[Auditory]:
+        """
+        :param page_size: None - весь список после cursor одной страницей
+        """
+        reference = await self._get_reference()
+        if reference is not None:
+            return self._reference_page(reference, "auditories", reference.auditories, cursor, page_size)
+
+        return await self._name_keyset_page(
+            "auditories", select(auditories), auditories, _AUDITORY, cursor, page_size
+        )
 
     async def get_group_info(self, group_name: str) -> GroupInfo | None:
+        reference = await self._get_reference()
+        if reference is not None:
+            return reference.group_info.get(group_name)
+
         query = (
             select(
                 student_groups.c.name.label("group_name"),
@@ -40,47 +145,113 @@ class StructureService:
 
         result = await self.conn.execute(query)
         row = result.mappings().first()
-        return GroupInfo(**dict(row)) if row else None
+        return _GROUP_INFO(row) if row else None
 
     async def get_faculties(self) -> list[Faculty]:
+        reference = await self._get_reference()
+        if reference is not None:
+            return reference.models("faculties")
+
         query = select(faculties).order_by(faculties.c.id)
         result = await self.conn.execute(query)
-        return [Faculty.model_validate(r) for r in result.mappings().all()]
+        return _FACULTY.many(result.mappings().all())
 
     async def get_departments(self) -> list[Department]:
+        reference = await self._get_reference()
+        if reference is not None:
+            return reference.models("departments")
+
         query = select(departments).order_by(departments.c.id)
         result = await self.conn.execute(query)
-        return [Department.model_validate(r) for r in result.mappings().all()]
+        return _DEPARTMENT.many(result.mappings().all())
 
     async def get_specialities(self, faculty_id: int | None = None) -> list[Specialty]:
+        reference = await self._get_reference()
+        if reference is not None:
+            if faculty_id is None:
+                return reference.models("specialities")
+            return reference.models("specialities", reference.specialities_by_faculty.get(faculty_id, ()))
+
         query = select(specialities).order_by(specialities.c.id)
         if faculty_id is not None:
             query = query.where(specialities.c.faculty_id == faculty_id)
         
         result = await self.conn.execute(query)
-        return [Specialty.model_validate(r) for r in result.mappings().all()]
+        return _SPECIALTY.many(result.mappings().all())
+
+    async def get_groups(
+        self,
+        specialty_id: int | None = None,
+        cursor: str | None = None,
+        page_size: int | None = None,
+    ) -> Page[Group]:
+        """
+        :param page_size: None - весь список после cursor одной страницей
+        """
+        reference = await self._get_reference()
+        if reference is not None:
+            records = reference.groups if specialty_id is None else reference.groups_by_specialty.get(specialty_id, [])
+            return self._reference_page(reference, "groups", records, cursor, page_size)
 
-    async def get_groups(self, specialty_id: int | None = None) -> list[Group]:
         query = select(student_groups).where(student_groups.c.valid_to.is_(None))
-        
-        query = query.order_by(student_groups.c.name)
-        
         if specialty_id is not None:
             query = query.where(student_groups.c.specialty_id == specialty_id)
-        
-        result = await self.conn.execute(query)
-        return [Group.model_validate(r) for r in result.mappings().all()]
 
-    async def get_employees_by_department(self, department_id: int | None = None) -> list[Employee]:
+        return await self._name_keyset_page("groups", query, student_groups, _GROUP, cursor, page_size)
+
+    async def get_employees_by_department(
+        self,
+        department_id: int | None = None,
+        cursor: str | None = None,
+        page_size: int | None = None,
+    ) -> Page[Employee]:
+        """
+        :param page_size: None - весь список после cursor одной страницей
+        """
         if department_id is None:
-            query = select(employees).order_by(employees.c.id)
+            query = select(employees)
+            key = employees.c.id
         else:
             query = (
                 select(employees)
                 .join(departments_employees, departments_employees.c.employee_id == employees.c.id)
                 .where(departments_employees.c.department_id == department_id)
-                .order_by(employees.c.id)
             )
+            # Диапазон по первичному ключу (department_id, employee_id)
+            key = departments_employees.c.employee_id
 
-        result = await self.conn.execute(query)
-        return [Employee.model_validate(r) for r in result.mappings().all()]
\ No newline at end of file
+        if cursor is not None:
+            (after_id,) = decode_cursor("employees", cursor, (int,))
+            query = query.where(key > after_id)
+
+        query = query.order_by(key)
+        if page_size is not None:
+            query = query.limit(page_size + 1)
+        rows = (await self.conn.execute(query)).mappings().all()
+
+        items = _EMPLOYEE.many(rows[:page_size])
+        has_more = page_size is not None and len(rows) > page_size
+        next_cursor = encode_cursor("employees", (items[-1].id,)) if has_more else None
+        return Page(items, next_cursor)
+
+    async def stream_employees(
+        self,
+        department_id: int | None = None,
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> AsyncIterator[list[Employee]]:
+        """
+        Выгрузка сотрудников по id пачками через серверный курсор:
+        в памяти одновременно не больше batch_size строк.
+        """
+        query = select(employees)
+        if department_id is not None:
+            query = (
+                query
+                .join(departments_employees, departments_employees.c.employee_id == employees.c.id)
+                .where(departments_employees.c.department_id == department_id)
+            )
+        query = query.order_by(employees.c.id).execution_options(yield_per=batch_size)
+
+        result = await self.conn.stream(query)
+        async for rows in result.mappings().partitions():
+            yield _EMPLOYEE.many(rows)
@@ -0,0 +1,213 @@
+import asyncio
+from typing import Any, Sequence
+
+from sqlalchemy import select
+
+from app.core.serialization import list_adapter
+from app.db.rows import RowMapper
+from app.db.session import DbConnection
+from app.db.tables import faculties, departments, specialities, student_groups, auditories
+from app.schemas.structure import Faculty, Department, Specialty, Group, Auditory, GroupInfo
+from app.services.generation_service import DataGeneration
+from app.services.snapshot import GenerationSnapshot
+
+
+class FacultyRecord:
+    __slots__ = ("id", "name", "abbr")
+
+    def __init__(self, id: int, name: str, abbr: str):
+        self.id = id
+        self.name = name
+        self.abbr = abbr
+
+
+class DepartmentRecord:
+    __slots__ = ("id", "name", "abbr", "url_id")
+
+    def __init__(self, id: int, name: str, abbr: str, url_id: str):
+        self.id = id
+        self.name = name
+        self.abbr = abbr
+        self.url_id = url_id
+
+
+class SpecialtyRecord:
+    __slots__ = ("id", "name", "abbr", "faculty_id")
+
+    def __init__(self, id: int, name: str, abbr: str, faculty_id: int):
+        self.id = id
+        self.name = name
+        self.abbr = abbr
+        self.faculty_id = faculty_id
+
+
+class GroupRecord:
+    __slots__ = ("id", "name", "specialty_id", "course", "education_degree", "number_of_students")
+
+    def __init__(
+        self,
+        id: int,
+        name: str,
+        specialty_id: int,
+        course: int | None,
+        education_degree: int,
+        number_of_students: int | None,
+    ):
+        self.id = id
+        self.name = name
+        self.specialty_id = specialty_id
+        self.course = course
+        self.education_degree = education_degree
+        self.number_of_students = number_of_students
+
+
+class AuditoryRecord:
+    __slots__ = ("id", "name", "building_number", "auditory_type", "capacity")
+
+    def __init__(
+        self,
+        id: int,
+        name: str,
+        building_number: str | None,
+        auditory_type: str | None,
+        capacity: int | None,
+    ):
+        self.id = id
+        self.name = name
+        self.building_number = building_number
+        self.auditory_type = auditory_type
+        self.capacity = capacity
+
+
+# Модель ответа для каждого справочника
+DIRECTORY_MODELS: dict[str, Any] = {
+    "faculties": Faculty,
+    "departments": Department,
+    "specialities": Specialty,
+    "groups": Group,
+    "auditories": Auditory,
+}
+_MAPPERS = {name: RowMapper(model) for name, model in DIRECTORY_MODELS.items()}
+
+
+def name_key(record: Any) -> tuple[str, int]:
+    """
+    Ключ сортировки и keyset-курсора для групп и аудиторий.
+    """
+    return record.name, record.id
+
+
+class ReferenceData:
+    """
+    Снимок справочников: записи в порядке, в котором их отдаёт API
+    (группы и аудитории - по (name, id) в порядке кодов символов, как COLLATE "C"),
+    индексы факультет -> специальности, специальность -> группы, имя группы -> GroupInfo
+    и заранее сериализованные JSON-ответы для нефильтрованных списков.
+    """
+
+    __slots__ = (
+        "faculties", "departments", "specialities", "groups", "auditories",
+        "specialities_by_faculty", "groups_by_specialty", "group_info", "json",
+    )
+
+    def __init__(
+        self,
+        faculty_records: Sequence[FacultyRecord],
+        department_records: Sequence[DepartmentRecord],
+        specialty_records: Sequence[SpecialtyRecord],
+        group_records: Sequence[GroupRecord],
+        auditory_records: Sequence[AuditoryRecord],
+    ):
+        self.faculties = tuple(faculty_records)
+        self.departments = tuple(department_records)
+        self.specialities = tuple(specialty_records)
+        self.groups = tuple(sorted(group_records, key=name_key))
+        self.auditories = tuple(sorted(auditory_records, key=name_key))
+
+        self.specialities_by_faculty: dict[int, list[SpecialtyRecord]] = {}
+        for specialty in self.specialities:
+            self.specialities_by_faculty.setdefault(specialty.faculty_id, []).append(specialty)
+
+        self.groups_by_specialty: dict[int, list[GroupRecord]] = {}
+        for group in self.groups:
+            self.groups_by_specialty.setdefault(group.specialty_id, []).append(group)
+
+        faculty_by_id = {f.id: f for f in self.faculties}
+        specialty_by_id = {s.id: s for s in self.specialities}
+        self.group_info: dict[str, GroupInfo] = {}
+        for group in self.groups:
+            specialty = specialty_by_id.get(group.specialty_id)
+            faculty = faculty_by_id.get(specialty.faculty_id) if specialty else None
+            if specialty is None or faculty is None:
+                continue
+            self.group_info[group.name] = GroupInfo(
+                group_name=group.name,
+                course=group.course,
+                specialty_name=specialty.name,
+                specialty_abbr=specialty.abbr,
+                faculty_abbr=faculty.abbr,
+            )
+
+        self.json: dict[str, bytes] = {
+            name: dump_directory(name, getattr(self, name)) for name in DIRECTORY_MODELS
+        }
+
+    def models(self, name: str, records: Sequence[Any] | None = None) -> list[Any]:
+        mapper = _MAPPERS[name]
+        return [mapper.from_attributes(r) for r in (getattr(self, name) if records is None else records)]
+
+
+def dump_directory(name: str, records: Sequence[Any]) -> bytes:
+    mapper = _MAPPERS[name]
+    return list_adapter(DIRECTORY_MODELS[name]).dump_json([mapper.from_attributes(r) for r in records])
+
+
+def build_reference_data(rows: dict[str, Sequence[Any]]) -> ReferenceData:
+    return ReferenceData(
+        [FacultyRecord(r["id"], r["name"], r["abbr"]) for r in rows["faculties"]],
+        [DepartmentRecord(r["id"], r["name"], r["abbr"], r["url_id"]) for r in rows["departments"]],
+        [SpecialtyRecord(r["id"], r["name"], r["abbr"], r["faculty_id"]) for r in rows["specialities"]],
+        [
+            GroupRecord(
+                r["id"], r["name"], r["specialty_id"], r["course"],
+                r["education_degree"], r["number_of_students"],
+            )
+            for r in rows["groups"]
+        ],
+        [
+            AuditoryRecord(r["id"], r["name"], r["building_number"], r["auditory_type"], r["capacity"])
+            for r in rows["auditories"]
+        ],
+    )
+
+
+class StructureSnapshot(GenerationSnapshot[ReferenceData]):
+    """
+    Справочники в памяти процесса (app.state.structure_snapshot).
+    Меняются несколько раз за семестр, перечитываются при смене поколения данных.
+    """
+
+    name = "reference data snapshot"
+
+    def __init__(self, generation: DataGeneration | None, max_age: float):
+        super().__init__(generation, max_age)
+
+    async def _load(self, conn: DbConnection) -> ReferenceData:
+        queries = {
+            "faculties": select(faculties).order_by(faculties.c.id),
+            "departments": select(departments).order_by(departments.c.id),
+            "specialities": select(specialities).order_by(specialities.c.id),
+            "groups": (
+                select(student_groups)
+                .where(student_groups.c.valid_to.is_(None))
+                .order_by(student_groups.c.name)
+            ),
+            "auditories": select(auditories).order_by(auditories.c.name),
+        }
+
+        rows = {}
+        for name, query in queries.items():
+            result = await conn.execute(query)
+            rows[name] = result.mappings().all()
+
+        return await asyncio.to_thread(build_reference_data, rows)
@@ -2,28 +2,54 @@ from redis.asyncio import Redis
 from redis.exceptions import RedisError
 
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncConnection
 
 from app.core.config import Settings
+from app.db.session import DbConnection
 from app.db.tables import system_state
+from app.core.metrics import CACHE_REQUESTS
 from app.core.redis_keys import RedisKeys
+from app.services.cache_service import LocalCache
+from app.services.generation_service import DataGeneration
 
 
 class SystemService:
-    def __init__(self, conn: AsyncConnection, redis: Redis, settings: Settings):
+    def __init__(
+        self,
+        conn: DbConnection,
+        redis: Redis,
+        settings: Settings,
+        local_cache: LocalCache | None = None,
+        generation: DataGeneration | None = None,
+    ):
         self.conn = conn
         self.redis = redis
         self.settings = settings
+        self.local_cache = local_cache
+        self.generation = generation
 
     async def get_current_week(self) -> int:
-        cache_key = RedisKeys.SYSTEM_CURRENT_WEEK
+        cache_key = RedisKeys.with_generation(
+            RedisKeys.SYSTEM_CURRENT_WEEK, self.generation.value if self.generation else None
+        )
+
+        if self.local_cache is not None:
+            local = self.local_cache.get(cache_key)
+            if local is not None:
+                CACHE_REQUESTS.inc("current_week", "local", "hit")
+                return local
+            CACHE_REQUESTS.inc("current_week", "local", "miss")
 
         try:
-            cached = await self.redis.get(cache_key)
+            pipe = self.redis.pipeline(transaction=False)
+            cached, redis_ttl = await pipe.get(cache_key).ttl(cache_key).execute()
             if cached:
-                return int(cached)
+                week_number = int(cached)
+                CACHE_REQUESTS.inc("current_week", "redis", "hit")
+                self._store_local(cache_key, week_number, redis_ttl if redis_ttl > 0 else None)
+                return week_number
+            CACHE_REQUESTS.inc("current_week", "redis", "miss")
         except (RedisError, ValueError):
-            pass
+            CACHE_REQUESTS.inc("current_week", "redis", "error")
 
         query = select(system_state.c.value).where(system_state.c.key == "current_week")
         result = await self.conn.execute(query)
@@ -43,4 +69,9 @@ class SystemService:
         except RedisError:
             pass
 
-        return week_number
\ No newline at end of file
+        self._store_local(cache_key, week_number, self.settings.redis_curr_week_cache_ttl)
+        return week_number
+
+    def _store_local(self, key: str, week_number: int, ttl: int | None) -> None:
+        if self.local_cache is not None:
+            self.local_cache.set(key, week_number, len(str(week_number)), ttl)
\ No newline at end of file
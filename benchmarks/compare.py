@@ -0,0 +1,83 @@
+"""
+Сравнение двух прогонов benchmarks.suite: изменение p50/p99 по каждому случаю.
+
+    python -m benchmarks.compare benchmarks/results/old.json benchmarks/results/new.json --threshold 10
+
+Код возврата 1, если хотя бы один случай замедлился больше чем на threshold процентов
+(по p50 или p99) либо перестал выполняться.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+METRICS = ("p50_ms", "p99_ms")
+
+
+def load(path: Path) -> tuple[dict[str, Any], dict[tuple[str, str], dict[str, Any]]]:
+    report = json.loads(path.read_text(encoding="utf-8"))
+    return report.get("meta", {}), {(r["group"], r["name"]): r for r in report["results"]}
+
+
+def change(old: float, new: float) -> float | None:
+    return round((new - old) / old * 100, 1) if old else None
+
+
+def compare(
+    old: dict[tuple[str, str], dict[str, Any]],
+    new: dict[tuple[str, str], dict[str, Any]],
+    threshold: float,
+) -> list[dict[str, Any]]:
+    rows = []
+    for key in sorted(old.keys() | new.keys()):
+        before, after = old.get(key), new.get(key)
+        row: dict[str, Any] = {"group": key[0], "name": key[1], "status": "ok"}
+
+        if before is None or after is None:
+            row["status"] = "added" if before is None else "removed"
+        elif "error" in after:
+            row["status"] = "error" if "error" in before else "broken"
+            row["error"] = after["error"]
+        elif "error" in before:
+            row["status"] = "fixed"
+        else:
+            for metric in METRICS:
+                row[metric] = [before[metric], after[metric], change(before[metric], after[metric])]
+            deltas = [row[metric][2] for metric in METRICS if row[metric][2] is not None]
+            if any(delta > threshold for delta in deltas):
+                row["status"] = "regression"
+            elif deltas and all(delta < -threshold for delta in deltas):
+                row["status"] = "improvement"
+        rows.append(row)
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("old", type=Path)
+    parser.add_argument("new", type=Path)
+    parser.add_argument("--threshold", type=float, default=10.0, help="допустимое замедление, %%")
+    parser.add_argument("--all", action="store_true", help="печатать и случаи без изменений")
+    args = parser.parse_args()
+
+    old_meta, old = load(args.old)
+    new_meta, new = load(args.new)
+    print(json.dumps({"old": old_meta.get("commit"), "new": new_meta.get("commit")}))
+
+    rows = compare(old, new, args.threshold)
+    for row in rows:
+        if args.all or row["status"] != "ok":
+            print(json.dumps(row, ensure_ascii=False))
+
+    summary: dict[str, int] = {}
+    for row in rows:
+        summary[row["status"]] = summary.get(row["status"], 0) + 1
+    print(json.dumps({"summary": summary}))
+
+    if summary.get("regression") or summary.get("broken"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
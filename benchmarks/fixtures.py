@@ -0,0 +1,133 @@
+"""
+Синтетические данные для бенчмарков.
+Формы документов повторяют то, что ETL кладёт в schedule_json_storage.data.
+"""
+import json
+import random
+
+DAYS = ["Понедельник", "Вторник", "Среда", "Четверг", "Пятница", "Суббота"]
+SUBJECTS = [
+    ("ОАиП", "Основы алгоритмизации и программирования"),
+    ("БД", "Базы данных"),
+    ("МА", "Математический анализ"),
+    ("Физ", "Физика"),
+    ("ИнЯз", "Иностранный язык"),
+    ("ТВиМС", "Теория вероятностей и математическая статистика"),
+]
+SLOTS = [("08:30", "09:55"), ("10:05", "11:30"), ("12:00", "13:25"), ("13:35", "15:00"), ("15:30", "16:55")]
+
+
+def make_lesson(rng: random.Random) -> dict:
+    abbr, full = rng.choice(SUBJECTS)
+    start, end = rng.choice(SLOTS)
+    return {
+        "auditories": [f"{rng.randint(100, 999)}-{rng.randint(1, 8)} к."],
+        "endLessonTime": end,
+        "lessonTypeAbbrev": rng.choice(["ЛК", "ПЗ", "ЛР"]),
+        "note": None,
+        "numSubgroup": rng.choice([0, 0, 1, 2]),
+        "startLessonTime": start,
+        "studentGroups": [
+            {"specialityName": "Информатика и технологии программирования", "name": "221703", "numberOfStudents": 25}
+        ],
+        "subject": abbr,
+        "subjectFullName": full,
+        "weekNumber": sorted(rng.sample([1, 2, 3, 4], rng.randint(1, 4))),
+        "employees": [
+            {
+                "firstName": "Иван",
+                "lastName": "Иванов",
+                "middleName": "Иванович",
+                "degree": "к.т.н.",
+                "rank": "доцент",
+                "urlId": "i-ivanov",
+                "photoLink": "https://iis.bsuir.by/api/v1/employees/photo/1",
+            }
+        ],
+        "dateLesson": None,
+        "startLessonDate": "01.09.2025",
+        "endLessonDate": "27.12.2025",
+        "announcement": False,
+        "split": False,
+    }
+
+
+def make_schedule(seed: int = 0, lessons_per_day: int = 12) -> dict:
+    rng = random.Random(seed)
+    return {
+        "employeeDto": None,
+        "studentGroupDto": {"name": "221703", "facultyAbbrev": "ФКСиС", "course": 3},
+        "schedules": {day: [make_lesson(rng) for _ in range(lessons_per_day)] for day in DAYS},
+        "exams": [make_lesson(rng) for _ in range(8)],
+        "startDate": "01.09.2025",
+        "endDate": "27.12.2025",
+    }
+
+
+def make_schedule_bytes(seed: int = 0, lessons_per_day: int = 12) -> bytes:
+    return json.dumps(make_schedule(seed, lessons_per_day), ensure_ascii=False).encode()
+
+
+LAST_NAMES = ["Иванов", "Петров", "Сидоров", "Кузнецов", "Смирнов", "Попов", "Васильев", "Новиков"]
+FIRST_NAMES = ["Иван", "Пётр", "Алексей", "Сергей", "Андрей", "Дмитрий"]
+MIDDLE_NAMES = ["Иванович", "Петрович", "Сергеевич", "Андреевич", None]
+
+
+def make_employee_rows(count: int, seed: int = 0) -> list[dict]:
+    """
+    Строки таблицы employees.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        last, first, middle = rng.choice(LAST_NAMES), rng.choice(FIRST_NAMES), rng.choice(MIDDLE_NAMES)
+        rows.append({
+            "id": 500000 + i,
+            "first_name": first,
+            "last_name": last,
+            "middle_name": middle,
+            "degree": rng.choice([None, "к.т.н.", "д.т.н."]),
+            "rank": rng.choice([None, "доцент", "профессор"]),
+            "photo_link": f"https://iis.bsuir.by/api/v1/employees/photo/{500000 + i}",
+            "calendar_id": None,
+            "url_id": f"{first[0].lower()}-{last.lower()}-{i}",
+        })
+    return rows
+
+
+def make_event_rows(count: int, seed: int = 0) -> list[dict]:
+    """
+    Строки запроса EventService: schedule_events + ФИО из employees.
+    """
+    from datetime import time
+
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        abbr, full = rng.choice(SUBJECTS)
+        start, end = rng.choice(SLOTS)
+        is_employee = rng.random() < 0.3
+        rows.append({
+            "id": i,
+            "entity_name": f"e-{i % 300}" if is_employee else str(221700 + i % 300),
+            "entity_type": "employee" if is_employee else "group",
+            "subject": abbr,
+            "subject_full": full,
+            "auditories": [f"{rng.randint(100, 999)}-{rng.randint(1, 8)} к."],
+            "day_of_week": rng.randint(1, 6),
+            "start_time": time.fromisoformat(start),
+            "end_time": time.fromisoformat(end),
+            "week_numbers": sorted(rng.sample([1, 2, 3, 4], rng.randint(1, 4))),
+            "exact_date": None,
+            "related_groups": [{"name": str(221700 + i % 300)}],
+            "subgroup": rng.choice([None, 1, 2]),
+            "search_vector": f"'{abbr.lower()}':1",
+            "related_employees": [
+                {"lastName": rng.choice(LAST_NAMES), "firstName": rng.choice(FIRST_NAMES),
+                 "middleName": rng.choice(MIDDLE_NAMES), "urlId": f"e-{i % 300}"}
+            ],
+            "last_name": rng.choice(LAST_NAMES) if is_employee else None,
+            "first_name": rng.choice(FIRST_NAMES) if is_employee else None,
+            "middle_name": rng.choice(MIDDLE_NAMES) if is_employee else None,
+        })
+    return rows
@@ -0,0 +1,68 @@
+"""
+Стоимость построения моделей ответов из строк БД на одну строку:
+model_validate / Model(**dict(row)) / model_construct против RowMapper.
+Строки - настоящие RowMapping SQLAlchemy, как их возвращает result.mappings().
+
+    python -m benchmarks.row_mapping
+"""
+import json
+import timeit
+
+from sqlalchemy.engine.result import IteratorResult, SimpleResultMetaData
+
+from app.db.rows import RowMapper
+from app.schemas.events import ScheduleEventItem
+from app.schemas.structure import Employee
+from app.services.event_service import EventService
+from benchmarks.fixtures import make_employee_rows, make_event_rows
+
+
+def as_row_mappings(rows: list[dict]) -> list:
+    keys = list(rows[0])
+    result = IteratorResult(SimpleResultMetaData(keys), iter([tuple(row[k] for k in keys) for row in rows]))
+    return result.mappings().all()
+
+
+def process_row_validated(row) -> ScheduleEventItem:
+    """
+    Прежний EventService._process_row: копия строки в dict и валидация модели.
+    """
+    row_dict = dict(row)
+    return ScheduleEventItem(**row_dict, **EventService._display_names(row_dict))
+
+
+def cases(rows: list, model, fields: tuple[str, ...]) -> dict:
+    mapper = RowMapper(model)
+    return {
+        "model_validate": lambda: [model.model_validate(r) for r in rows],
+        "init_from_dict": lambda: [model(**dict(r)) for r in rows],
+        "model_construct": lambda: [model.model_construct(**{k: r[k] for k in fields if k in r}) for r in rows],
+        "row_mapper": lambda: mapper.many(rows),
+    }
+
+
+def run(count: int = 5_000, number: int = 10) -> list[dict]:
+    event_rows = as_row_mappings(make_event_rows(count))
+    employee_rows = as_row_mappings(make_employee_rows(count))
+    event_mapper = RowMapper(ScheduleEventItem)
+
+    suites = {
+        "ScheduleEventItem": cases(event_rows, ScheduleEventItem, tuple(ScheduleEventItem.model_fields)),
+        "Employee": cases(employee_rows, Employee, tuple(Employee.model_fields)),
+        "ScheduleEventItem+display_names": {
+            "process_row_validated": lambda: [process_row_validated(r) for r in event_rows],
+            "row_mapper": lambda: event_mapper.many(event_rows, EventService._display_names),
+        },
+    }
+
+    results = []
+    for name, suite in suites.items():
+        for label, fn in suite.items():
+            seconds = timeit.timeit(fn, number=number) / number
+            results.append({"case": name, "method": label, "rows": count, "us_per_row": round(seconds / count * 1e6, 3)})
+    return results
+
+
+if __name__ == "__main__":
+    for row in run():
+        print(json.dumps(row))
@@ -0,0 +1,37 @@
+"""
+Экономия памяти Redis и стоимость декодирования для формата encode_cache_value.
+Синтетические документы однообразнее реальных, поэтому сжимаются лучше.
+
+    python -m benchmarks.schedule_codec
+"""
+import json
+import timeit
+
+from app.services.cache_service import decode_cache_value, encode_cache_value
+from benchmarks.fixtures import make_schedule_bytes
+
+
+def run(number: int = 200) -> list[dict]:
+    results = []
+    for lessons_per_day in (6, 12, 24):
+        raw = make_schedule_bytes(seed=lessons_per_day, lessons_per_day=lessons_per_day)
+        for level in (0, 1, 6, 9):
+            stored = encode_cache_value(raw, level)
+            assert decode_cache_value(stored) == raw
+
+            encode_s = timeit.timeit(lambda: encode_cache_value(raw, level), number=number) / number
+            decode_s = timeit.timeit(lambda: decode_cache_value(stored), number=number) / number
+            results.append({
+                "raw_bytes": len(raw),
+                "level": level,
+                "stored_bytes": len(stored),
+                "ratio": round(len(stored) / len(raw), 3),
+                "encode_us": round(encode_s * 1e6, 1),
+                "decode_us": round(decode_s * 1e6, 1),
+            })
+    return results
+
+
+if __name__ == "__main__":
+    for row in run():
+        print(json.dumps(row))
@@ -0,0 +1,186 @@
+"""
+Синтетическая БД для benchmarks.suite: схема из app.db.tables, индексы
+из app/db/migrations и детерминированные данные в масштабе scale.
+
+Таблицы пересоздаются - запускать только на одноразовой БД.
+"""
+import random
+from datetime import datetime, time
+
+from sqlalchemy import func, insert, text, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.migrate import apply_migrations
+from app.db.tables import (
+    auditories,
+    departments,
+    departments_employees,
+    employees,
+    faculties,
+    metadata,
+    occupancy_index,
+    schedule_events,
+    schedule_storage,
+    specialities,
+    student_groups,
+    system_state,
+)
+from app.services.event_service import SEARCH_CONFIG
+from benchmarks.fixtures import DAYS, SLOTS, SUBJECTS, make_employee_rows, make_schedule
+
+# Строк в одном INSERT
+CHUNK = 2000
+
+
+async def _insert(conn, table, rows: list[dict]) -> None:
+    for i in range(0, len(rows), CHUNK):
+        await conn.execute(insert(table), rows[i:i + CHUNK])
+
+
+def _group_name(i: int) -> str:
+    return str(200000 + i * 7)
+
+
+async def seed_database(engine: AsyncEngine, scale: int = 1, seed: int = 0) -> dict[str, int]:
+    """
+    Возвращает число строк по таблицам.
+    """
+    rng = random.Random(seed)
+    now = datetime(2025, 9, 1)
+
+    faculty_rows = [{"id": i, "name": f"Факультет {i}", "abbr": f"Ф{i}"} for i in range(1, 9)]
+    department_rows = [
+        {"id": i, "name": f"Кафедра {i}", "abbr": f"К{i}", "url_id": f"dep-{i}"} for i in range(1, 41)
+    ]
+    specialty_rows = [
+        {
+            "id": i, "name": f"Специальность {i}", "abbr": f"С{i}", "code": f"1-{i:02d} 01 01",
+            "education_form": "Дневная", "faculty_id": 1 + i % len(faculty_rows),
+        }
+        for i in range(1, 61)
+    ]
+    group_rows = [
+        {
+            "id": 10000 + i, "name": _group_name(i), "course": 1 + i % 4, "calendar_id": None,
+            "education_degree": 1, "number_of_students": rng.randint(10, 30),
+            "specialty_id": 1 + i % len(specialty_rows), "valid_from": now, "valid_to": None,
+        }
+        for i in range(300 * scale)
+    ]
+    employee_rows = make_employee_rows(1500 * scale, seed=seed)
+    membership_rows = [
+        {"department_id": 1 + i % len(department_rows), "employee_id": row["id"]}
+        for i, row in enumerate(employee_rows)
+    ]
+    auditory_rows = [
+        {
+            "id": i, "name": f"{100 + i % 900}-{1 + i % 8} к.", "building_number": str(1 + i % 8),
+            "note": None, "capacity": rng.choice([12, 24, 30, 60, 120]),
+            "auditory_type": rng.choice(["лк", "пз", "лб"]), "department_id": None,
+        }
+        for i in range(1, 400 * scale + 1)
+    ]
+
+    teachers = employee_rows[:300 * scale]
+    event_rows = []
+    for group in group_rows:
+        for _ in range(30):
+            event_rows.append(_event(rng, "group", group["name"], group["name"], auditory_rows, teachers))
+    for teacher in teachers:
+        for _ in range(20):
+            group_name = rng.choice(group_rows)["name"]
+            event_rows.append(_event(rng, "employee", teacher["url_id"], group_name, auditory_rows, [teacher]))
+
+    occupancy_rows = []
+    for room in auditory_rows:
+        for _ in range(12):
+            start, end = rng.choice(SLOTS)
+            occupancy_rows.append({
+                "day_of_week": rng.choice(DAYS), "week_number": rng.randint(1, 4),
+                "start_time": time.fromisoformat(start), "end_time": time.fromisoformat(end),
+                "auditory_id": room["id"], "groups": [rng.choice(group_rows)["name"]],
+            })
+
+    storage_rows = []
+    for i, group in enumerate(group_rows):
+        document = make_schedule(seed=i)
+        document["studentGroupDto"]["name"] = group["name"]
+        storage_rows.append({
+            "group_name": group["name"], "employee_id": None, "entity_type": "group",
+            "data": document, "api_last_update_ts": now, "valid_from": now, "valid_to": None,
+        })
+    for i, teacher in enumerate(teachers):
+        document = make_schedule(seed=100000 + i, lessons_per_day=4)
+        storage_rows.append({
+            "group_name": None, "employee_id": teacher["id"], "entity_type": "employee",
+            "data": document, "api_last_update_ts": now, "valid_from": now, "valid_to": None,
+        })
+
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.drop_all)
+        await conn.run_sync(metadata.create_all)
+        await conn.execute(text("DROP TABLE IF EXISTS schema_migrations"))
+
+        for table, rows in (
+            (faculties, faculty_rows),
+            (departments, department_rows),
+            (specialities, specialty_rows),
+            (student_groups, group_rows),
+            (employees, employee_rows),
+            (departments_employees, membership_rows),
+            (auditories, auditory_rows),
+            (schedule_events, event_rows),
+            (occupancy_index, occupancy_rows),
+            (schedule_storage, storage_rows),
+        ):
+            await _insert(conn, table, rows)
+
+        await conn.execute(
+            update(schedule_events).values(
+                search_vector=func.to_tsvector(
+                    SEARCH_CONFIG,
+                    schedule_events.c.subject + " " + func.coalesce(schedule_events.c.subject_full, ""),
+                )
+            )
+        )
+        await _insert(conn, system_state, [
+            {"key": "current_week", "value": "2", "updated_at": now},
+            {"key": "data_generation", "value": "1", "updated_at": now},
+        ])
+
+    await apply_migrations(engine)
+    async with engine.connect() as conn:
+        await conn.execute(text("ANALYZE"))
+
+    return {
+        "groups": len(group_rows),
+        "employees": len(employee_rows),
+        "auditories": len(auditory_rows),
+        "schedule_events": len(event_rows),
+        "occupancy_index": len(occupancy_rows),
+        "schedule_json_storage": len(storage_rows),
+    }
+
+
+def _event(rng: random.Random, entity_type: str, entity_name: str, group_name: str, rooms, teachers) -> dict:
+    abbr, full = rng.choice(SUBJECTS)
+    start, end = rng.choice(SLOTS)
+    teacher = rng.choice(teachers)
+    return {
+        "entity_name": entity_name,
+        "entity_type": entity_type,
+        "subject": abbr,
+        "subject_full": full,
+        "auditories": [rng.choice(rooms)["name"]],
+        "day_of_week": rng.randint(1, 6),
+        "start_time": time.fromisoformat(start),
+        "end_time": time.fromisoformat(end),
+        "week_numbers": sorted(rng.sample([1, 2, 3, 4], rng.randint(1, 4))),
+        "exact_date": None,
+        "related_groups": [{"name": group_name}],
+        "related_employees": [{
+            "lastName": teacher["last_name"], "firstName": teacher["first_name"],
+            "middleName": teacher["middle_name"], "urlId": teacher["url_id"],
+        }],
+        "subgroup": rng.choice([None, None, 1, 2]),
+    }
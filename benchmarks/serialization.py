@@ -0,0 +1,54 @@
+"""
+Стоимость сериализации списков ответов: прежний путь
+(model_dump + json.dumps в MCP, jsonable_encoder + json.dumps в REST)
+против app.core.serialization.dump_json.
+
+    python -m benchmarks.serialization
+"""
+import json
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.serialization import dump_json
+from app.schemas.events import ScheduleEventItem
+from app.schemas.structure import Employee
+from benchmarks.fixtures import make_employee_rows, make_event_rows
+
+
+def mcp_model_dump(items: list) -> bytes:
+    return json.dumps([item.model_dump(mode="json") for item in items], ensure_ascii=False).encode()
+
+
+def rest_jsonable_encoder(items: list) -> bytes:
+    return json.dumps(jsonable_encoder(items), ensure_ascii=False).encode()
+
+
+def make_items(name: str, count: int) -> list:
+    if name == "ScheduleEventItem":
+        return [ScheduleEventItem.model_validate(row) for row in make_event_rows(count)]
+    return [Employee.model_validate(row) for row in make_employee_rows(count)]
+
+
+def run(number: int = 20) -> list[dict]:
+    results = []
+    for name in ("ScheduleEventItem", "Employee"):
+        for count in (1_000, 5_000, 10_000):
+            items = make_items(name, count)
+            assert json.loads(dump_json(items)) == json.loads(mcp_model_dump(items))
+
+            row = {"model": name, "rows": count, "bytes": len(dump_json(items))}
+            for label, fn in (
+                ("model_dump_json_dumps_ms", mcp_model_dump),
+                ("jsonable_encoder_ms", rest_jsonable_encoder),
+                ("dump_json_ms", dump_json),
+            ):
+                seconds = timeit.timeit(lambda: fn(items), number=number) / number
+                row[label] = round(seconds * 1000, 2)
+            results.append(row)
+    return results
+
+
+if __name__ == "__main__":
+    for row in run():
+        print(json.dumps(row))
@@ -0,0 +1,33 @@
+"""
+Формат значений расписания в Redis.
+"""
+import zlib
+
+import pytest
+
+from app.services.cache_service import FORMAT_ZLIB, decode_cache_value, encode_cache_value
+
+RAW = '{"schedules":{"Понедельник":[]},"subject":"ОАиП"}'.encode() * 20
+
+
+@pytest.mark.parametrize("level", [1, 6, 9])
+def test_roundtrip(level):
+    value = encode_cache_value(RAW, level)
+    assert value[0] == FORMAT_ZLIB
+    assert len(value) < len(RAW)
+    assert decode_cache_value(value) == RAW
+
+
+@pytest.mark.parametrize("level", [0, -1])
+def test_level_zero_keeps_plain_json(level):
+    assert encode_cache_value(RAW, level) is RAW
+
+
+def test_plain_json_from_etl():
+    assert decode_cache_value(b'{"a":1}') == b'{"a":1}'
+    assert decode_cache_value(b"") == b""
+
+
+def test_corrupted_value():
+    with pytest.raises(zlib.error):
+        decode_cache_value(bytes((FORMAT_ZLIB,)) + b"not zlib")
@@ -0,0 +1,54 @@
+"""
+Выбор кодировки по Accept-Encoding и сжатие вариантов ответа.
+"""
+import gzip
+
+import pytest
+
+from app.core import compression
+from app.core.compression import compress, negotiate_encoding
+
+
+@pytest.fixture
+def all_encodings(monkeypatch):
+    # Результат не должен зависеть от того, установлены ли brotli и zstandard
+    monkeypatch.setattr(compression, "COMPRESSORS", {"zstd": bytes, "br": bytes, "gzip": bytes})
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("GZIP", "gzip"),
+    ("gzip, deflate, br", "br"),
+    ("gzip, br, zstd", "zstd"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("br;q=0.5, gzip;q=0.5", "br"),
+    ("zstd;q=0, br;q=0, gzip;q=0", None),
+    ("gzip;q=abc", None),
+    ("*", "zstd"),
+    ("*;q=0.1, gzip", "gzip"),
+    ("zstd;q=0, *", "br"),
+])
+def test_negotiate(all_encodings, header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+def test_negotiate_only_installed(monkeypatch):
+    monkeypatch.setattr(compression, "COMPRESSORS", {"gzip": bytes})
+    assert negotiate_encoding("zstd, br") is None
+    assert negotiate_encoding("zstd, br, gzip;q=0.1") == "gzip"
+
+
+def test_gzip_is_deterministic():
+    body = b'{"items":[]}' * 100
+    compressed = compress(body, "gzip")
+    assert compressed == compress(body, "gzip")
+    assert gzip.decompress(compressed) == body
+
+
+@pytest.mark.parametrize("encoding", sorted(compression.COMPRESSORS))
+def test_installed_compressors_shrink_body(encoding):
+    body = b'{"items":[]}' * 100
+    assert len(compress(body, encoding)) < len(body)
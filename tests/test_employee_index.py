@@ -0,0 +1,82 @@
+"""
+Ранжирование поиска сотрудников по индексу в памяти.
+"""
+import pytest
+
+from app.services.employee_index import (
+    RANK_EXACT,
+    RANK_FUZZY,
+    RANK_PREFIX,
+    RANK_SUBSTRING,
+    EmployeeDirectory,
+)
+
+
+def employee(id: int, last: str, first: str, middle: str | None = None) -> dict:
+    return {"id": id, "url_id": f"{last.lower()}-{id}", "last_name": last, "first_name": first, "middle_name": middle}
+
+
+ROWS = [
+    employee(1, "Иванов", "Иван", "Иванович"),
+    employee(2, "Иванова", "Мария", "Петровна"),
+    employee(3, "Петров", "Пётр", "Сергеевич"),
+    employee(4, "Сидоренко", "Анна"),
+    employee(5, "Иванов", "Алексей", "Олегович"),
+]
+
+
+@pytest.fixture(scope="module")
+def directory():
+    return EmployeeDirectory(ROWS, [(100, 1), (100, 3), (200, 2), (200, 999)])
+
+
+def ranked_ids(directory, query, **kwargs):
+    return [(rank, directory.rows[i]["id"]) for rank, _, i in directory.rank(query, **kwargs)]
+
+
+def test_exact_before_prefix(directory):
+    assert ranked_ids(directory, "иванов") == [
+        (RANK_EXACT, 5),
+        (RANK_EXACT, 1),
+        (RANK_PREFIX, 2),
+    ]
+
+
+def test_all_query_tokens_must_match(directory):
+    assert ranked_ids(directory, "Иванов Иван") == [(RANK_EXACT, 1), (RANK_PREFIX, 5), (RANK_PREFIX, 2)]
+    assert ranked_ids(directory, "Иванов Ал") == [(RANK_PREFIX, 5)]
+
+
+def test_yo_and_case_are_normalized(directory):
+    assert ranked_ids(directory, "ПЁТР") == [(RANK_EXACT, 3), (RANK_PREFIX, 2)]
+
+
+def test_substring(directory):
+    assert ranked_ids(directory, "доренко") == [(RANK_SUBSTRING, 4)]
+
+
+def test_fuzzy_only_without_other_matches(directory):
+    ranked = directory.rank("Сидоренка")
+    assert [(rank, directory.rows[i]["id"]) for rank, _, i in ranked] == [(RANK_FUZZY, 4)]
+    assert 0.3 <= ranked[0][1] < 1.0
+
+
+def test_limit_keeps_order(directory):
+    assert ranked_ids(directory, "иванов", limit=2) == [(RANK_EXACT, 5), (RANK_EXACT, 1)]
+
+
+def test_no_match(directory):
+    assert directory.rank("Qwerty") == []
+    assert directory.rank("  ,  ") == []
+
+
+def test_search_by_department(directory):
+    assert [row["id"] for row in directory.search("ив", limit=10, department_id=100)] == [1]
+    assert [row["id"] for row in directory.search(None, limit=10, department_id=100)] == [1, 3]
+    assert [row["id"] for row in directory.search(None, limit=10, department_id=200)] == [2]
+    assert directory.search(None, limit=10) == []
+
+
+def test_get_by_url_id(directory):
+    assert directory.get_by_url_id("петров-3")["id"] == 3
+    assert directory.get_by_url_id("missing") is None
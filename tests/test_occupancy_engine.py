@@ -0,0 +1,122 @@
+"""
+Битовые маски и свободные окна аудиторий без БД: индекс строится из строк в памяти.
+"""
+from datetime import time
+
+import pytest
+
+from app.services.occupancy_engine import (
+    MINUTES_PER_DAY, build_occupancy_index, find_window, from_minutes, merge_intervals, to_minutes
+)
+
+ROOMS = [
+    {"id": 10, "name": "101-1 к.", "capacity": 30, "auditory_type": "лк", "building_number": "1 к."},
+    {"id": 20, "name": "102-1 к.", "capacity": 20, "auditory_type": "пз", "building_number": "1 к."},
+    {"id": 30, "name": "201-2 к.", "capacity": None, "auditory_type": None, "building_number": "2 к."},
+]
+
+
+def occupancy(auditory_id: int, start: time, end: time, day: str = "Понедельник", week: int = 1) -> dict:
+    return {"auditory_id": auditory_id, "day_of_week": day, "week_number": week, "start_time": start, "end_time": end}
+
+
+def free_names(index, check_time: time, building_number: int | None = None, day: str = "Понедельник", week: int = 1):
+    return [room.name for room in index.rooms_for_mask(index.free_mask(day, week, check_time, building_number))]
+
+
+@pytest.fixture
+def index():
+    return build_occupancy_index(30, ROOMS, [
+        occupancy(10, time(9, 0), time(10, 20)),
+        occupancy(30, time(10, 35), time(11, 55)),
+        occupancy(20, time(9, 0), time(10, 20), week=2),
+        # Неизвестная аудитория и пустой интервал игнорируются
+        occupancy(99, time(9, 0), time(10, 20)),
+        occupancy(20, time(12, 0), time(12, 0)),
+    ])
+
+
+def test_busy_room_is_excluded(index):
+    assert free_names(index, time(9, 30)) == ["102-1 к.", "201-2 к."]
+
+
+def test_partially_covered_slot_is_busy(index):
+    # 101-1 свободна с 10:20, 201-2 - до 10:35, но слоты 10:00-10:30 и 10:30-11:00
+    # пересекаются с их занятиями
+    assert free_names(index, time(10, 25)) == ["102-1 к.", "201-2 к."]
+    assert free_names(index, time(10, 30)) == ["101-1 к.", "102-1 к."]
+
+
+def test_week_and_day_are_separate(index):
+    assert free_names(index, time(9, 30), week=2) == ["101-1 к.", "201-2 к."]
+    assert free_names(index, time(9, 30), day="Вторник") == [room["name"] for room in ROOMS]
+
+
+def test_building_filter(index):
+    assert free_names(index, time(11, 0), building_number=2) == []
+    assert free_names(index, time(11, 0), building_number=1) == ["101-1 к.", "102-1 к."]
+    assert free_names(index, time(11, 0), building_number=5) == []
+
+
+def test_rooms_keep_columns(index):
+    assert index.rooms[2].model_dump() == {
+        "name": "201-2 к.", "capacity": None, "auditory_type": None, "building_number": "2 к.",
+    }
+
+
+def test_minutes_conversion():
+    assert to_minutes(time(10, 35)) == 635
+    assert from_minutes(635) == time(10, 35)
+    assert from_minutes(24 * 60) == time(23, 59)
+
+
+@pytest.mark.parametrize("intervals, expected", [
+    ([], []),
+    ([(540, 620), (600, 700)], [(540, 700)]),
+    ([(540, 620), (620, 700)], [(540, 700)]),
+    ([(540, 700), (600, 650)], [(540, 700)]),
+    ([(540, 620), (635, 715)], [(540, 620), (635, 715)]),
+])
+def test_merge_intervals(intervals, expected):
+    assert merge_intervals(intervals) == expected
+
+
+BUSY = [(540, 620), (635, 715), (900, 980)]
+
+
+@pytest.mark.parametrize("start, length, expected", [
+    (480, 60, (0, 540)),
+    (620, 15, (620, 635)),
+    (620, 20, None),
+    (720, 120, (715, 900)),
+    (1000, 60, (980, MINUTES_PER_DAY)),
+    (MINUTES_PER_DAY - 30, 60, None),
+])
+def test_find_window_exact_start(start, length, expected):
+    assert find_window(BUSY, start, length, exact_start=True) == expected
+
+
+@pytest.mark.parametrize("start, length, expected", [
+    (480, 60, (480, 540)),
+    (480, 90, (715, 900)),
+    (620, 15, (620, 635)),
+    (700, 180, (715, 900)),
+    (700, 200, (980, MINUTES_PER_DAY)),
+    (MINUTES_PER_DAY - 30, 60, None),
+])
+def test_find_window_next_free(start, length, expected):
+    assert find_window(BUSY, start, length, exact_start=False) == expected
+
+
+def test_find_window_free_day():
+    assert find_window([], 600, 90, exact_start=True) == (0, MINUTES_PER_DAY)
+    assert find_window([], 600, 90, exact_start=False) == (600, MINUTES_PER_DAY)
+
+
+def test_index_intervals_are_merged():
+    index = build_occupancy_index(30, ROOMS, [
+        occupancy(10, time(10, 35), time(11, 55)),
+        occupancy(10, time(9, 0), time(10, 20)),
+        occupancy(10, time(10, 20), time(10, 35)),
+    ])
+    assert index.intervals[("Понедельник", 1)] == {0: [(540, 715)]}
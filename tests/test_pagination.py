@@ -0,0 +1,80 @@
+"""
+Курсоры keyset-пагинации и формат страницы.
+"""
+import json
+
+import pytest
+
+from app.core.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    Page,
+    clamp_page_size,
+    decode_cursor,
+    encode_cursor,
+    requested_page_size,
+)
+
+
+@pytest.mark.parametrize("key, types", [
+    (("ИиТП", 12), (str, int)),
+    (("",), (str,)),
+    ((0,), (int,)),
+])
+def test_cursor_roundtrip(key, types):
+    cursor = encode_cursor("groups", key)
+    assert "=" not in cursor
+    assert decode_cursor("groups", cursor, types) == key
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", encode_cursor("groups", ["a"])[:-2]])
+def test_malformed_cursor(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor("groups", cursor, (str,))
+
+
+def test_cursor_of_another_list():
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor("auditories", encode_cursor("groups", ["a"]), (str,))
+
+
+@pytest.mark.parametrize("key, types", [
+    (["a"], (str, int)),
+    (["a", "1"], (str, int)),
+    ([True], (int,)),
+])
+def test_cursor_key_shape(key, types):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor("groups", encode_cursor("groups", key), types)
+
+
+@pytest.mark.parametrize("page_size, expected", [
+    (None, DEFAULT_PAGE_SIZE),
+    (0, 1),
+    (-5, 1),
+    (50, 50),
+    (MAX_PAGE_SIZE + 1, MAX_PAGE_SIZE),
+])
+def test_clamp_page_size(page_size, expected):
+    assert clamp_page_size(page_size) == expected
+
+
+@pytest.mark.parametrize("cursor, page_size, expected", [
+    (None, None, None),
+    (None, 50, 50),
+    ("abc", None, DEFAULT_PAGE_SIZE),
+    ("abc", 10, 10),
+])
+def test_requested_page_size(cursor, page_size, expected):
+    assert requested_page_size(cursor, page_size) == expected
+
+
+def test_page_envelope():
+    page = Page(items=[{"id": 1}], next_cursor="abc")
+    assert json.loads(page.envelope_json()) == {"items": [{"id": 1}], "next_cursor": "abc"}
+
+
+def test_page_raw_items():
+    page = Page(raw=b'[{"id":1}]')
+    assert page.items_json() == b'[{"id":1}]'
+    assert json.loads(page.envelope_json()) == {"items": [{"id": 1}], "next_cursor": None}
@@ -0,0 +1,72 @@
+"""
+RowMapper: построенная без валидации модель должна совпадать с валидированной.
+"""
+from datetime import time
+
+import pytest
+
+from app.db import rows
+from app.db.rows import RowMapper
+from app.schemas.events import ScheduleEventItem
+
+ROW = {
+    "id": 1,
+    "lesson_type": "ЛК",
+    "subject": "ОАиП",
+    "subject_full": "Основы алгоритмизации и программирования",
+    "week_numbers": [1, 3],
+    "day_of_week": 2,
+    "start_time": time(9, 0),
+    "end_time": time(10, 20),
+    "auditories": ["101-2 к."],
+    "entity_name": "200000",
+    "entity_type": "group",
+}
+
+MAPPER = RowMapper(ScheduleEventItem)
+
+
+def expected(**values) -> ScheduleEventItem:
+    data = {name: value for name, value in ROW.items() if name in ScheduleEventItem.model_fields}
+    return ScheduleEventItem.model_validate({**data, **values})
+
+
+def test_json_matches_validated_model():
+    values = {"entity_display_name": "Группа 200000", "teachers_display_names": ["Иванов И. И."]}
+    built = MAPPER(ROW, **values)
+    assert built.model_dump_json() == expected(**values).model_dump_json()
+    assert built.model_fields_set == set(ScheduleEventItem.model_fields)
+
+
+def test_defaults_and_factories_keep_field_order():
+    built = MAPPER({k: v for k, v in ROW.items() if k != "lesson_type"})
+    assert built.model_dump_json() == expected(lesson_type=None).model_dump_json()
+    assert list(built.model_dump()) == list(ScheduleEventItem.model_fields)
+
+
+def test_factory_value_is_not_shared():
+    first, second = MAPPER.many([ROW, ROW])
+    first.teachers_display_names.append("Иванов И. И.")
+    assert second.teachers_display_names == []
+
+
+def test_many_with_computed_values():
+    built = MAPPER.many([ROW], compute=lambda row: {"entity_display_name": row["entity_name"]})
+    assert built[0].model_dump_json() == expected(entity_display_name="200000").model_dump_json()
+
+
+def test_from_attributes():
+    source = expected()
+    built = MAPPER.from_attributes(source, entity_display_name="Группа")
+    assert built.model_dump_json() == expected(entity_display_name="Группа").model_dump_json()
+
+
+def test_missing_required_column():
+    with pytest.raises(KeyError, match="subject"):
+        MAPPER({k: v for k, v in ROW.items() if k != "subject"})
+
+
+def test_validation_mode(monkeypatch):
+    monkeypatch.setattr(rows, "_validate_rows", True)
+    values = {"teachers_display_names": ["Иванов И. И."]}
+    assert MAPPER(ROW, **values).model_dump_json() == expected(**values).model_dump_json()
@@ -0,0 +1,100 @@
+"""
+Проекция документа расписания по неделе, дню, подгруппе и полям.
+"""
+import json
+
+import pytest
+
+from app.services.schedule_projection import ScheduleProjection, project_document, project_schedule
+
+
+def lesson(subject: str, weeks: list[int] | None, subgroup: int = 0, **extra) -> dict:
+    return {"subject": subject, "weekNumber": weeks, "numSubgroup": subgroup, "auditories": ["101-2 к."], **extra}
+
+
+DOCUMENT = {
+    "studentGroupDto": {"name": "200000"},
+    "schedules": {
+        "Понедельник": [
+            lesson("ОАиП", [1, 2, 3, 4]),
+            lesson("ОАиП", [1, 3], subgroup=1),
+            lesson("ОАиП", [2, 4], subgroup=2),
+        ],
+        "Вторник": [
+            lesson("Физика", [2]),
+            lesson("Консультация", None, dateLesson="01.09.2026"),
+        ],
+    },
+    "exams": [lesson("ОАиП", None, subgroup=1), lesson("Физика", None)],
+}
+
+
+def subjects(result: dict, day: str) -> list[tuple[str, int]]:
+    return [(item["subject"], item["numSubgroup"]) for item in result["schedules"][day]]
+
+
+def test_empty_projection_keeps_document():
+    projection = ScheduleProjection.build()
+    assert projection.is_empty
+    assert project_document(DOCUMENT, projection) == DOCUMENT
+
+
+def test_week_filter_keeps_dated_lessons_and_drops_exams():
+    result = project_document(DOCUMENT, ScheduleProjection.build(week_number=3))
+    assert subjects(result, "Понедельник") == [("ОАиП", 0), ("ОАиП", 1)]
+    assert subjects(result, "Вторник") == [("Консультация", 0)]
+    assert result["exams"] == []
+    assert result["studentGroupDto"] == DOCUMENT["studentGroupDto"]
+
+
+def test_day_filter():
+    result = project_document(DOCUMENT, ScheduleProjection.build(day_of_week=2))
+    assert list(result["schedules"]) == ["Вторник"]
+
+
+def test_subgroup_keeps_whole_group_lessons():
+    result = project_document(DOCUMENT, ScheduleProjection.build(subgroup=2))
+    assert subjects(result, "Понедельник") == [("ОАиП", 0), ("ОАиП", 2)]
+    assert [item["subject"] for item in result["exams"]] == ["Физика"]
+
+
+def test_fields():
+    projection = ScheduleProjection.build(fields=["subject", " weekNumber ", "subject", ""])
+    assert projection.fields == ("subject", "weekNumber")
+    result = project_document(DOCUMENT, projection)
+    assert result["schedules"]["Вторник"][0] == {"subject": "Физика", "weekNumber": [2]}
+    assert result["exams"][0] == {"subject": "ОАиП", "weekNumber": None}
+
+
+def test_source_document_is_not_modified():
+    before = json.dumps(DOCUMENT, ensure_ascii=False)
+    project_document(DOCUMENT, ScheduleProjection.build(week_number=1, subgroup=1, fields=["subject"]))
+    assert json.dumps(DOCUMENT, ensure_ascii=False) == before
+
+
+@pytest.mark.parametrize("kwargs, message", [
+    ({"week_number": 5}, "week_number"),
+    ({"day_of_week": 0}, "day_of_week"),
+    ({"day_of_week": 8}, "day_of_week"),
+    ({"subgroup": 0}, "subgroup"),
+    ({"fields": ["subject", "password"]}, "Unknown lesson fields: password"),
+])
+def test_invalid_parameters(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        ScheduleProjection.build(**kwargs)
+
+
+def test_cache_key_is_canonical():
+    first = ScheduleProjection.build(week_number=2, fields=["weekNumber", "subject"])
+    second = ScheduleProjection.build(week_number=2, fields=["subject", "weekNumber", "subject"])
+    assert first.key == second.key == "w2:d*:s*:fsubject,weekNumber"
+    assert ScheduleProjection.build(fields=[]).key == "w*:d*:s*:f*"
+    assert first.with_week(None).key == "w*:d*:s*:fsubject,weekNumber"
+
+
+def test_project_schedule_many():
+    raw = json.dumps(DOCUMENT, ensure_ascii=False).encode()
+    projections = [ScheduleProjection.build(), ScheduleProjection.build(day_of_week=1, fields=["subject"])]
+    full, monday = project_schedule(raw, projections)
+    assert json.loads(full) == DOCUMENT
+    assert json.loads(monday)["schedules"] == {"Понедельник": [{"subject": "ОАиП"}] * 3}
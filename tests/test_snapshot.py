@@ -0,0 +1,77 @@
+"""
+Снимок поколения данных: фоновая перезагрузка и признак устаревшего снимка.
+"""
+import asyncio
+
+from app.services.generation_service import DataGeneration
+from app.services.snapshot import GenerationSnapshot
+
+
+class CountingSnapshot(GenerationSnapshot[str]):
+    def __init__(self, generation: DataGeneration):
+        super().__init__(generation, max_age=3600)
+        self.loads = 0
+
+    async def _load(self, conn) -> str:
+        self.loads += 1
+        await asyncio.sleep(0)
+        return f"{self.generation.value}#{self.loads}"
+
+
+class FakeEngine:
+    def connect(self):
+        return FakeConnection()
+
+
+class FakeConnection:
+    engine = FakeEngine()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def test_first_load_blocks_and_later_reload_runs_in_background():
+    async def scenario():
+        generation = DataGeneration("1")
+        snapshot = CountingSnapshot(generation)
+        conn = FakeConnection()
+
+        assert await snapshot.get(conn) == "1#1"
+        assert snapshot.is_current()
+
+        generation.update("2")
+        assert not snapshot.is_current()
+        assert await snapshot.get(conn) == "1#1"
+
+        await snapshot._preload_task
+        assert snapshot.is_current()
+        assert await snapshot.get(conn) == "2#2"
+        assert snapshot.loads == 2
+
+    asyncio.run(scenario())
+
+
+def test_structure_service_marks_previous_generation_as_stale():
+    from app.services.structure_service import StructureService
+
+    async def scenario():
+        generation = DataGeneration("1")
+        snapshot = CountingSnapshot(generation)
+        conn = FakeConnection()
+        service = StructureService(conn, snapshot)
+
+        await service._get_reference()
+        assert not service.served_stale
+
+        generation.update("2")
+        await service._get_reference()
+        assert service.served_stale
+
+        await snapshot._preload_task
+        await service._get_reference()
+        assert not service.served_stale
+
+    asyncio.run(scenario())